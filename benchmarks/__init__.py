@@ -0,0 +1 @@
+# Reproducible, offline benchmarks; run with `python -m benchmarks.bench --help` from the repo root.
@@ -0,0 +1,428 @@
+# benchmarks/bench.py
+"""
+Offline benchmark harness for nabu.
+
+    python -m benchmarks.bench                          # run everything, print a table
+    python -m benchmarks.bench --out bench.json         # also save machine-readable results
+    python -m benchmarks.bench --baseline bench.json    # compare, exit 1 on regressions
+    python -m benchmarks.bench --only cipher/ --quick   # substring filter, smaller fixtures
+"""
+from __future__ import annotations
+import argparse
+import atexit
+import inspect
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from math import gcd
+from typing import Callable, Dict, List, Optional, Tuple
+
+from nabu.ciphers import (Cipher, CaseMode, CaesarCipher, MonoSubCipher, VigenereCipher, AffineCipher, KeySchedule,
+                          BeaufortCipher, GronsfeldCipher, PortaCipher, ColumnarCipher, RailFenceCipher, RouteCipher,
+                          CipherPipeline)
+from nabu.core.alphabets import getAlphabet, registerAlphabet
+from nabu.core.key import generateRandomKey, keysToStrings, keywordKeyMatrix, randomKeyMatrix
+from nabu.cli import main as cliMain
+from nabu.core.mask import captureMask, restoreMask
+from nabu.eval.keyspace import MonoSubKeyspace
+from nabu.fitness.ngram import SparseNgramModel
+from nabu.eval.oracle import normalised_levenshtein
+from nabu.eval.pairwise import build_random_pool, build_local_pool_exact_radius, build_pairwise_dataset
+from nabu.eval.rocEval import MonoSubEvaluator
+from nabu.eval.viz import renderRocReport
+
+from .fixtures import make_text, make_plain, unigram_fitness
+
+# a benchmark = (name, unit, size, setup); setup() returns the zero-arg callable that is timed
+Bench = Tuple[str, str, int, Callable[[], Callable[[], object]]]
+BENCHES: List[Bench] = []
+ALPHABETS = ("latin", "greek")
+
+
+def bench(name: str, unit: str, size: int) -> Callable:
+    def register(setup: Callable[[], Callable[[], object]]) -> Callable:
+        BENCHES.append((name, unit, size, setup))
+        return setup
+    return register
+
+
+# ---------- Ciphers ----------
+# one factory per Cipher subclass; new ciphers must be added here (missing ones are reported)
+def _coprime(m: int) -> int:
+    return next(a for a in range(3, m) if gcd(a, m) == 1)
+
+CIPHER_FACTORIES: Dict[type, Callable[[str, CaseMode], Cipher]] = {
+    CaesarCipher: lambda a, cm: CaesarCipher(rotation=7, caseMode=cm, alphabet=a),
+    AffineCipher: lambda a, cm: AffineCipher(multiKey=_coprime(len(getAlphabet(a).lower)), addKey=5,
+                                             caseMode=cm, alphabet=a),
+    MonoSubCipher: lambda a, cm: MonoSubCipher(keyAlphabet=generateRandomKey(getAlphabet(a).lower, seed=1),
+                                               caseMode=cm, alphabet=a),
+    VigenereCipher: lambda a, cm: VigenereCipher(key=getAlphabet(a).lower[3:9], caseMode=cm, alphabet=a),
+    BeaufortCipher: lambda a, cm: BeaufortCipher(key=getAlphabet(a).lower[3:9], caseMode=cm, alphabet=a),
+    GronsfeldCipher: lambda a, cm: GronsfeldCipher(key="314159", caseMode=cm, alphabet=a),
+    PortaCipher: lambda a, cm: PortaCipher(key=getAlphabet(a).lower[3:9], caseMode=cm, alphabet=a),
+    ColumnarCipher: lambda a, cm: ColumnarCipher(key=getAlphabet(a).lower[9:2:-1], caseMode=cm, alphabet=a),
+    RailFenceCipher: lambda a, cm: RailFenceCipher(rails=5, caseMode=cm, alphabet=a),
+    RouteCipher: lambda a, cm: RouteCipher(cols=40, caseMode=cm, alphabet=a, blockSize=4096),
+    # affine -> monosub -> caesar fuse into one table; should cost about one CaesarCipher pass
+    CipherPipeline: lambda a, cm: CipherPipeline([CIPHER_FACTORIES[c](a, cm) for c in (AffineCipher, MonoSubCipher, CaesarCipher)],
+                                                 caseMode=cm, alphabet=a),
+}
+
+
+def _allSubclasses(cls: type) -> List[type]:
+    out = []
+    for sub in cls.__subclasses__():
+        out.append(sub)
+        out.extend(_allSubclasses(sub))
+    return out
+
+
+def _registerCipherBenches(textLen: int) -> None:
+    for cls in _allSubclasses(Cipher):
+        if inspect.isabstract(cls):
+            continue
+        factory = CIPHER_FACTORIES.get(cls)
+        if factory is None:
+            print(f"warning: no benchmark factory for {cls.__name__}", file=sys.stderr)
+            continue
+        for alphabet in ALPHABETS:
+            for mode in CaseMode:
+                def setup(factory=factory, alphabet=alphabet, mode=mode) -> Callable[[], object]:
+                    cipher = factory(alphabet, mode)
+                    text = make_text(alphabet, textLen, seed=11)
+                    return lambda: cipher.decrypt(cipher.encrypt(text))
+                bench(f"cipher/{cls.__name__}/{alphabet}/{mode.value}", "chars", 2 * textLen)(setup)
+        # per-request construction with a recurring key: served from the shared table cache after the first build
+        def construct(factory=factory) -> Callable[[], object]:
+            return lambda: [factory("latin", CaseMode.PRESERVE) for _ in range(100)]
+        bench(f"cipher/{cls.__name__}/construct", "ciphers", 100)(construct)
+
+
+def _registerScheduleBenches(textLen: int) -> None:
+    # Vigenère key schedules should all run at plain repeating-key speed
+    for schedule in KeySchedule:
+        def setup(schedule=schedule) -> Callable[[], object]:
+            text = make_text("latin", textLen, seed=13)
+            keyFile = None
+            if schedule is KeySchedule.RUNNING:
+                fd, keyFile = tempfile.mkstemp(suffix=".txt")
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(make_text("latin", 2 * textLen, seed=14))
+                atexit.register(os.remove, keyFile)
+            cipher = VigenereCipher(key="lemon", keySchedule=schedule, keyFile=keyFile)
+            return lambda: cipher.decrypt(cipher.encrypt(text))
+        bench(f"cipher/VigenereCipher/schedule/{schedule.value}", "chars", 2 * textLen)(setup)
+
+
+# ring-index ciphers on a several-thousand-symbol caseless alphabet: Caesar/Affine/Vigenère are arithmetic,
+# MonoSub is one dense index array; none of them builds translate dicts or an m x m tableau
+LARGE_RING_SIZE = 4000
+LARGE_RING_CIPHERS = (CaesarCipher, AffineCipher, MonoSubCipher, VigenereCipher, BeaufortCipher, PortaCipher)
+
+
+def _registerLargeRingBenches(textLen: int) -> None:
+    alphabet = f"cjk{LARGE_RING_SIZE}"
+    registerAlphabet(alphabet, "".join(chr(0x4E00 + i) for i in range(LARGE_RING_SIZE)), overwrite=True)
+    for cls in LARGE_RING_CIPHERS:
+        def setup(cls=cls) -> Callable[[], object]:
+            cipher = CIPHER_FACTORIES[cls](alphabet, CaseMode.PRESERVE)
+            text = make_text(alphabet, textLen, seed=15)
+            return lambda: cipher.decrypt(cipher.encrypt(text))
+        bench(f"cipher/{cls.__name__}/{alphabet}", "chars", 2 * textLen)(setup)
+
+
+# ---------- Core ----------
+def _registerCoreBenches(textLen: int) -> None:
+    for alphabet in ALPHABETS:
+        def setup(alphabet=alphabet) -> Callable[[], object]:
+            pair = getAlphabet(alphabet)
+            text = make_text(alphabet, textLen, seed=12)
+
+            def run() -> object:
+                mask, stream = captureMask(text, pair)
+                return restoreMask(stream, mask, pair)
+            return run
+        bench(f"core/mask_roundtrip/{alphabet}", "chars", textLen)(setup)
+
+    # batch keys: compare against core/generate_random_key (one random.Random + shuffle per key)
+    @bench("core/generate_random_key", "keys", 10_000)
+    def _() -> Callable[[], object]:
+        return lambda: [generateRandomKey(seed=i) for i in range(10_000)]
+
+    @bench("core/random_key_matrix", "keys", 100_000)
+    def _() -> Callable[[], object]:
+        return lambda: keysToStrings(randomKeyMatrix(100_000, seed=1))
+
+    @bench("core/keyword_key_matrix", "keys", 10_000)
+    def _() -> Callable[[], object]:
+        rng = random.Random(16)
+        keywords = ["".join(rng.choices(getAlphabet("latin").lower, k=rng.randint(3, 12))) for _ in range(10_000)]
+        return lambda: keywordKeyMatrix(keywords)
+
+
+# ---------- Fitness ----------
+def _registerFitnessBenches(plainLen: int, poolSize: int) -> None:
+    # sparse 6-gram model: one searchsorted per order for the whole pool, backoff only for the misses
+    def model() -> SparseNgramModel:
+        return SparseNgramModel.fromTexts([make_plain("latin", 20_000, seed=s) for s in range(5)], 6)
+
+    @bench("fitness/sparse_ngram6/score_batch", "texts", poolSize)
+    def _() -> Callable[[], object]:
+        m = model()
+        texts = [make_plain("latin", plainLen, seed=100 + s) for s in range(poolSize)]
+        return lambda: m.score_batch(texts)
+
+    @bench("fitness/sparse_ngram6/score_keys", "keys", poolSize)
+    def _() -> Callable[[], object]:
+        m = model()
+        ks = MonoSubKeyspace("abcdefghijklmnopqrstuvwxyz", 1)
+        keys = ks.decryption_matrix(ks.key_matrix([ks.random_key() for _ in range(poolSize)]))
+        cipherCodes = ks.encode(ks.encrypt(make_plain("latin", plainLen, seed=3), ks.random_key()))
+        return lambda: m.score_keys(cipherCodes, keys)
+
+
+# ---------- Evaluator ----------
+def _registerEvalBenches(plainLen: int, poolSize: int, maxPairs: int) -> None:
+    fitness = unigram_fitness("latin")
+
+    @bench("eval/keyspace_decrypt", "keys", poolSize)
+    def _() -> Callable[[], object]:
+        ks = MonoSubKeyspace("abcdefghijklmnopqrstuvwxyz", 1)
+        keys = [ks.random_key() for _ in range(poolSize)]
+        ct = ks.encrypt(make_plain("latin", plainLen, seed=2), keys[0])
+        return lambda: [ks.decrypt(ct, k) for k in keys]
+
+    @bench("eval/cayley_distance", "pairs", 10 * poolSize)
+    def _() -> Callable[[], object]:
+        ks = MonoSubKeyspace("abcdefghijklmnopqrstuvwxyz", 1)
+        keys = [ks.random_key() for _ in range(10 * poolSize + 1)]
+        return lambda: [ks.cayley_distance(a, b) for a, b in zip(keys, keys[1:])]
+
+    @bench("eval/normalised_levenshtein", "calls", 50)
+    def _() -> Callable[[], object]:
+        a, b = make_plain("latin", plainLen, seed=3), make_plain("latin", plainLen, seed=4)
+        return lambda: [normalised_levenshtein(a, b) for _ in range(50)]
+
+    @bench("eval/build_random_pool", "keys", poolSize)
+    def _() -> Callable[[], object]:
+        ks = MonoSubKeyspace("abcdefghijklmnopqrstuvwxyz", 5)
+        ct = ks.encrypt(make_plain("latin", plainLen, seed=5), ks.random_key())
+        return lambda: build_random_pool(ks, ct, fitness, num_keys=poolSize, rng=random.Random(5))
+
+    @bench("eval/build_local_pool_exact_radius", "keys", 3 * 3 * (poolSize // 9) + 3)
+    def _() -> Callable[[], object]:
+        ks = MonoSubKeyspace("abcdefghijklmnopqrstuvwxyz", 6)
+        trueKey = ks.random_key()
+        ct = ks.encrypt(make_plain("latin", plainLen, seed=6), trueKey)
+        return lambda: build_local_pool_exact_radius(ks, trueKey, ct, fitness, radius=3, per_seed=poolSize // 9,
+                                                     n_seeds=3, rng=random.Random(6))
+
+    for cap in (None, 3):
+        def setup(cap=cap) -> Callable[[], object]:
+            ks = MonoSubKeyspace("abcdefghijklmnopqrstuvwxyz", 7)
+            plain = make_plain("latin", plainLen, seed=7)
+            trueKey = ks.random_key()
+            ct = ks.encrypt(plain, trueKey)
+            if cap is None:
+                pool = build_random_pool(ks, ct, fitness, num_keys=poolSize, rng=random.Random(7))
+            else:
+                pool = build_local_pool_exact_radius(ks, trueKey, ct, fitness, radius=cap, per_seed=poolSize // 9,
+                                                     n_seeds=3, rng=random.Random(7))
+            return lambda: build_pairwise_dataset(ks, pool, g=plain, max_pairs=maxPairs, rng=random.Random(7),
+                                                  local_radius_cap=cap)
+        bench(f"eval/build_pairwise_dataset/{'global' if cap is None else f'cap{cap}'}", "pairs", maxPairs)(setup)
+
+    @bench("eval/evaluate", "texts", 1)
+    def _() -> Callable[[], object]:
+        plain = make_plain("latin", plainLen, seed=8)
+
+        def run() -> object:
+            ev = MonoSubEvaluator(rngSeed=8)
+            return ev.evaluate(plaintext=plain, fitnessFunc=fitness, globalNumKeys=poolSize, globalMaxPairs=maxPairs,
+                               localRadii=(1, 2, 3), localSeeds=3, localPerSeed=poolSize // 9, localMaxPairs=maxPairs)
+        return run
+
+    # four functions on shared pools and pairs; compare against 4x eval/evaluate
+    @bench("eval/evaluate_multi/4", "texts", 1)
+    def _() -> Callable[[], object]:
+        plain = make_plain("latin", plainLen, seed=8)
+        fitnesses = {f"f{k}": (lambda x, k=k: fitness(x) + k) for k in range(4)}
+
+        def run() -> object:
+            ev = MonoSubEvaluator(rngSeed=8)
+            return ev.evaluate_multi(plaintext=plain, fitnessFuncs=fitnesses, globalNumKeys=poolSize,
+                                     globalMaxPairs=maxPairs, localRadii=(1, 2, 3), localSeeds=3,
+                                     localPerSeed=poolSize // 9, localMaxPairs=maxPairs)
+        return run
+
+    # figures for a 4-text report from the run's own pairs: downsampling, DeLong CIs and Agg drawing only
+    @bench("eval/render_roc_report/4", "texts", 4)
+    def _() -> Callable[[], object]:
+        ev = MonoSubEvaluator(rngSeed=8)
+        result = ev.evaluate_many(plaintextIter=(make_plain("latin", plainLen, seed=20 + s) for s in range(4)),
+                                  fitnessFunc=fitness, maxTexts=4, minLen=0, returnPairs=True,
+                                  globalNumKeys=poolSize, globalMaxPairs=maxPairs, localPerSeed=poolSize // 9,
+                                  localMaxPairs=maxPairs)
+        outDir = tempfile.mkdtemp(prefix="nabu-roc-")
+        atexit.register(shutil.rmtree, outDir, True)
+        return lambda: renderRocReport(result, outDir, workers=1)
+
+    # same workload as eval/evaluate, stopping each pool once its AUC CI is within +-0.02
+    @bench("eval/evaluate/adaptive", "texts", 1)
+    def _() -> Callable[[], object]:
+        plain = make_plain("latin", plainLen, seed=8)
+
+        def run() -> object:
+            ev = MonoSubEvaluator(rngSeed=8)
+            return ev.evaluate(plaintext=plain, fitnessFunc=fitness, globalNumKeys=poolSize, globalMaxPairs=maxPairs,
+                               localRadii=(1, 2, 3), localSeeds=3, localPerSeed=poolSize // 9, localMaxPairs=maxPairs,
+                               aucTolerance=0.02)
+        return run
+
+
+# ---------- Command line ----------
+def _registerCliBenches(textLen: int) -> None:
+    # 8 files through the CLI in-process (one worker): chunked reads, streaming cipher, atomic writes
+    @bench("cli/encrypt_files/8", "chars", 8 * textLen)
+    def _() -> Callable[[], object]:
+        root = tempfile.mkdtemp(prefix="nabu-cli-")
+        atexit.register(shutil.rmtree, root, True)
+        src = os.path.join(root, "in")
+        os.makedirs(src)
+        for k in range(8):
+            with open(os.path.join(src, f"{k}.txt"), "w", encoding="utf-8") as f:
+                f.write(make_text("latin", textLen, seed=30 + k))
+        argv = ["encrypt", "--cipher", "vigenere", "--key", "lemon", "--workers", "1", "--chunk-chars",
+                str(textLen // 4), "--force", "--quiet", src, os.path.join(root, "out")]
+        return lambda: cliMain(argv)
+
+
+# ---------- Import time ----------
+# modules that must stay importable without paying for the heavy optional dependencies
+HEAVY_DEPS = ("sklearn", "matplotlib", "datasets", "Levenshtein")
+LAZY_MODULES = ("nabu.ciphers", "nabu.cli", "nabu.eval.keyspace", "nabu.eval.rocEval", "nabu.eval.viz",
+                "nabu.eval.streaming", "nabu.eval.corpus")
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _importProbe(module: str) -> Dict[str, object]:
+    """Import `module` in a fresh interpreter; returns its import time and any heavy deps it pulled in."""
+    code = (
+        "import json, sys, time\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "t = time.perf_counter() - t\n"
+        f"print(json.dumps({{'s': t, 'heavy': [m for m in {HEAVY_DEPS!r} if m in sys.modules]}}))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=_REPO_ROOT, check=True, capture_output=True, text=True)
+    return json.loads(out.stdout)
+
+
+def _registerImportBenches() -> None:
+    for module in LAZY_MODULES:
+        bench(f"import/{module}", "imports", 1)(lambda module=module: (lambda: _importProbe(module)))
+
+
+def check_lazy_imports() -> List[str]:
+    """Violations of the lazy-import contract, e.g. 'nabu.eval.rocEval -> sklearn'."""
+    bad = []
+    for module in LAZY_MODULES:
+        bad.extend(f"{module} -> {dep}" for dep in _importProbe(module)["heavy"])
+    return bad
+
+
+# ---------- Runner ----------
+def run_one(fn: Callable[[], object], repeat: int) -> List[float]:
+    fn()  # warm-up: imports, caches, first-touch allocations
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def run_all(only: Optional[str], repeat: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, unit, size, setup in BENCHES:
+        if only and only not in name:
+            continue
+        times = run_one(setup(), repeat)
+        med = statistics.median(times)
+        results[name] = {"median_s": med, "min_s": min(times), "unit": unit, "size": size,
+                         "per_s": size / med if med > 0 else float("inf")}
+        print(f"{name:55s} {med*1e3:10.2f} ms {results[name]['per_s']:14,.0f} {unit}/s", file=sys.stderr)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """Names whose median slowed down by more than `threshold` (ratio) against the baseline."""
+    regressions = []
+    for name, cur in sorted(results.items()):
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = cur["median_s"] / base["median_s"] if base["median_s"] > 0 else float("inf")
+        flag = "REGRESSION" if ratio > threshold else ("faster" if ratio < 1 / threshold else "")
+        print(f"{name:55s} x{ratio:6.2f} {flag}", file=sys.stderr)
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="nabu benchmarks")
+    ap.add_argument("--out", help="write results JSON here")
+    ap.add_argument("--baseline", help="saved results JSON to compare against")
+    ap.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    ap.add_argument("--only", help="run benchmarks whose name contains this substring")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--quick", action="store_true", help="smaller fixtures, for smoke runs")
+    args = ap.parse_args(argv)
+
+    scale = 10 if args.quick else 1
+    _registerCipherBenches(textLen=50_000 // scale)
+    _registerScheduleBenches(textLen=50_000 // scale)
+    _registerLargeRingBenches(textLen=50_000 // scale)
+    _registerCoreBenches(textLen=50_000 // scale)
+    _registerCliBenches(textLen=50_000 // scale)
+    _registerImportBenches()
+    _registerFitnessBenches(plainLen=400 if args.quick else 2_000, poolSize=300 // (3 if args.quick else 1))
+    _registerEvalBenches(plainLen=400 if args.quick else 2_000,
+                         poolSize=300 // (3 if args.quick else 1), maxPairs=20_000 // scale)
+
+    results = run_all(args.only, args.repeat)
+    payload = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "quick": args.quick, "repeat": args.repeat, "timestamp": time.time()},
+        "results": results,
+    }
+    status = 0
+    if not args.only or "import/" in args.only:
+        lazyViolations = check_lazy_imports()
+        payload["lazy_import_violations"] = lazyViolations
+        for v in lazyViolations:
+            print(f"eager heavy import: {v}", file=sys.stderr)
+        status = 1 if lazyViolations else 0
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# benchmarks/fixtures.py
+from __future__ import annotations
+import math
+import random
+from typing import Callable, Dict, List
+
+from nabu.core.alphabets import getAlphabet
+
+# rough English unigram frequencies (%), reused for the latin fixtures and the benchmark fitness
+LATIN_FREQ: Dict[str, float] = {
+    "a": 8.2, "b": 1.5, "c": 2.8, "d": 4.3, "e": 12.7, "f": 2.2, "g": 2.0, "h": 6.1, "i": 7.0,
+    "j": 0.15, "k": 0.77, "l": 4.0, "m": 2.4, "n": 6.7, "o": 7.5, "p": 1.9, "q": 0.095, "r": 6.0,
+    "s": 6.3, "t": 9.1, "u": 2.8, "v": 0.98, "w": 2.4, "x": 0.15, "y": 2.0, "z": 0.074,
+}
+
+
+def letter_weights(alphabet: str) -> List[float]:
+    """English-like weights for latin, a Zipf curve for anything else."""
+    ring = getAlphabet(alphabet).lower
+    if alphabet == "latin":
+        return [LATIN_FREQ[c] for c in ring]
+    return [1.0 / (i + 1) for i in range(len(ring))]
+
+
+def make_text(alphabet: str = "latin", n: int = 50_000, *, seed: int = 0, cased: bool = True) -> str:
+    """
+    Deterministic pseudo-prose: words of 1–10 letters, spaces, occasional punctuation and
+    (if `cased`) capitalised words, so case masks and pass-through symbols are exercised.
+    """
+    pair = getAlphabet(alphabet)
+    rng = random.Random(seed)
+    weights = letter_weights(alphabet)
+    out: List[str] = []
+    size = 0
+    while size < n:
+        word = rng.choices(pair.lower, weights=weights, k=rng.randint(1, 10))
+        if cased and rng.random() < 0.15:
+            word[0] = pair.upper[pair.lowerIndex[word[0]]]
+        w = "".join(word) + rng.choice("     ,.")
+        out.append(w)
+        size += len(w)
+    return "".join(out)[:n]
+
+
+def make_plain(alphabet: str = "latin", n: int = 2_000, *, seed: int = 0) -> str:
+    """Cleaned-style plaintext: lowercase ring symbols only (what the evaluator consumes)."""
+    pair = getAlphabet(alphabet)
+    rng = random.Random(seed)
+    return "".join(rng.choices(pair.lower, weights=letter_weights(alphabet), k=n))
+
+
+def unigram_fitness(alphabet: str = "latin") -> Callable[[str], float]:
+    ring = getAlphabet(alphabet).lower
+    weights = letter_weights(alphabet)
+    total = sum(weights)
+    logProbs = {c: math.log(w / total) for c, w in zip(ring, weights)}
+
+    def fitness(text: str) -> float:
+        return sum(logProbs.get(ch, -10.0) for ch in text)
+    return fitness
@@ -0,0 +1,3 @@
+from nabu.cli import main
+
+raise SystemExit(main())
@@ -3,5 +3,18 @@ from .caesar import CaesarCipher
 from .monosub import MonoSubCipher
 from .vigenere import VigenereCipher
 from .affine import AffineCipher
+from .polyalphabetic import PolyalphabeticCipher
+from .beaufort import BeaufortCipher
+from .gronsfeld import GronsfeldCipher
+from .porta import PortaCipher
+from .transposition import TranspositionCipher
+from .columnar import ColumnarCipher
+from .railfence import RailFenceCipher
+from .route import RouteCipher
+from .pipeline import CipherPipeline
+from nabu.core.poly import KeySchedule
 
-__all__ = ["Cipher", "CaseMode", "CaesarCipher", "MonoSubCipher", "VigenereCipher", "AffineCipher"]
\ No newline at end of file
+__all__ = ["Cipher", "CaseMode", "CaesarCipher", "MonoSubCipher", "VigenereCipher", "AffineCipher", "KeySchedule",
+           "PolyalphabeticCipher", "BeaufortCipher", "GronsfeldCipher", "PortaCipher",
+           "TranspositionCipher", "ColumnarCipher", "RailFenceCipher", "RouteCipher",
+           "CipherPipeline"]
\ No newline at end of file
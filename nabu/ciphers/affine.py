@@ -1,10 +1,12 @@
 
 from __future__ import annotations
 from .basecipher import Cipher, CaseMode
-from typing import Dict
-from nabu.core.mod import affineTable, invAffineTable, validateAffineParams
+from nabu.core.mod import validateAffineParams
+from nabu.core.tables import RingMap, cipherTables, isLargeRing, ringMap
 
 class AffineCipher(Cipher):
+    monoalphabetic = True
+
     def __init__(self, multiKey: int, addKey: int, ring: str | None = None, *,
                  caseMode: CaseMode = CaseMode.PRESERVE, alphabet: str = "latin") -> None:
         super().__init__(caseMode=caseMode, alphabet=alphabet)
@@ -18,12 +20,19 @@ class AffineCipher(Cipher):
         # sees if affine table will build successfully
         validateAffineParams(self.multiKey, self._ringLength)
 
-        # builds tables
-        self._table : Dict[int, int] = affineTable(ring=self.ring, ringLength=self._ringLength, multiKey=self.multiKey, addKey=self.addKey)
-        self._invTable = invAffineTable(ring=self.ring, ringLength=self._ringLength, multiKey=self.multiKey, addKey=self.addKey)
+        # builds tables (or reuses them from the shared cache); large rings compute (a*x + b) % m instead
+        self._ringMap: RingMap | None = None
+        if isLargeRing(self.ring):
+            self._ringMap = ringMap("affine", self.ring, self.multiKey, self.addKey)
+        else:
+            self._table, self._invTable = cipherTables("affine", self.ring, self.multiKey, self.addKey)
 
     def _encryptCore(self, streamLower: str) -> str:
+        if self._ringMap is not None:
+            return self._ringMap.translate(streamLower)
         return streamLower.translate(self._table)
 
     def _decryptCore(self, streamLower: str) -> str:
+        if self._ringMap is not None:
+            return self._ringMap.translate(streamLower, inverse=True)
         return streamLower.translate(self._invTable)
\ No newline at end of file
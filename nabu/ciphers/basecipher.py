@@ -1,7 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Final
+from typing import Callable, Final
 from nabu.core.alphabets import AlphabetPair, getAlphabet
 from nabu.core.mask import captureMask, restoreMask
 
@@ -15,44 +15,34 @@ class CaseMode(str, Enum):
 class Cipher(ABC):
     caseMode: Final[CaseMode]
     alphabet: Final[AlphabetPair]
+    # True when _encryptCore is one fixed ring -> ring substitution (lets CipherPipeline fuse it)
+    monoalphabetic: bool = False
 
     def __init__(self, *, caseMode: CaseMode = CaseMode.PRESERVE, alphabet: str = "latin") -> None:
         self.caseMode = caseMode
         self.alphabet = getAlphabet(alphabet)
 
     def encrypt(self, plainText: str) -> str:
-        mode = self.caseMode
-
-        if mode is CaseMode.LOWER:
-            # Convert all alphabet chars to lowercase
-            normalised = self._normaliseToLower(plainText)
-            return self._encryptCore(normalised)
-
-        if mode is CaseMode.UPPER:
-            # Convert to lowercase, encrypt, then convert result to uppercase
-            normalised = self._normaliseToLower(plainText)
-            encrypted = self._encryptCore(normalised)
-            return self._normaliseToUpper(encrypted)
-
-        # PRESERVE mode
-        mask, stream = captureMask(plainText, self.alphabet)
-        return restoreMask(self._encryptCore(stream), mask, self.alphabet)
+        return self._withCaseMode(plainText, self._encryptCore)
 
     def decrypt(self, cipherText: str) -> str:
+        return self._withCaseMode(cipherText, self._decryptCore)
+
+    def _withCaseMode(self, text: str, core: Callable[[str], str]) -> str:
+        """Runs `core` on the lowercased stream and puts case back according to caseMode"""
         mode = self.caseMode
 
         if mode is CaseMode.LOWER:
-            normalised = self._normaliseToLower(cipherText)
-            return self._decryptCore(normalised)
+            # Convert all alphabet chars to lowercase
+            return core(self._normaliseToLower(text))
 
         if mode is CaseMode.UPPER:
-            normalised = self._normaliseToLower(cipherText)
-            decrypted = self._decryptCore(normalised)
-            return self._normaliseToUpper(decrypted)
+            # Convert to lowercase, run the core, then convert result to uppercase
+            return self._normaliseToUpper(core(self._normaliseToLower(text)))
 
         # PRESERVE mode
-        mask, stream = captureMask(cipherText, self.alphabet)
-        return restoreMask(self._decryptCore(stream), mask, self.alphabet)
+        mask, stream = captureMask(text, self.alphabet)
+        return restoreMask(core(stream), mask, self.alphabet)
 
     def _normaliseToLower(self, text: str) -> str:
         """Convert all alphabet characters to lowercase"""
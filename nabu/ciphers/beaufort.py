@@ -0,0 +1,11 @@
+from __future__ import annotations
+from nabu.ciphers.polyalphabetic import PolyalphabeticCipher
+from nabu.core.tableau import Tableau, getTableau
+
+class BeaufortCipher(PolyalphabeticCipher):
+    """
+    Beaufort cipher: c = k - p (mod ring length), so encryption and decryption are the same operation.
+    """
+
+    def _tableau(self) -> Tableau:
+        return getTableau("beaufort", self._codec.size)
@@ -1,17 +1,28 @@
 from __future__ import annotations
 from nabu.ciphers.basecipher import Cipher, CaseMode
-from nabu.core.rotate import rotateTable
+from nabu.core.tables import RingMap, cipherTables, isLargeRing, ringMap
 
 class CaesarCipher(Cipher):
+    monoalphabetic = True
+
     def __init__(self, rotation: int, ring: str | None = None, *,
                  caseMode: CaseMode = CaseMode.PRESERVE, alphabet: str = "latin") -> None:
         super().__init__(caseMode=caseMode, alphabet=alphabet)
         self.ring = ring if ring is not None else self.alphabet.lower
-        self.table = rotateTable(self.ring, rotation)
-        self.inverseTable = rotateTable(self.ring, -rotation)
+        # large rings shift ring indices arithmetically instead of building translate tables
+        self._ringMap: RingMap | None = None
+        self.table = self.inverseTable = None
+        if isLargeRing(self.ring):
+            self._ringMap = ringMap("rotate", self.ring, rotation)
+        else:
+            self.table, self.inverseTable = cipherTables("rotate", self.ring, rotation)
 
     def _encryptCore(self, streamLower: str) -> str:
+        if self._ringMap is not None:
+            return self._ringMap.translate(streamLower)
         return streamLower.translate(self.table)
 
     def _decryptCore(self, streamLower: str) -> str:
+        if self._ringMap is not None:
+            return self._ringMap.translate(streamLower, inverse=True)
         return streamLower.translate(self.inverseTable)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+from typing import Tuple
+from nabu.ciphers.transposition import TranspositionCipher
+from nabu.ciphers.basecipher import CaseMode
+
+class ColumnarCipher(TranspositionCipher):
+    """
+    Columnar transposition: ring symbols are written row by row under the keyword and read off
+    column by column in alphabetical order of the keyword letters (ties: left to right).
+    """
+
+    def __init__(self, key: str, ring: str | None = None, *,
+                 caseMode: CaseMode = CaseMode.PRESERVE,
+                 alphabet: str = "latin",
+                 blockSize: int | None = None) -> None:
+        super().__init__(ring, caseMode=caseMode, alphabet=alphabet, blockSize=blockSize)
+        if not key:
+            raise ValueError("key must not be empty")
+        self.key: str = key.lower()
+        # rank of every column, "zebra" -> (4, 2, 1, 3, 0)
+        byLetter = sorted(range(len(self.key)), key=lambda c: self.key[c])
+        ranks = [0] * len(self.key)
+        for r, c in enumerate(byLetter):
+            ranks[c] = r
+        self._order: Tuple[int, ...] = tuple(ranks)
+
+    @property
+    def _permKey(self) -> Tuple[str, tuple]:
+        return "columnar", (self._order,)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+import numpy as np
+from nabu.ciphers.polyalphabetic import PolyalphabeticCipher
+from nabu.core.alphabets import RingCodec, getRingCodec
+from nabu.core.tableau import Tableau, getTableau
+
+DIGITS = "0123456789"
+
+class GronsfeldCipher(PolyalphabeticCipher):
+    """
+    Gronsfeld cipher: Vigenère with a digit key ("31415" shifts by 3, 1, 4, 1, 5).
+    Running keys read digits from the key file; autokey is not possible (plaintext is not digits).
+    """
+
+    def _tableau(self) -> Tableau:
+        return getTableau("gronsfeld", self._codec.size)
+
+    def _keyRows(self, key: str) -> np.ndarray:
+        if any(c not in DIGITS for c in key):
+            raise ValueError("gronsfeld key must only contain digits")
+        return np.array([int(c) for c in key], dtype=np.int64)
+
+    def _keyCodec(self) -> RingCodec:
+        return getRingCodec(DIGITS)
@@ -1,12 +1,14 @@
 from __future__ import annotations
-from typing import Dict
 from nabu.ciphers.basecipher import Cipher, CaseMode
-from nabu.core.bijection import validateOneToOneBijection, bijectionTable, invertBijectionTable
+from nabu.core.bijection import validateOneToOneBijection
+from nabu.core.tables import RingMap, cipherTables, isLargeRing, ringMap
 
 class MonoSubCipher(Cipher):
     """
     generalised monosub cipher! works on arbitrary rings
     """
+    monoalphabetic = True
+
     def __init__(self, keyAlphabet: str, ring: str | None = None, *,
                  caseMode: CaseMode = CaseMode.PRESERVE, alphabet: str = "latin") -> None:
         super().__init__(caseMode=caseMode, alphabet=alphabet)
@@ -17,12 +19,19 @@ class MonoSubCipher(Cipher):
         # checks if the translation will succeed
         validateOneToOneBijection(self.key, self.ring)
 
-        # builds translation tables
-        self._table: Dict[int, int] = bijectionTable(keyAlphabet, self.ring)
-        self._inverseTable: Dict[int, int] = invertBijectionTable(self._table)
+        # builds translation tables (or reuses them from the shared cache); large rings use index arrays
+        self._ringMap: RingMap | None = None
+        if isLargeRing(self.ring):
+            self._ringMap = ringMap("bijection", self.ring, keyAlphabet)
+        else:
+            self._table, self._inverseTable = cipherTables("bijection", self.ring, keyAlphabet)
 
     def _encryptCore(self, streamLower: str) -> str:
+        if self._ringMap is not None:
+            return self._ringMap.translate(streamLower)
         return streamLower.translate(self._table)
 
     def _decryptCore(self, streamLower: str) -> str:
+        if self._ringMap is not None:
+            return self._ringMap.translate(streamLower, inverse=True)
         return streamLower.translate(self._inverseTable)
\ No newline at end of file
@@ -0,0 +1,95 @@
+from __future__ import annotations
+from typing import List, Sequence, Tuple, Union
+import numpy as np
+from nabu.ciphers.basecipher import Cipher, CaseMode
+from nabu.ciphers.polyalphabetic import PolyalphabeticCipher
+from nabu.ciphers.transposition import TranspositionCipher
+from nabu.core.alphabets import RingCodec, getRingCodec
+
+# a planned step: a fused (forward, inverse) index table, or a stage that runs on the code array
+Step = Tuple[str, Union[Tuple[np.ndarray, np.ndarray], Cipher]]
+
+class CipherPipeline(Cipher):
+    """
+    Runs several ciphers as one: CipherPipeline([AffineCipher(5, 8), MonoSubCipher(key), CaesarCipher(3)])
+      - Case is captured and restored once, by the pipeline's own caseMode (stage caseModes are ignored).
+      - The text is encoded to ring indices once; every stage works on that array.
+      - Consecutive monoalphabetic stages (Caesar, Affine, MonoSub) are composed into a single
+        index table, so they cost one gather between them.
+      - Polyalphabetic and transposition stages run directly on the index array.
+      - Any other cipher still works, but round-trips through text for its step.
+    Every stage must use the pipeline's ring.
+    """
+
+    def __init__(self, stages: Sequence[Cipher], ring: str | None = None, *,
+                 caseMode: CaseMode = CaseMode.PRESERVE,
+                 alphabet: str = "latin") -> None:
+        super().__init__(caseMode=caseMode, alphabet=alphabet)
+        if not stages:
+            raise ValueError("pipeline needs at least one stage")
+        self.ring: str = ring if ring is not None else self.alphabet.lower
+        self._codec: RingCodec = getRingCodec(self.ring)
+        for stage in stages:
+            stageRing = getattr(stage, "ring", self.ring)
+            if stageRing != self.ring:
+                raise ValueError(f"{type(stage).__name__} uses a different ring than the pipeline")
+        self.stages: List[Cipher] = list(stages)
+        self._plan: List[Step] = self._fuse(self.stages)
+
+    def _stageTable(self, stage: Cipher) -> np.ndarray:
+        # a monoalphabetic stage is fully described by where it sends each ring symbol
+        m = self._codec.size
+        table = np.empty(m + 1, dtype=np.int64)
+        table[:m] = self._codec.encode(stage._encryptCore(self.ring))
+        table[m] = m  # sentinel (non-ring characters) maps to itself
+        return table
+
+    def _fuse(self, stages: Sequence[Cipher]) -> List[Step]:
+        plan: List[Step] = []
+        fused = None
+        for stage in stages:
+            if stage.monoalphabetic:
+                table = self._stageTable(stage)
+                fused = table if fused is None else table[fused]
+                continue
+            if fused is not None:
+                plan.append(("table", (fused, np.argsort(fused))))
+                fused = None
+            if isinstance(stage, PolyalphabeticCipher):
+                plan.append(("poly", stage))
+            elif isinstance(stage, TranspositionCipher):
+                plan.append(("perm", stage))
+            else:
+                plan.append(("text", stage))
+        if fused is not None:
+            plan.append(("table", (fused, np.argsort(fused))))
+        return plan
+
+    def _run(self, streamLower: str, inverse: bool) -> str:
+        codec = self._codec
+        cps = codec.codepoints(streamLower)
+        codes = codec.encode(streamLower).astype(np.int64)
+        for kind, step in (reversed(self._plan) if inverse else self._plan):
+            if kind == "table":
+                codes = step[1 if inverse else 0][codes]
+            elif kind == "poly":
+                keyStream = step._newKeyStream()
+                try:
+                    codes = step._applyCodes(codes, keyStream, inverse)
+                finally:
+                    keyStream.close()
+            elif kind == "perm":
+                # only ring symbols move, so the non-ring code points in `cps` stay valid
+                codes = step._permuteRing(codes, codes < codec.size, inverse)
+            else:
+                text = codec.decode(codes, original=cps)
+                text = step._decryptCore(text) if inverse else step._encryptCore(text)
+                cps = codec.codepoints(text)
+                codes = codec.encode(text).astype(np.int64)
+        return codec.decode(codes, original=cps)
+
+    def _encryptCore(self, streamLower: str) -> str:
+        return self._run(streamLower, inverse=False)
+
+    def _decryptCore(self, streamLower: str) -> str:
+        return self._run(streamLower, inverse=True)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+from abc import abstractmethod
+from typing import Dict, Iterable, Iterator
+import numpy as np
+from nabu.ciphers.basecipher import Cipher, CaseMode
+from nabu.core.alphabets import RingCodec, getRingCodec
+from nabu.core.poly import KeySchedule, KeyStream, RunningKey
+from nabu.core.tableau import Tableau
+
+class PolyalphabeticCipher(Cipher):
+    """
+    Shared machinery for tableau ciphers (Vigenère, Beaufort, Gronsfeld, Porta, ...)
+      - Subclasses only pick a tableau (nabu.core.tableau); the key picks one row per ring symbol
+        and the whole message is substituted in one gather.
+      - Non-ring characters are passed through unchanged and DO NOT consume key index,
+        unless alwaysAdvance=True (then every character moves the key along).
+      - keySchedule picks where rows come from:
+          REPEAT  - the key, cycled
+          AUTOKEY - the key as a primer, then the plaintext itself
+          RUNNING - key text streamed from `keyFile` (must be at least as long as the message)
+    """
+
+    def __init__(self, key: str = "", ring: str | None = None, *,
+                 caseMode: CaseMode = CaseMode.PRESERVE,
+                 alphabet: str = "latin",
+                 keySchedule: KeySchedule = KeySchedule.REPEAT,
+                 alwaysAdvance: bool = False,
+                 keyFile: str | None = None) -> None:
+        super().__init__(caseMode=caseMode, alphabet=alphabet)
+
+        # ring and helpers
+        self.ring: str = ring if ring is not None else self.alphabet.lower
+        self._codec = getRingCodec(self.ring) # shared per-ring encoder, not rebuilt per instance
+        self._ringIndex: Dict[str, int] = self._codec.index
+        self.keySchedule = KeySchedule(keySchedule)
+        self.alwaysAdvance = alwaysAdvance
+        self.keyFile = keyFile
+        self.key: str = key.lower()
+        self.keyLength: int = len(self.key)
+        self._table: Tableau = self._tableau()
+
+        if self.keySchedule is KeySchedule.RUNNING:
+            if keyFile is None:
+                raise ValueError("running key schedule needs a keyFile")
+        elif self.keyLength == 0:
+            raise ValueError("key must not be empty")
+        if self.keySchedule is KeySchedule.AUTOKEY:
+            if alwaysAdvance:
+                raise ValueError("alwaysAdvance only applies to repeating and running keys")
+            if self._table.rows < self._codec.size:
+                raise ValueError(f"{type(self).__name__} cannot use its plaintext as key (autokey)")
+
+        # tableau row per key symbol: "HI" -> [7, 8] for Vigenère, i.e. rot 7 then rot 8
+        self._keyCodes: np.ndarray = self._keyRows(self.key)
+
+    @abstractmethod
+    def _tableau(self) -> Tableau: ...
+
+    def _keyRows(self, key: str) -> np.ndarray:
+        return np.array([self._ringIndex[c] for c in key], dtype=np.int64)
+
+    def _keyCodec(self) -> RingCodec:
+        # key files are free text: fold the alphabet's upper case when the ring is the alphabet
+        if self.ring == self.alphabet.lower:
+            return self.alphabet.codec
+        return self._codec
+
+    def _newKeyStream(self) -> KeyStream:
+        running = RunningKey(self.keyFile, self._keyCodec()) if self.keySchedule is KeySchedule.RUNNING else None
+        return KeyStream(self.keySchedule, self._codec.size, keyCodes=self._keyCodes,
+                         runningKey=running, alwaysAdvance=self.alwaysAdvance)
+
+    def _applyCodes(self, codes: np.ndarray, keyStream: KeyStream, inverse: bool) -> np.ndarray:
+        return keyStream.apply(codes, self._table, inverse=inverse)
+
+    def _apply(self, streamLower: str, keyStream: KeyStream, inverse: bool) -> str:
+        codec = self._codec
+        cps = codec.codepoints(streamLower)
+        codes = codec.encode(streamLower)
+        return codec.decode(self._applyCodes(codes, keyStream, inverse), original=cps)
+
+    def _run(self, streamLower: str, inverse: bool) -> str:
+        keyStream = self._newKeyStream()
+        try:
+            return self._apply(streamLower, keyStream, inverse)
+        finally:
+            keyStream.close()
+
+    def _encryptCore(self, streamLower: str) -> str:
+        return self._run(streamLower, inverse=False)
+
+    def _decryptCore(self, streamLower: str) -> str:
+        return self._run(streamLower, inverse=True)
+
+    def _streamChunks(self, chunks: Iterable[str], inverse: bool) -> Iterator[str]:
+        keyStream = self._newKeyStream()
+        try:
+            for chunk in chunks:
+                yield self._withCaseMode(chunk, lambda s: self._apply(s, keyStream, inverse))
+        finally:
+            keyStream.close()
+
+    def encryptStream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Encrypts a message given in pieces; key position carries over between chunks."""
+        return self._streamChunks(chunks, inverse=False)
+
+    def decryptStream(self, chunks: Iterable[str]) -> Iterator[str]:
+        return self._streamChunks(chunks, inverse=True)
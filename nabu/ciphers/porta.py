@@ -0,0 +1,12 @@
+from __future__ import annotations
+from nabu.ciphers.polyalphabetic import PolyalphabeticCipher
+from nabu.core.tableau import Tableau, getTableau
+
+class PortaCipher(PolyalphabeticCipher):
+    """
+    Porta cipher: key letters pair up (ab, cd, ...) and each pair swaps the two halves of the ring
+    with its own offset. Reciprocal; the ring length must be even.
+    """
+
+    def _tableau(self) -> Tableau:
+        return getTableau("porta", self._codec.size)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+from typing import Tuple
+from nabu.ciphers.transposition import TranspositionCipher
+from nabu.ciphers.basecipher import CaseMode
+
+class RailFenceCipher(TranspositionCipher):
+    """
+    Rail fence: ring symbols zig-zag over `rails` rows and are read off rail by rail.
+    """
+
+    def __init__(self, rails: int, ring: str | None = None, *,
+                 caseMode: CaseMode = CaseMode.PRESERVE,
+                 alphabet: str = "latin",
+                 blockSize: int | None = None) -> None:
+        super().__init__(ring, caseMode=caseMode, alphabet=alphabet, blockSize=blockSize)
+        if rails <= 0:
+            raise ValueError("rails must be positive")
+        self.rails = rails
+
+    @property
+    def _permKey(self) -> Tuple[str, tuple]:
+        return "railfence", (self.rails,)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+from typing import Tuple
+from nabu.ciphers.transposition import TranspositionCipher
+from nabu.ciphers.basecipher import CaseMode
+
+class RouteCipher(TranspositionCipher):
+    """
+    Route transposition: ring symbols are written row by row into a grid `cols` wide and read
+    back along a clockwise spiral from the top-left corner (empty cells of the last row skipped).
+    """
+
+    def __init__(self, cols: int, ring: str | None = None, *,
+                 caseMode: CaseMode = CaseMode.PRESERVE,
+                 alphabet: str = "latin",
+                 blockSize: int | None = None) -> None:
+        super().__init__(ring, caseMode=caseMode, alphabet=alphabet, blockSize=blockSize)
+        if cols <= 0:
+            raise ValueError("cols must be positive")
+        self.cols = cols
+
+    @property
+    def _permKey(self) -> Tuple[str, tuple]:
+        return "route", (self.cols,)
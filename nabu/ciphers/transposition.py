@@ -0,0 +1,54 @@
+from __future__ import annotations
+from abc import abstractmethod
+from typing import Tuple
+import numpy as np
+from nabu.ciphers.basecipher import Cipher, CaseMode
+from nabu.core.alphabets import getRingCodec
+from nabu.core.permute import permuteBlocks
+
+class TranspositionCipher(Cipher):
+    """
+    Shared machinery for transposition ciphers (columnar, rail fence, route, ...)
+      - Only ring symbols move; non-ring characters (spaces, punctuation) keep their positions.
+      - The permutation for a given (key, length) is built once and cached (nabu.core.permute),
+        then applied as a single gather over the code points.
+      - blockSize: permute the ring symbols in fixed-size blocks, reusing one permutation for every
+        full block (the tail gets its own), so long texts never need a message-length permutation.
+      - Case is positional in PRESERVE mode: upper-case positions stay where they were.
+    """
+
+    def __init__(self, ring: str | None = None, *,
+                 caseMode: CaseMode = CaseMode.PRESERVE,
+                 alphabet: str = "latin",
+                 blockSize: int | None = None) -> None:
+        super().__init__(caseMode=caseMode, alphabet=alphabet)
+        if blockSize is not None and blockSize <= 0:
+            raise ValueError("blockSize must be positive")
+        self.ring: str = ring if ring is not None else self.alphabet.lower
+        self._codec = getRingCodec(self.ring)
+        self.blockSize = blockSize
+
+    @property
+    @abstractmethod
+    def _permKey(self) -> Tuple[str, tuple]:
+        """(permutation kind, params) for nabu.core.permute"""
+
+    def _permuteRing(self, values: np.ndarray, inRing: np.ndarray, inverse: bool) -> np.ndarray:
+        """Moves the ring positions of `values` (code points or ring codes); others stay put."""
+        if inRing.all():
+            return permuteBlocks(values, *self._permKey, blockSize=self.blockSize, inverse=inverse)
+        out = values.copy()
+        out[inRing] = permuteBlocks(values[inRing], *self._permKey, blockSize=self.blockSize, inverse=inverse)
+        return out
+
+    def _apply(self, streamLower: str, inverse: bool) -> str:
+        codec = self._codec
+        cps = codec.codepoints(streamLower)
+        out = self._permuteRing(cps, codec.encode(streamLower) < codec.size, inverse)
+        return out.tobytes().decode("utf-32-le", "surrogatepass")
+
+    def _encryptCore(self, streamLower: str) -> str:
+        return self._apply(streamLower, inverse=False)
+
+    def _decryptCore(self, streamLower: str) -> str:
+        return self._apply(streamLower, inverse=True)
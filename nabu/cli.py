@@ -0,0 +1,293 @@
+"""
+Bulk encryption / decryption from the command line.
+
+    python -m nabu encrypt --cipher vigenere --key lemon --case preserve in/ out/
+    python -m nabu decrypt --cipher caesar --shift 3 < secret.txt > plain.txt
+    python -m nabu encrypt --cipher monosub --keyword zebra a.txt b.txt out/
+
+Files are processed concurrently by a process pool, in large buffered chunks; a throughput summary goes to
+stderr. Exit codes: 0 all inputs done, 1 some inputs failed (the rest are still written), 2 bad usage,
+130 interrupted.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from time import perf_counter
+from typing import IO, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from nabu.ciphers import (AffineCipher, BeaufortCipher, CaesarCipher, CaseMode, Cipher, ColumnarCipher,
+                          GronsfeldCipher, KeySchedule, MonoSubCipher, PolyalphabeticCipher, PortaCipher,
+                          RailFenceCipher, RouteCipher, VigenereCipher)
+from nabu.core.alphabets import getAlphabet
+from nabu.core.key import keywordToKey
+
+EXIT_OK, EXIT_FAILED, EXIT_USAGE, EXIT_INTERRUPTED = 0, 1, 2, 130
+CHUNK_CHARS = 1 << 20   # characters per read; also the I/O buffer size
+STDIO = "-"
+
+# (cipher options, inputs) that reach the workers: plain tuples so they pickle cheaply
+CipherSpec = Tuple[Tuple[str, object], ...]
+
+
+class UsageError(Exception):
+    pass
+
+
+def _require(args: Dict[str, object], *names: str) -> None:
+    missing = [f"--{n.replace('_', '-')}" for n in names if args.get(n) is None]
+    if missing:
+        raise UsageError(f"--cipher {args['cipher']} needs {', '.join(missing)}")
+
+
+def buildCipher(spec: CipherSpec) -> Cipher:
+    """Cipher from the command-line options (as a CipherSpec)."""
+    a = dict(spec)
+    common = {"caseMode": CaseMode(a["case"]), "alphabet": a["alphabet"]}
+    name = a["cipher"]
+    if name == "caesar":
+        _require(a, "shift")
+        return CaesarCipher(a["shift"], **common)
+    if name == "affine":
+        _require(a, "multi_key", "add_key")
+        return AffineCipher(a["multi_key"], a["add_key"], **common)
+    if name == "monosub":
+        if a.get("keyword") is not None:
+            return MonoSubCipher(keywordToKey(a["keyword"], getAlphabet(a["alphabet"]).lower), **common)
+        _require(a, "key")
+        return MonoSubCipher(a["key"], **common)
+    if name in POLY:
+        schedule = KeySchedule(a["key_schedule"])
+        if schedule is not KeySchedule.RUNNING:
+            _require(a, "key")
+        return POLY[name](a.get("key") or "", keySchedule=schedule, keyFile=a.get("key_file"),
+                          alwaysAdvance=a["always_advance"], **common)
+    if name == "columnar":
+        _require(a, "key")
+        return ColumnarCipher(a["key"], blockSize=a.get("block_size"), **common)
+    if name == "railfence":
+        _require(a, "rails")
+        return RailFenceCipher(a["rails"], blockSize=a.get("block_size"), **common)
+    if name == "route":
+        _require(a, "cols")
+        return RouteCipher(a["cols"], blockSize=a.get("block_size"), **common)
+    raise UsageError(f"unknown cipher '{name}'")
+
+
+POLY = {"vigenere": VigenereCipher, "beaufort": BeaufortCipher, "gronsfeld": GronsfeldCipher,
+        "porta": PortaCipher}
+CIPHERS = ("caesar", "affine", "monosub", *POLY, "columnar", "railfence", "route")
+
+
+@lru_cache(maxsize=8)
+def _workerCipher(spec: CipherSpec) -> Cipher:
+    # one cipher per worker process and spec, not one per file
+    return buildCipher(spec)
+
+
+def _chunks(f: IO[str], chunkChars: int) -> Iterator[str]:
+    while True:
+        chunk = f.read(chunkChars)
+        if not chunk:
+            return
+        yield chunk
+
+
+def transform(cipher: Cipher, src: IO[str], dst: IO[str], *, inverse: bool, chunkChars: int = CHUNK_CHARS) -> int:
+    """
+    Streams src through the cipher into dst; returns the number of characters read.
+      - polyalphabetic ciphers carry their key position across chunks (encryptStream / decryptStream)
+      - monoalphabetic ciphers are chunk-independent
+      - transpositions depend on the whole message, so they read all of src first
+    """
+    if isinstance(cipher, PolyalphabeticCipher):
+        chars = 0
+        def counted() -> Iterator[str]:
+            nonlocal chars
+            for chunk in _chunks(src, chunkChars):
+                chars += len(chunk)
+                yield chunk
+        run = cipher.decryptStream if inverse else cipher.encryptStream
+        for out in run(counted()):
+            dst.write(out)
+        return chars
+    if cipher.monoalphabetic:
+        chars = 0
+        for chunk in _chunks(src, chunkChars):
+            chars += len(chunk)
+            dst.write(cipher.decrypt(chunk) if inverse else cipher.encrypt(chunk))
+        return chars
+    text = src.read()
+    dst.write(cipher.decrypt(text) if inverse else cipher.encrypt(text))
+    return len(text)
+
+
+def _processFile(spec: CipherSpec, srcPath: str, dstPath: str, inverse: bool, encoding: str,
+                 chunkChars: int) -> Tuple[str, int, Optional[str]]:
+    """Worker job: (srcPath, characters read, error message or None). The output appears only once complete."""
+    tmp = f"{dstPath}.part"
+    try:
+        cipher = _workerCipher(spec)
+        with open(srcPath, "r", encoding=encoding, newline="", buffering=chunkChars) as src, \
+             open(tmp, "w", encoding=encoding, newline="", buffering=chunkChars) as dst:
+            chars = transform(cipher, src, dst, inverse=inverse, chunkChars=chunkChars)
+        os.replace(tmp, dstPath)
+        return srcPath, chars, None
+    except Exception as exc:  # reported per file; one bad input must not stop the batch
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        return srcPath, 0, f"{type(exc).__name__}: {exc}"
+
+
+def planJobs(inputs: Sequence[str], dest: str) -> List[Tuple[str, str]]:
+    """
+    (source file, destination file) pairs. Directories are walked recursively and mirrored under dest;
+    several inputs (or any directory) need dest to be a directory.
+    """
+    toDir = len(inputs) > 1 or any(os.path.isdir(p) for p in inputs) or os.path.isdir(dest) \
+        or dest.endswith(os.sep)
+    jobs: List[Tuple[str, str]] = []
+    for path in inputs:
+        if os.path.isdir(path):
+            root = os.path.normpath(path)
+            for dirPath, dirNames, fileNames in os.walk(root):
+                dirNames.sort()
+                for fn in sorted(fileNames):
+                    src = os.path.join(dirPath, fn)
+                    jobs.append((src, os.path.join(dest, os.path.relpath(src, root))))
+        elif os.path.exists(path):
+            jobs.append((path, os.path.join(dest, os.path.basename(path)) if toDir else dest))
+        else:
+            raise UsageError(f"no such file or directory: {path}")
+    return jobs
+
+
+def _parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog="nabu", description="Encrypt or decrypt files with a nabu cipher.")
+    p.add_argument("mode", choices=("encrypt", "decrypt"))
+    p.add_argument("paths", nargs="*", metavar="PATH",
+                   help="SRC... DEST (files or directories); one SRC writes to stdout, none reads stdin")
+    g = p.add_argument_group("cipher")
+    g.add_argument("--cipher", required=True, choices=CIPHERS)
+    g.add_argument("--key", help="key word / key alphabet (vigenere, beaufort, gronsfeld, porta, monosub, columnar)")
+    g.add_argument("--keyword", help="monosub: expand a keyword into the key alphabet")
+    g.add_argument("--shift", type=int, help="caesar rotation")
+    g.add_argument("--multi-key", type=int, help="affine a in a*x + b")
+    g.add_argument("--add-key", type=int, help="affine b in a*x + b")
+    g.add_argument("--rails", type=int, help="railfence rails")
+    g.add_argument("--cols", type=int, help="route columns")
+    g.add_argument("--block-size", type=int, help="transpositions: permute in blocks of this many symbols")
+    g.add_argument("--key-schedule", default=KeySchedule.REPEAT.value, choices=[s.value for s in KeySchedule])
+    g.add_argument("--key-file", help="running-key text file")
+    g.add_argument("--always-advance", action="store_true", help="every character consumes a key position")
+    g.add_argument("--case", default=CaseMode.PRESERVE.value, choices=[c.value for c in CaseMode])
+    g.add_argument("--alphabet", default="latin")
+    io = p.add_argument_group("i/o")
+    io.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    io.add_argument("--chunk-chars", type=int, default=CHUNK_CHARS, help="characters per read / buffer size")
+    io.add_argument("--encoding", default="utf-8")
+    io.add_argument("--force", action="store_true", help="overwrite existing outputs")
+    io.add_argument("--quiet", action="store_true", help="no progress or throughput on stderr")
+    return p
+
+
+def _specFrom(ns: argparse.Namespace) -> CipherSpec:
+    names = ("cipher", "key", "keyword", "shift", "multi_key", "add_key", "rails", "cols", "block_size",
+             "key_schedule", "key_file", "always_advance", "case", "alphabet")
+    return tuple((n, getattr(ns, n)) for n in names)
+
+
+def _report(quiet: bool, msg: str) -> None:
+    if not quiet:
+        print(msg, file=sys.stderr)
+
+
+def _rate(chars: int, seconds: float) -> str:
+    return f"{chars / 1e6:.2f}M chars in {seconds:.2f}s ({chars / 1e6 / max(seconds, 1e-9):.1f}M chars/s"
+
+
+def _runStdio(cipher: Cipher, srcPath: str, ns: argparse.Namespace, inverse: bool) -> int:
+    """stdin (or one file) to stdout; returns the number of characters read"""
+    out = open(sys.stdout.fileno(), "w", encoding=ns.encoding, newline="", buffering=ns.chunk_chars,
+               closefd=False)
+    if srcPath == STDIO:
+        src = open(sys.stdin.fileno(), "r", encoding=ns.encoding, newline="", buffering=ns.chunk_chars,
+                   closefd=False)
+    else:
+        src = open(srcPath, "r", encoding=ns.encoding, newline="", buffering=ns.chunk_chars)
+    with src, out:
+        return transform(cipher, src, out, inverse=inverse, chunkChars=ns.chunk_chars)
+
+
+def _runFiles(spec: CipherSpec, jobs: List[Tuple[str, str]], ns: argparse.Namespace,
+              inverse: bool) -> Tuple[int, int, List[str]]:
+    """Runs every (src, dst) job; returns (files done, characters read, failures)."""
+    failures: List[str] = []
+    done = total = 0
+    for _, dst in jobs:
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    args = [(spec, src, dst, inverse, ns.encoding, ns.chunk_chars) for src, dst in jobs]
+    workers = min(ns.workers or os.cpu_count() or 1, len(jobs))
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    if pool is None:
+        results = (_processFile(*a) for a in args)
+    else:
+        results = (f.result() for f in as_completed([pool.submit(_processFile, *a) for a in args]))
+    try:
+        for src, chars, error in results:
+            if error is None:
+                done += 1
+                total += chars
+            else:
+                failures.append(f"{src}: {error}")
+                _report(ns.quiet, f"nabu: {src}: {error}")
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return done, total, failures
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    try:
+        ns = _parser().parse_intermixed_args(argv)
+    except SystemExit as exc:  # argparse: --help is 0, bad usage 2
+        return int(exc.code or 0)
+    inverse = ns.mode == "decrypt"
+    verb = f"{ns.mode}ed"
+    t0 = perf_counter()
+    try:
+        if ns.chunk_chars <= 0 or (ns.workers is not None and ns.workers <= 0):
+            raise UsageError("--chunk-chars and --workers must be positive")
+        spec = _specFrom(ns)
+        cipher = buildCipher(spec)  # bad options fail here, before any output or worker exists
+        jobs = planJobs(ns.paths[:-1], ns.paths[-1]) if len(ns.paths) > 1 else []
+        existing = [dst for _, dst in jobs if os.path.exists(dst)]
+        if existing and not ns.force:
+            raise UsageError(f"{existing[0]} exists ({len(existing)} outputs in total); use --force")
+    except (UsageError, ValueError, OSError) as exc:
+        print(f"nabu: error: {exc}", file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        if len(ns.paths) <= 1:
+            chars = _runStdio(cipher, ns.paths[0] if ns.paths else STDIO, ns, inverse)
+            _report(ns.quiet, f"nabu: {verb} {_rate(chars, perf_counter() - t0)})")
+            return EXIT_OK
+        done, chars, failures = _runFiles(spec, jobs, ns, inverse)
+    except KeyboardInterrupt:
+        print("nabu: interrupted", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    except BrokenPipeError:  # e.g. piped into head: stop quietly, and keep the interpreter's exit flush quiet too
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_FAILED
+    except (ValueError, OSError) as exc:  # stdin / single-file mode: nothing else to carry on with
+        print(f"nabu: error: {exc}", file=sys.stderr)
+        return EXIT_FAILED
+    seconds = perf_counter() - t0
+    _report(ns.quiet, f"nabu: {verb} {done}/{len(jobs)} files, {_rate(chars, seconds)}, "
+                      f"{done / max(seconds, 1e-9):.1f} files/s)")
+    return EXIT_FAILED if failures else EXIT_OK
@@ -3,7 +3,9 @@ from dataclasses import dataclass
 from functools import lru_cache
 import json
 from importlib.resources import files
-from typing import Dict, FrozenSet, Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -42,6 +44,85 @@ class AlphabetPair:
         """Check if char in alphabet and works for either case"""
         return ch in self.lowerSet or ch in self.upperSet
 
+    @property
+    def codec(self) -> "RingCodec":
+        """Shared encoder/decoder for this alphabet (both cases map to the same ring index)"""
+        return getRingCodec(self.lower, self.upper)
+
+
+class RingCodec:
+    """
+    Text <-> ring-index arrays, shared by every vectorised path.
+      - encode(): index per character, `size` (the sentinel) for anything outside the ring
+      - dtype is the smallest unsigned type that holds size + 1 values (uint8 up to 255 symbols)
+      - an optional upper ring folds onto the same indices; encodeCased() also returns which were upper
+    Build through getRingCodec so instances are cached and shared.
+    """
+    __slots__ = ("ring", "upper", "size", "dtype", "index", "_lut", "_upperLut", "_lowerCps", "_upperCps")
+
+    def __init__(self, ring: str, upper: Optional[str] = None) -> None:
+        if len(set(ring)) != len(ring):
+            raise ValueError("ring must contain unique symbols")
+        if upper is not None and len(upper) != len(ring):
+            raise ValueError("ring lower/upper length mismatch")
+        self.ring = ring
+        self.upper = upper
+        self.size = m = len(ring)
+        self.dtype = np.uint8 if m <= 0xFF else (np.uint16 if m <= 0xFFFF else np.uint32)
+        self.index: Dict[str, int] = {c: i for i, c in enumerate(ring)}
+
+        self._lowerCps = np.array([ord(c) for c in ring], dtype=np.uint32)
+        self._upperCps = np.array([ord(c) for c in upper], dtype=np.uint32) if upper is not None else self._lowerCps
+        top = int(max(self._lowerCps.max(initial=0), self._upperCps.max(initial=0))) + 1
+        # dense code point -> index table; the extra last slot catches every code point above the ring
+        self._lut = np.full(top + 1, m, dtype=self.dtype)
+        self._upperLut = np.zeros(top + 1, dtype=bool)
+        if upper is not None:
+            self._lut[self._upperCps] = np.arange(m, dtype=self.dtype)
+            self._upperLut[self._upperCps] = True
+        self._lut[self._lowerCps] = np.arange(m, dtype=self.dtype)
+        self._upperLut[self._lowerCps] = False
+
+    @staticmethod
+    def codepoints(text: str) -> np.ndarray:
+        return np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+
+    def _clip(self, cps: np.ndarray) -> np.ndarray:
+        return np.minimum(cps, self._lut.size - 1)
+
+    def encode(self, text: str) -> np.ndarray:
+        return self._lut[self._clip(self.codepoints(text))]
+
+    def encodeCased(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(codes, isUpper) where isUpper marks characters taken from the upper ring"""
+        idx = self._clip(self.codepoints(text))
+        return self._lut[idx], self._upperLut[idx]
+
+    def decode(self, codes: np.ndarray, *, upperMask: Optional[np.ndarray] = None,
+               original: Optional[np.ndarray] = None) -> str:
+        """
+        Back to text. Sentinel positions take their code point from `original`
+        (codepoints of the source text); without it every code must be inside the ring.
+        """
+        codes = np.asarray(codes)
+        inRing = codes < self.size
+        safe = np.where(inRing, codes, 0) if original is not None else codes
+        cps = self._lowerCps[safe]
+        if upperMask is not None:
+            cps = np.where(upperMask, self._upperCps[safe], cps)
+        if original is not None:
+            cps = np.where(inRing, cps, original)
+        return cps.astype("<u4", copy=False).tobytes().decode("utf-32-le", "surrogatepass")
+
+    def ringOnly(self, codes: np.ndarray) -> np.ndarray:
+        """Drops sentinel positions (symbols outside the ring)."""
+        return codes[codes < self.size]
+
+
+@lru_cache(maxsize=256)
+def getRingCodec(ring: str, upper: Optional[str] = None) -> RingCodec:
+    return RingCodec(ring, upper)
+
 
 @lru_cache(maxsize=None)
 def loadAlphabetData() -> dict:
@@ -49,12 +130,37 @@ def loadAlphabetData() -> dict:
     return json.loads(txt)
 
 
+# alphabets added at runtime; they shadow alphabets.json entries of the same name
+_registered: Dict[str, dict] = {}
+
+
+def registerAlphabet(name: str, lowercase: str, uppercase: Optional[str] = None, *,
+                     overwrite: bool = False) -> AlphabetPair:
+    """
+    Adds an alphabet at runtime. Caseless scripts may omit `uppercase`; it then mirrors lowercase.
+    """
+    if not overwrite and (name in _registered or name in loadAlphabetData()):
+        raise ValueError(f"alphabet '{name}' already exists")
+    upper = lowercase if uppercase is None else uppercase
+    if len(set(lowercase)) != len(lowercase) or len(set(upper)) != len(upper):
+        raise ValueError("alphabet symbols must be unique")
+    if upper != lowercase and set(lowercase) & set(upper):
+        raise ValueError("lower and upper cases must not share symbols")
+    _registered[name] = {"lowercase": lowercase, "uppercase": upper}
+    getAlphabet.cache_clear()
+    return getAlphabet(name)
+
+
+def alphabetNames() -> List[str]:
+    return sorted(set(loadAlphabetData()) | set(_registered))
+
+
 @lru_cache(maxsize=None)
 def getAlphabet(name: str = "latin") -> AlphabetPair:
     data = loadAlphabetData()
-    if name not in data:
+    entry = _registered.get(name) or data.get(name)
+    if entry is None:
         raise ValueError(f"alphabet '{name}' not found")
-    entry = data[name]
     lo, up = entry["lowercase"], entry["uppercase"]
     if len(lo) != len(up):
         raise ValueError("alphabet lower/upper length mismatch")
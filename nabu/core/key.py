@@ -1,6 +1,11 @@
 from __future__ import annotations
 import random
 import string
+from typing import List, Sequence
+
+import numpy as np
+
+from nabu.core.alphabets import getRingCodec
 
 def generateRandomKey(ring: str = string.ascii_lowercase, seed: int | None = None) -> str:
     rng = random.Random(seed)
@@ -17,4 +22,80 @@ def keywordToKey(keyword: str, ring: str = string.ascii_lowercase) -> str:
             seen.add(lc)
             kept.append(lc)
     remainder = [c for c in ring if c not in seen]
-    return "".join(kept + remainder)
\ No newline at end of file
+    return "".join(kept + remainder)
+
+# key i of a seed is the argsort of draws i*m .. i*m + m - 1 of one PCG64 stream; PCG64.advance jumps
+# straight there, so a key never depends on the batch it came in and one key costs O(m) to reproduce
+KEY_CHUNK_DRAWS = 1 << 20  # uniforms drawn per step of a batch (8 MB of float64)
+
+
+def _keyDtype(m: int) -> type:
+    return np.uint8 if m <= 0xFF else (np.uint16 if m <= 0xFFFF else np.uint32)
+
+
+def _keyStream(seed: int, start: int, m: int) -> np.random.Generator:
+    bitGen = np.random.PCG64(seed)
+    bitGen.advance(start * m)  # one 64-bit draw per uniform
+    return np.random.Generator(bitGen)
+
+
+def randomKeyMatrix(n: int, ring: str = string.ascii_lowercase, seed: int | None = None, *,
+                    start: int = 0) -> np.ndarray:
+    """
+    (n, |ring|) matrix of random keys, row i a permutation of ring indices (plaintext index -> key index).
+    Rows are keys start .. start + n - 1 of `seed`: randomKeyAt(seed, i) is row i - start.
+    seed=None draws a fresh seed (the batch is then not reproducible).
+    """
+    if n < 0 or start < 0:
+        raise ValueError("n and start must be non-negative")
+    if seed is None:
+        seed = int(np.random.SeedSequence().generate_state(1, dtype=np.uint64)[0])
+    m = len(ring)
+    keys = np.empty((n, m), dtype=_keyDtype(m))
+    gen = _keyStream(seed, start, m)
+    step = max(1, KEY_CHUNK_DRAWS // max(m, 1))
+    for lo in range(0, n, step):
+        hi = min(lo + step, n)
+        keys[lo:hi] = gen.random((hi - lo, m)).argsort(axis=1)
+    return keys
+
+
+def randomKeyAt(seed: int, index: int, ring: str = string.ascii_lowercase) -> str:
+    """Key `index` of randomKeyMatrix(..., seed=seed), as a string; O(|ring|) whatever the index"""
+    if index < 0:
+        raise ValueError("index must be non-negative")
+    m = len(ring)
+    row = _keyStream(seed, index, m).random(m).argsort().astype(_keyDtype(m))
+    return getRingCodec(ring).decode(row)
+
+
+def keywordKeyMatrix(keywords: Sequence[str], ring: str = string.ascii_lowercase) -> np.ndarray:
+    """
+    keywordToKey for a batch of keywords, as an (N, |ring|) index matrix: each row is the keyword's
+    distinct ring letters in first-seen order, then the rest of the ring.
+    """
+    codec = getRingCodec(ring)
+    m = codec.size
+    lowered = [k.lower() for k in keywords]
+    lengths = np.array([len(k) for k in lowered], dtype=np.int64)
+    width = int(lengths.max(initial=0))
+    # keyword letters (sentinel m for padding / non-ring characters) followed by the whole ring
+    seq = np.full((len(lowered), width + m), m, dtype=np.int64)
+    seq[:, :width][np.arange(width) < lengths[:, None]] = codec.encode("".join(lowered))
+    seq[:, width:] = np.arange(m)
+    # first position of every symbol per row: write columns back to front so the earliest one wins
+    firstSeen = np.empty((len(lowered), m + 1), dtype=np.int64)
+    rows = np.arange(len(lowered))
+    for col in range(seq.shape[1] - 1, -1, -1):
+        firstSeen[rows, seq[:, col]] = col
+    return np.argsort(firstSeen[:, :m], axis=1, kind="stable").astype(_keyDtype(m))
+
+
+def keysToStrings(keys: np.ndarray, ring: str = string.ascii_lowercase) -> List[str]:
+    """Key matrix rows back to the key strings MonoSubCipher(keyAlphabet=...) takes"""
+    keys = np.asarray(keys)
+    m = len(ring)
+    if keys.ndim != 2 or keys.shape[1] != m:
+        raise ValueError(f"keys must be an (N, {m}) matrix")
+    text = getRingCodec(ring).decode(keys.reshape(-1))
+    return [text[i:i + m] for i in range(0, len(text), m)]
@@ -0,0 +1,105 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+PERMUTATION_CACHE_SIZE = 256
+# longer permutations are built per call: an entry pins 16 bytes per symbol, and whole-message lengths
+# (blockSize=None) rarely repeat, so the cache stays under 256 * 16 * 16384 bytes = 64 MB
+PERMUTATION_CACHE_MAX_LEN = 1 << 14
+
+# a permutation is a gather: out[i] = data[perm[i]]
+PermBuilder = Callable[..., np.ndarray]
+
+
+def _columnar(n: int, order: Tuple[int, ...]) -> np.ndarray:
+    # written row by row into len(order) columns, read column by column; order[c] = rank of column c
+    i = np.arange(n)
+    rank = np.asarray(order)
+    return np.lexsort((i, rank[i % rank.size]))
+
+
+def _railfence(n: int, rails: int) -> np.ndarray:
+    i = np.arange(n)
+    if rails <= 1:
+        return i
+    cycle = 2 * (rails - 1)
+    t = i % cycle
+    return np.lexsort((i, np.where(t < rails, t, cycle - t)))
+
+
+def _route(n: int, cols: int) -> np.ndarray:
+    # written row by row into `cols` columns, read clockwise spiral from the top-left; empty cells skipped
+    rows = -(-n // cols)
+    top, bottom, left, right = 0, rows - 1, 0, cols - 1
+    out = []
+    while top <= bottom and left <= right:
+        out.extend(top * cols + c for c in range(left, right + 1))
+        out.extend(r * cols + right for r in range(top + 1, bottom + 1))
+        if top < bottom:
+            out.extend(bottom * cols + c for c in range(right - 1, left - 1, -1))
+        if left < right:
+            out.extend(r * cols + left for r in range(bottom - 1, top, -1))
+        top, bottom, left, right = top + 1, bottom - 1, left + 1, right - 1
+    order = np.asarray(out, dtype=np.int64)
+    return order[order < n]
+
+
+_BUILDERS: Dict[str, PermBuilder] = {
+    "columnar": _columnar,
+    "railfence": _railfence,
+    "route": _route,
+}
+
+
+def _build(kind: str, n: int, params: tuple) -> Tuple[np.ndarray, np.ndarray]:
+    perm = _BUILDERS[kind](n, *params).astype(np.int64)
+    inv = np.empty_like(perm)
+    inv[perm] = np.arange(n)
+    perm.flags.writeable = False
+    inv.flags.writeable = False
+    return perm, inv
+
+
+_cached = lru_cache(maxsize=PERMUTATION_CACHE_SIZE)(_build)
+
+
+def getPermutation(kind: str, n: int, *params) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (forward, inverse) position permutations of length n, cached per (kind, n, params) up to
+    PERMUTATION_CACHE_MAX_LEN. Arrays are read-only (shared when cached).
+    """
+    if kind not in _BUILDERS:
+        raise ValueError(f"unknown permutation kind '{kind}'")
+    if n > PERMUTATION_CACHE_MAX_LEN:
+        return _build(kind, n, params)
+    return _cached(kind, n, params)
+
+
+def permuteBlocks(data: np.ndarray, kind: str, params: tuple, *, blockSize: Optional[int] = None,
+                  inverse: bool = False) -> np.ndarray:
+    """
+    Gathers `data` through the (kind, params) permutation. With blockSize, every full block reuses
+    one cached permutation (a single 2-D gather) and the tail gets its own.
+    """
+    n = data.size
+    which = 1 if inverse else 0
+    if blockSize is None or n <= blockSize:
+        return data[getPermutation(kind, n, *params)[which]]
+    full = n - n % blockSize
+    out = np.empty_like(data)
+    perm = getPermutation(kind, blockSize, *params)[which]
+    out[:full] = data[:full].reshape(-1, blockSize)[:, perm].reshape(-1)
+    if full < n:
+        out[full:] = data[full:][getPermutation(kind, n - full, *params)[which]]
+    return out
+
+
+def permutationCacheInfo():
+    """functools-style (hits, misses, maxsize, currsize)"""
+    return _cached.cache_info()
+
+
+def clearPermutationCache() -> None:
+    _cached.cache_clear()
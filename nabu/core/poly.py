@@ -0,0 +1,149 @@
+from __future__ import annotations
+from enum import Enum
+from typing import IO, Optional, Tuple
+
+import numpy as np
+
+from nabu.core.alphabets import RingCodec
+from nabu.core.tableau import Tableau
+
+
+class KeySchedule(str, Enum):
+    REPEAT = "repeat"     # short key, cycled
+    AUTOKEY = "autokey"   # primer key, then the plaintext itself
+    RUNNING = "running"   # key text at least as long as the message, read from a file
+
+
+def autokeySelectors(history: np.ndarray, plainCodes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Autokey key stream for one block: the pending `history` (primer, or the last len(primer) plaintext
+    symbols of the previous block) followed by the plaintext. Returns (selectors, nextHistory).
+    """
+    stream = np.concatenate([history, plainCodes])
+    n = plainCodes.size
+    return stream[:n], stream[n:]
+
+
+def autokeyDecrypt(tableau: Tableau, cipherCodes: np.ndarray, history: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inverts autokey one key-length block at a time: block j is gathered with block j - 1 as selector.
+    Additive tableaux skip even that loop: p[i] = c[i] - p[i - L], so each column of the (blocks, L)
+    reshape is an alternating cumulative sum seeded by -history.
+    Returns (plainCodes, nextHistory).
+    """
+    L = history.size
+    n = cipherCodes.size
+    if n == 0:
+        return cipherCodes.astype(np.int64), history
+    rows = -(-n // L)
+    c = np.zeros(rows * L, dtype=np.int64)
+    c[:n] = cipherCodes
+    c = c.reshape(rows, L)
+    if tableau.additive:
+        sign = np.where(np.arange(rows) % 2 == 0, 1, -1)[:, None]
+        q = np.cumsum(sign * c, axis=0) - history.astype(np.int64)
+        p = ((sign * q) % tableau.size).reshape(-1)[:n]
+    else:
+        p2 = np.empty_like(c)
+        prev = history.astype(np.int64)
+        for j in range(rows):
+            prev = p2[j] = tableau.apply(c[j], prev, inverse=True)
+        p = p2.reshape(-1)[:n]
+    return p, np.concatenate([history, p])[n:]
+
+
+class RunningKey:
+    """
+    Streams key symbols out of a text file in fixed-size chunks; symbols outside the ring are skipped.
+    Only the codes handed out by take() (plus one chunk of look-ahead) are ever in memory.
+    """
+    def __init__(self, path: str, codec: RingCodec, *, chunkChars: int = 1 << 16, encoding: str = "utf-8") -> None:
+        if chunkChars <= 0:
+            raise ValueError("chunkChars must be positive")
+        self.path = path
+        self.codec = codec
+        self.chunkChars = chunkChars
+        self.encoding = encoding
+        self._f: Optional[IO[str]] = None
+        self._buf = np.empty(0, dtype=np.int64)
+
+    def take(self, n: int) -> np.ndarray:
+        out = np.empty(n, dtype=np.int64)
+        filled = 0
+        while filled < n:
+            if self._buf.size == 0:
+                self._buf = self._read()
+            k = min(n - filled, self._buf.size)
+            out[filled:filled + k] = self._buf[:k]
+            self._buf = self._buf[k:]
+            filled += k
+        return out
+
+    def _read(self) -> np.ndarray:
+        if self._f is None:
+            self._f = open(self.path, "r", encoding=self.encoding)
+        while True:
+            text = self._f.read(self.chunkChars)
+            if not text:
+                raise ValueError(f"running key '{self.path}' is shorter than the message")
+            codes = self.codec.ringOnly(self.codec.encode(text))
+            if codes.size:
+                return codes.astype(np.int64)
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        self._buf = np.empty(0, dtype=np.int64)
+
+
+class KeyStream:
+    """
+    Key position for one message: encrypt()/decrypt() start a fresh one, stream APIs keep one across chunks.
+      - alwaysAdvance: every character consumes a key position, not just ring symbols
+      - `apply` takes ring codes (sentinel = m for non-ring characters), picks a tableau row per ring
+        symbol from the key and returns the substituted codes
+    """
+    def __init__(self, schedule: KeySchedule, m: int, *, keyCodes: Optional[np.ndarray] = None,
+                 runningKey: Optional[RunningKey] = None, alwaysAdvance: bool = False) -> None:
+        self.schedule = schedule
+        self.m = m
+        self.alwaysAdvance = alwaysAdvance
+        self._key = np.asarray(keyCodes, dtype=np.int64) if keyCodes is not None else None
+        self._running = runningKey
+        self._history = self._key  # autokey only
+        self._pos = 0
+
+    def apply(self, codes: np.ndarray, tableau: Tableau, *, inverse: bool = False) -> np.ndarray:
+        inRing = codes < self.m
+        vals = codes[inRing].astype(np.int64)
+        if self.schedule is KeySchedule.AUTOKEY:
+            if inverse:
+                substituted, self._history = autokeyDecrypt(tableau, vals, self._history)
+            else:
+                selector, self._history = autokeySelectors(self._history, vals)
+                substituted = tableau.apply(vals, selector)
+        else:
+            substituted = tableau.apply(vals, self._selectors(inRing), inverse=inverse)
+        out = codes.copy()
+        out[inRing] = substituted
+        return out
+
+    def _selectors(self, inRing: np.ndarray) -> np.ndarray:
+        if self.schedule is KeySchedule.RUNNING:
+            if self.alwaysAdvance:
+                return self._running.take(inRing.size)[inRing]
+            return self._running.take(int(inRing.sum()))
+        # repeating key: positions are counted in characters (alwaysAdvance) or in ring symbols
+        if self.alwaysAdvance:
+            positions = self._pos + np.flatnonzero(inRing)
+            self._pos += inRing.size
+        else:
+            n = int(inRing.sum())
+            positions = self._pos + np.arange(n)
+            self._pos += n
+        return self._key[positions % self._key.size]
+
+    def close(self) -> None:
+        if self._running is not None:
+            self._running.close()
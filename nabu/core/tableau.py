@@ -0,0 +1,99 @@
+from __future__ import annotations
+from functools import lru_cache
+
+import numpy as np
+
+# standard tableaux over rings larger than this are computed per symbol, not stored as (rows, m) arrays
+DENSE_TABLEAU_MAX = 256
+
+
+def _codeDtype(m: int) -> type:
+    return np.uint8 if m <= 0xFF else (np.uint16 if m <= 0xFFFF else np.uint32)
+
+
+class Tableau:
+    """
+    Precomputed (k, m) polyalphabetic tableau: row r maps ring index x -> table[r, x].
+    A whole message is one gather, table[selector, codes], whatever the cipher.
+      - additive: row r is the plain shift x + r (lets autokey decryption use a closed form)
+    Shared through getTableau; treat the arrays as read-only.
+    """
+    __slots__ = ("kind", "table", "inverse", "rows", "size", "additive")
+
+    def __init__(self, table: np.ndarray, *, kind: str = "custom", additive: bool = False) -> None:
+        table = np.asarray(table)
+        if table.ndim != 2:
+            raise ValueError("tableau must be a (rows, ring) array")
+        self.rows, self.size = table.shape
+        if not np.array_equal(np.sort(table, axis=1), np.broadcast_to(np.arange(self.size), table.shape)):
+            raise ValueError("every tableau row must be a permutation of the ring")
+        self.kind = kind
+        self.table = table.astype(_codeDtype(self.size))
+        self.inverse = np.argsort(table, axis=1).astype(self.table.dtype)
+        self.additive = additive
+
+    def apply(self, codes: np.ndarray, selector: np.ndarray, *, inverse: bool = False) -> np.ndarray:
+        """codes: ring indices, selector: row per position (same length)"""
+        return (self.inverse if inverse else self.table)[selector, codes]
+
+
+class ArithmeticTableau(Tableau):
+    """
+    Standard tableau whose rows are computed from (selector, code) instead of looked up, for large rings
+    where the dense arrays do not fit (5000 symbols would be 25M cells per direction).
+    Same apply() contract as Tableau; `table` and `inverse` are None.
+    """
+    __slots__ = ()
+
+    def __init__(self, kind: str, m: int, rows: int) -> None:
+        self.kind = kind
+        self.rows = rows
+        self.size = m
+        self.table = self.inverse = None
+        self.additive = kind in ("vigenere", "gronsfeld")
+
+    def apply(self, codes: np.ndarray, selector: np.ndarray, *, inverse: bool = False) -> np.ndarray:
+        m = self.size
+        x = codes.astype(np.int64)
+        k = selector.astype(np.int64)
+        if self.additive:
+            return (x - k if inverse else x + k) % m
+        if self.kind == "beaufort":
+            return (k - x) % m  # reciprocal
+        # porta (reciprocal): pair k // 2 swaps the two halves of the ring with opposite shifts
+        h = m // 2
+        j = k // 2
+        return np.where(x < h, h + (x + j) % h, (x - h - j) % h)
+
+
+def _shiftRows(m: int, shifts: np.ndarray) -> np.ndarray:
+    return (np.arange(m)[None, :] + shifts[:, None]) % m
+
+
+@lru_cache(maxsize=64)
+def getTableau(kind: str, m: int) -> Tableau:
+    """
+    Standard tableaux over a ring of size m, cached per (kind, m):
+      vigenere  - m rows, row k: x + k
+      beaufort  - m rows, row k: k - x (reciprocal)
+      gronsfeld - 10 rows, row d: x + d (digit keys)
+      porta     - m rows, row k uses Porta pair k // 2 (reciprocal, m must be even)
+    Rings above DENSE_TABLEAU_MAX symbols get an ArithmeticTableau with the same rows.
+    """
+    if kind not in ("vigenere", "beaufort", "gronsfeld", "porta"):
+        raise ValueError(f"unknown tableau kind '{kind}'")
+    if kind == "porta" and m % 2:
+        raise ValueError("porta needs a ring of even length")
+    if m > DENSE_TABLEAU_MAX:
+        return ArithmeticTableau(kind, m, 10 if kind == "gronsfeld" else m)
+    x = np.arange(m)
+    if kind == "vigenere":
+        return Tableau(_shiftRows(m, np.arange(m)), kind=kind, additive=True)
+    if kind == "beaufort":
+        return Tableau((np.arange(m)[:, None] - x[None, :]) % m, kind=kind)
+    if kind == "gronsfeld":
+        return Tableau(_shiftRows(m, np.arange(10)), kind=kind, additive=True)
+    h = m // 2
+    j = (np.arange(m) // 2)[:, None]
+    table = np.where(x < h, h + (x + j) % h, (x - h - j) % h)
+    return Tableau(table, kind=kind)
@@ -0,0 +1,128 @@
+from __future__ import annotations
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from nabu.core.alphabets import RingCodec, getRingCodec
+from nabu.core.rotate import rotateTable
+from nabu.core.mod import affineTable, invAffineTable
+from nabu.core.bijection import bijectionTable, invertBijectionTable
+
+Table = Dict[int, int]
+TABLE_CACHE_SIZE = 1024
+# rings with more symbols than this skip str.translate dicts and work on ring-index arrays (see RingMap)
+LARGE_RING = 256
+
+
+def _rotate(ring: str, rotation: int) -> Tuple[Table, Table]:
+    return rotateTable(ring, rotation), rotateTable(ring, -rotation)
+
+
+def _affine(ring: str, multiKey: int, addKey: int) -> Tuple[Table, Table]:
+    m = len(ring)
+    return (affineTable(ring=ring, ringLength=m, multiKey=multiKey, addKey=addKey),
+            invAffineTable(ring=ring, ringLength=m, multiKey=multiKey, addKey=addKey))
+
+
+def _bijection(ring: str, key: str) -> Tuple[Table, Table]:
+    table = bijectionTable(key, ring)
+    return table, invertBijectionTable(table)
+
+
+_BUILDERS: Dict[str, Callable[..., Tuple[Table, Table]]] = {
+    "rotate": _rotate,
+    "affine": _affine,
+    "bijection": _bijection,
+}
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _cached(kind: str, ring: str, params: tuple) -> Tuple[Table, Table]:
+    return _BUILDERS[kind](ring, *params)
+
+
+def cipherTables(kind: str, ring: str, *params) -> Tuple[Table, Table]:
+    """
+    (forward, inverse) str.translate tables from a bounded LRU shared by every cipher instance.
+    Tables are shared objects: treat them as read-only.
+    Numeric params are reduced mod |ring| first so equivalent keys share one entry.
+    """
+    if kind not in _BUILDERS:
+        raise ValueError(f"unknown table kind '{kind}'")
+    m = len(ring)
+    if kind in ("rotate", "affine"):
+        params = tuple(p % m for p in params)
+    return _cached(kind, ring, params)
+
+
+def tableCacheInfo():
+    """functools-style (hits, misses, maxsize, currsize)"""
+    return _cached.cache_info()
+
+
+def clearTableCache() -> None:
+    _cached.cache_clear()
+    _cachedMap.cache_clear()
+
+
+def isLargeRing(ring: str) -> bool:
+    return len(ring) > LARGE_RING
+
+
+class RingMap:
+    """
+    Monoalphabetic substitution on ring indices, for rings too large for per-symbol dicts:
+      - rotate: (x + r) % m and affine: (a*x + b) % m are computed, nothing is stored
+      - bijection: one dense index array per direction (m entries, smallest unsigned dtype)
+    Text goes through the ring's shared RingCodec; non-ring characters pass through.
+    """
+    __slots__ = ("codec", "kind", "params", "_fwd", "_inv")
+
+    def __init__(self, kind: str, ring: str, *params) -> None:
+        self.codec: RingCodec = getRingCodec(ring)
+        self.kind = kind
+        self.params = params
+        self._fwd: Optional[np.ndarray] = None
+        self._inv: Optional[np.ndarray] = None
+        m = self.codec.size
+        if kind == "affine":
+            self.params = (params[0], params[1], pow(params[0], -1, m))
+        elif kind == "bijection":
+            self._fwd = self.codec.encode(params[0]).astype(self.codec.dtype)
+            if self._fwd.size != m or np.any(self._fwd == m):
+                raise ValueError("bijection key must be a permutation of the ring")
+            self._inv = np.empty_like(self._fwd)
+            self._inv[self._fwd] = np.arange(m, dtype=self._fwd.dtype)
+        elif kind != "rotate":
+            raise ValueError(f"unknown table kind '{kind}'")
+
+    def mapCodes(self, codes: np.ndarray, *, inverse: bool = False) -> np.ndarray:
+        """ring codes (sentinel = m for non-ring characters) -> substituted codes"""
+        m = self.codec.size
+        inRing = codes < m
+        x = np.where(inRing, codes, 0).astype(np.int64)
+        if self.kind == "rotate":
+            y = (x - self.params[0] if inverse else x + self.params[0]) % m
+        elif self.kind == "affine":
+            a, b, aInv = self.params
+            y = (aInv * (x - b) if inverse else a * x + b) % m
+        else:
+            y = (self._inv if inverse else self._fwd)[x]
+        return np.where(inRing, y, m)
+
+    def translate(self, streamLower: str, *, inverse: bool = False) -> str:
+        cps = self.codec.codepoints(streamLower)
+        return self.codec.decode(self.mapCodes(self.codec.encode(streamLower), inverse=inverse), original=cps)
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _cachedMap(kind: str, ring: str, params: tuple) -> RingMap:
+    return RingMap(kind, ring, *params)
+
+
+def ringMap(kind: str, ring: str, *params) -> RingMap:
+    """cipherTables() for large rings: a shared RingMap, with numeric params reduced mod |ring|"""
+    if kind in ("rotate", "affine"):
+        params = tuple(p % len(ring) for p in params)
+    return _cachedMap(kind, ring, params)
@@ -0,0 +1,101 @@
+# nabu/eval/asyncstream.py
+from __future__ import annotations
+import asyncio
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Sequence
+
+from .streaming import default_clean_text
+
+_END = object()
+
+
+def _nextBatch(it, size: int) -> List[str]:
+    """Runs in a worker thread: blocking reads (network, disk) happen off the event loop."""
+    batch: List[str] = []
+    for raw in it:
+        batch.append(raw)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+def _cleanBatch(clean: Callable[[str], str], batch: List[str]) -> List[str]:
+    # module level so it can be shipped to a ProcessPoolExecutor
+    many = getattr(clean, "batch", None)
+    return many(batch) if callable(many) else [clean(raw) for raw in batch]
+
+
+async def astream_plaintexts(
+    sources: Sequence[Iterable[str]],
+    *,
+    minLen: int = 150,
+    maxSamples: Optional[int] = None,
+    clean_fn: Optional[Callable[[str], str]] = None,
+    queueDepth: int = 64,
+    readBatch: int = 32,
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[str]:
+    """
+    Async counterpart of stream_plaintexts_from_hf.
+    Each source is an iterable of *raw* texts (iter_hf_texts shards, corpus.iter_local_texts, a plain list
+    in tests) drained by its own reader task. Reads happen in the default thread pool, cleaning runs on
+    `executor` (threads or processes; None = default pool), and cleaned texts go into a queue of
+    `queueDepth` items: when the consumer falls behind, readers block on put() instead of buffering.
+
+    Run CPU-bound work off the loop so ingestion keeps overlapping with it, e.g.
+        async for plain in astream_plaintexts([...]):
+            rep = await asyncio.to_thread(evaluator.evaluate, plaintext=plain, fitnessFunc=f)
+    """
+    if queueDepth <= 0 or readBatch <= 0:
+        raise ValueError("queueDepth and readBatch must be positive")
+    clean = clean_fn or default_clean_text
+    loop = asyncio.get_running_loop()
+    q: asyncio.Queue = asyncio.Queue(maxsize=queueDepth)
+    iters = [iter(src) for src in sources]
+
+    async def reader(it) -> None:
+        try:
+            while True:
+                raw = await loop.run_in_executor(None, _nextBatch, it, readBatch)
+                if not raw:
+                    break
+                cleaned = await loop.run_in_executor(executor, _cleanBatch, clean, raw)
+                for plain in cleaned:
+                    if len(plain) >= minLen:
+                        await q.put(plain)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # handed to the consumer, which re-raises it
+            await q.put(e)
+            return
+        await q.put(_END)
+
+    tasks = [asyncio.ensure_future(reader(it)) for it in iters]
+    live = len(tasks)
+    n = 0
+    try:
+        while live:
+            item = await q.get()
+            if item is _END:
+                live -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+            n += 1
+            if maxSamples is not None and n >= maxSamples:
+                return
+    finally:
+        for t in tasks:
+            t.cancel()
+        # drain the queue so cancelled readers blocked on put() can unwind
+        while not q.empty():
+            q.get_nowait()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for it in iters:
+            close = getattr(it, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass
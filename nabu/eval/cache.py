@@ -0,0 +1,239 @@
+# nabu/eval/cache.py
+from __future__ import annotations
+import functools
+import hashlib
+import inspect
+import io
+import json
+import os
+import random
+import types
+from enum import Enum
+from typing import Any, Callable, Dict, List, Mapping, Optional, Union
+
+import numpy as np
+
+# bump whenever pool building / pair sampling changes, so stale entries are never replayed
+CACHE_VERSION = 5
+
+
+def fitness_identity(fn: Callable[..., Any]) -> str:
+    """
+    Stable identity for a fitness function: module.qualname, an optional `__version__`
+    attribute (bump it when the scorer changes), a digest of its source/bytecode and a digest of
+    the state it carries (instance attributes, bound `__self__`, closure cells, defaults).
+    Scorers with large or opaque state can provide `cache_token()` -> str instead.
+    Module globals the function reads are not part of the identity.
+    Raises ValueError when some of that state cannot be digested (locks, open files, C objects, ...);
+    such scorers cannot be cached or checkpointed.
+    """
+    return _identity(fn, {})
+
+
+def _identity(fn: Callable[..., Any], seen: Dict[int, Any]) -> str:
+    target = getattr(fn, "__func__", fn)
+    if not hasattr(target, "__qualname__"):
+        target = type(target)  # callable instances are identified by their class (+ their state below)
+    name = f"{getattr(target, '__module__', '?')}.{getattr(target, '__qualname__', repr(target))}"
+    version = getattr(fn, "__version__", None)
+    try:
+        body = inspect.getsource(target).encode("utf-8")
+    except (OSError, TypeError):
+        code = getattr(target, "__code__", None)
+        body = code.co_code if code is not None else b""
+    h = hashlib.sha256()
+    if target is type(fn):
+        _digest(h, fn, seen)
+    else:
+        seen[id(fn)] = fn
+        owner = getattr(fn, "__self__", None)
+        if owner is not None and not isinstance(owner, types.ModuleType):
+            _digest(h, owner, seen)
+        for cell in getattr(target, "__closure__", None) or ():
+            try:
+                _digest(h, cell.cell_contents, seen)
+            except ValueError as exc:
+                if "empty" not in str(exc):
+                    raise
+                h.update(b"<empty cell>")
+        _digest(h, getattr(target, "__defaults__", None), seen)
+        _digest(h, getattr(target, "__kwdefaults__", None), seen)
+    return f"{name}|{version}|{hashlib.sha256(body).hexdigest()[:16]}|{h.hexdigest()[:16]}"
+
+
+_FUNCTIONS = (types.FunctionType, types.MethodType, types.BuiltinFunctionType, types.MethodWrapperType)
+
+
+def _digest(h: "hashlib._Hash", obj: Any, seen: Dict[int, Any]) -> None:
+    """Feeds obj's value into h: plain data, arrays and containers by value, objects by their attributes."""
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes, np.generic, Enum)):
+        h.update(f"{type(obj).__name__}:{obj!r};".encode("utf-8"))
+        return
+    if isinstance(obj, np.ndarray):
+        h.update(f"ndarray:{obj.dtype.str}:{obj.shape};".encode("utf-8"))
+        h.update(np.ascontiguousarray(obj).tobytes())
+        return
+    if isinstance(obj, type):
+        h.update(f"class:{obj.__module__}.{obj.__qualname__};".encode("utf-8"))
+        return
+    if isinstance(obj, types.ModuleType):
+        h.update(f"module:{obj.__name__};".encode("utf-8"))
+        return
+    if id(obj) in seen:
+        h.update(b"<cycle>;")
+        return
+    seen[id(obj)] = obj  # keeps temporaries alive, so their ids are not reused mid-walk
+    if isinstance(obj, _FUNCTIONS):
+        h.update(_identity(obj, seen).encode("utf-8"))
+    elif isinstance(obj, functools.partial):
+        _digest(h, (obj.func, obj.args, obj.keywords), seen)
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}:{len(obj)};".encode("utf-8"))
+        for x in obj:
+            _digest(h, x, seen)
+    elif isinstance(obj, (dict, set, frozenset)):
+        items = obj.items() if isinstance(obj, dict) else ((x, None) for x in obj)
+        parts = []
+        for k, v in items:
+            sub = hashlib.sha256()
+            _digest(sub, k, seen)
+            _digest(sub, v, seen)
+            parts.append(sub.digest())
+        h.update(f"{type(obj).__name__}:{len(parts)};".encode("utf-8"))
+        for part in sorted(parts):  # order-free, like the container
+            h.update(part)
+    elif isinstance(obj, random.Random):
+        _digest(h, obj.getstate(), seen)
+    else:
+        _digestObject(h, obj, seen)
+
+
+def _digestObject(h: "hashlib._Hash", obj: Any, seen: Dict[int, Any]) -> None:
+    cls = type(obj)
+    h.update(f"object:{cls.__module__}.{cls.__qualname__};".encode("utf-8"))
+    token = getattr(obj, "cache_token", None)
+    if callable(token):
+        h.update(str(token()).encode("utf-8"))
+        return
+    slots = [s for c in cls.__mro__ for s in getattr(c, "__slots__", ()) if s not in ("__dict__", "__weakref__")]
+    state = getattr(obj, "__dict__", None)
+    if isinstance(obj, io.IOBase) or (state is None and not slots):
+        raise ValueError(f"cannot identify the state of a {cls.__qualname__} held by a fitness function; "
+                         "give the scorer a cache_token() or run it without a cache / checkpoint")
+    _digest(h, dict(state or {}), seen)
+    _digest(h, {s: getattr(obj, s) for s in slots if hasattr(obj, s)}, seen)
+
+
+def fitness_set_identity(fitnessFunc: Union[Callable[..., Any], Mapping[str, Callable[..., Any]]]) -> str:
+    """fitness_identity for one function, or for a dict of named functions as a whole"""
+    if isinstance(fitnessFunc, Mapping):
+        return ";".join(f"{name}={fitness_identity(fn)}" for name, fn in sorted(fitnessFunc.items()))
+    return fitness_identity(fitnessFunc)
+
+
+def rng_state_to_json(rng: random.Random) -> List[Any]:
+    version, internal, gauss = rng.getstate()
+    return [version, list(internal), gauss]
+
+
+def rng_state_from_json(state: List[Any]) -> tuple:
+    version, internal, gauss = state
+    return (version, tuple(internal), gauss)
+
+
+def cache_key(
+    *,
+    plaintext: str,
+    fitnessFunc: Union[Callable[..., Any], Mapping[str, Callable[..., Any]]],
+    rngSeed: Optional[int],
+    params: Mapping[str, Any],
+    rngStates: Optional[List[Any]] = None,
+) -> str:
+    """
+    Content address for one evaluation: plaintext hash, fitness identity, seed, parameters and
+    (optionally) the exact RNG positions the run starts from, so the n-th call of a seeded
+    evaluator maps to its own entry. A dict of named fitness functions is identified as a whole.
+    """
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}".encode())
+    h.update(hashlib.sha256(plaintext.encode("utf-8")).digest())
+    h.update(fitness_set_identity(fitnessFunc).encode("utf-8"))
+    h.update(json.dumps({"seed": rngSeed, "params": params}, sort_keys=True, default=repr).encode("utf-8"))
+    if rngStates is not None:
+        h.update(json.dumps(rngStates).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Opt-in on-disk cache: one .npz file per entry inside `root`.
+      - entries hold named arrays plus a JSON `meta` blob (reports, RNG states, ...)
+      - reads touch the file's mtime, eviction drops least-recently-used files until
+        the directory fits in `maxBytes`
+    """
+    def __init__(self, root: str, maxBytes: int = 512 * 2**20) -> None:
+        if maxBytes <= 0:
+            raise ValueError("maxBytes must be positive")
+        self.root = root
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.npz")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns {'meta': dict, <name>: ndarray, ...} or None on a miss."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                out: Dict[str, Any] = {name: data[name] for name in data.files}
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        out["meta"] = json.loads(str(out["meta"])) if "meta" in out else {}
+        self.hits += 1
+        return out
+
+    def put(self, key: str, arrays: Mapping[str, Any], meta: Optional[Mapping[str, Any]] = None) -> None:
+        buf = io.BytesIO()
+        payload = {name: np.asarray(arr) for name, arr in arrays.items()}
+        payload["meta"] = np.array(json.dumps(meta or {}))
+        np.savez(buf, **payload)
+        # write-then-rename so a crashed run never leaves a truncated entry behind
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(buf.getbuffer())
+        os.replace(tmp, self._path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".npz"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.maxBytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self) -> None:
+        for name in os.listdir(self.root):
+            if name.endswith(".npz"):
+                os.remove(os.path.join(self.root, name))
+
+    def sizeBytes(self) -> int:
+        return sum(os.path.getsize(os.path.join(self.root, n)) for n in os.listdir(self.root) if n.endswith(".npz"))
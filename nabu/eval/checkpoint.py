@@ -0,0 +1,132 @@
+# nabu/eval/checkpoint.py
+from __future__ import annotations
+import hashlib
+import json
+import os
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """'i/N' -> (i, N), with 0 <= i < N. Shard i takes the texts whose id % N == i."""
+    try:
+        i, n = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like 'i/N', got '{spec}'") from None
+    if n <= 0 or not 0 <= i < n:
+        raise ValueError(f"shard index must satisfy 0 <= i < N, got '{spec}'")
+    return i, n
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class RunLog:
+    """
+    Append-only JSONL log of one evaluate_many run: a header line with the run config, then one line
+    per finished text ({"id", "len", "sha", "report", "rng_after"}).
+      - each line is flushed and fsynced as soon as its text is done, so a crash loses at most the
+        text that was in flight
+      - opening an existing log resumes it: a torn last line is cut off, and the header must match
+        the new run's (anything else would mix results from different configurations)
+    """
+    def __init__(self, path: str, header: Mapping[str, Any]) -> None:
+        self.path = path
+        self.header: Dict[str, Any] = json.loads(json.dumps(dict(header), default=repr))
+        self.records: Dict[int, Dict[str, Any]] = {}
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            found, self.records = read_run_log(path, repair=True)
+            if _comparable(found) != _comparable(self.header):
+                raise ValueError(f"'{path}' was written by a run with a different configuration")
+            self._f = open(path, "a", encoding="utf-8")
+        else:
+            self._f = open(path, "w", encoding="utf-8")
+            self._write(self.header)
+
+    def _write(self, obj: Mapping[str, Any]) -> None:
+        self._f.write(json.dumps(obj) + "\n")
+        self._f.flush()
+        os.fsync(self._f.fileno())
+
+    def done(self, textId: int, sha: str) -> bool:
+        rec = self.records.get(textId)
+        if rec is None:
+            return False
+        if rec["sha"] != sha:
+            raise ValueError(f"text {textId} in '{self.path}' does not match the input stream")
+        return True
+
+    def append(self, record: Mapping[str, Any]) -> None:
+        self._write(record)
+        self.records[record["id"]] = dict(record)
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "RunLog":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _comparable(header: Mapping[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in header.items() if k != "shard"}
+
+
+def _lines(path: str) -> Iterator[Tuple[int, bytes]]:
+    with open(path, "rb") as f:
+        offset = 0
+        for line in f:
+            yield offset, line
+            offset += len(line)
+
+
+def read_run_log(path: str, *, repair: bool = False) -> Tuple[Dict[str, Any], Dict[int, Dict[str, Any]]]:
+    """
+    (header, {id: record}) of a run log. A final line without a newline or that does not parse is what a
+    crash mid-write leaves behind; it is ignored, and cut off the file when repair=True.
+    """
+    header: Optional[Dict[str, Any]] = None
+    records: Dict[int, Dict[str, Any]] = {}
+    torn: Optional[int] = None
+    for offset, line in _lines(path):
+        try:
+            if not line.endswith(b"\n"):
+                raise ValueError
+            obj = json.loads(line)
+        except ValueError:
+            torn = offset
+            break
+        if header is None:
+            header = obj
+        else:
+            records[obj["id"]] = obj
+    if header is None:
+        raise ValueError(f"'{path}' is not a run log (no header)")
+    if torn is not None and repair:
+        with open(path, "r+b") as f:
+            f.truncate(torn)
+    return header, records
+
+
+def merge_run_logs(paths: List[str]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Header and id-ordered records of several shard logs of the same run. Shards must share their
+    configuration; a text present in more than one log is kept once (it must be the same text).
+    """
+    if not paths:
+        raise ValueError("no run logs to merge")
+    header: Optional[Dict[str, Any]] = None
+    merged: Dict[int, Dict[str, Any]] = {}
+    for path in paths:
+        h, records = read_run_log(path)
+        if header is None:
+            header = h
+        elif _comparable(h) != _comparable(header):
+            raise ValueError(f"'{path}' was written by a run with a different configuration")
+        for textId, rec in records.items():
+            prev = merged.setdefault(textId, rec)
+            if prev["sha"] != rec["sha"]:
+                raise ValueError(f"text {textId} differs between shards")
+    return header, [merged[t] for t in sorted(merged)]
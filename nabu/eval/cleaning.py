@@ -0,0 +1,109 @@
+# nabu/eval/cleaning.py
+from __future__ import annotations
+import re
+from typing import Dict, Iterable, List, Optional, Union
+
+from nabu.core.alphabets import AlphabetPair, getAlphabet
+
+# \x00 never appears in real documents; it is reserved as the record separator for batch mode
+_URL = re.compile(r"https?://[^\s\x00]+", re.IGNORECASE)
+_SEP = "\x00"
+_SPACE = re.compile(r"\s")
+
+
+class _FoldTable(dict):
+    """
+    str.translate table for non-ASCII alphabets: ring chars fold to lowercase, anything else
+    is deleted. Misses are memoised so each distinct code point pays the Python call once.
+    """
+    def __missing__(self, cp: int) -> None:
+        self[cp] = None
+        return None
+
+
+class TextCleaner:
+    """
+    Strips URLs, folds case and drops every symbol outside the alphabet in a single C-level pass
+    (bytes.translate for ASCII alphabets, a memoised str.translate table otherwise).
+      - maxLen: stop cleaning once this many symbols are kept (huge documents exit early)
+      - batch(): cleans many documents per call by translating them as one joined buffer
+    """
+    def __init__(self, alphabet: AlphabetPair, *, stripUrls: bool = True,
+                 maxLen: Optional[int] = None) -> None:
+        if maxLen is not None and maxLen <= 0:
+            raise ValueError("maxLen must be positive")
+        self.alphabet = alphabet
+        self.stripUrls = stripUrls
+        self.maxLen = maxLen
+        # windows are sized so a typical document under the cap is handled in one step
+        self._window = max(4 * maxLen, 1 << 14) if maxLen is not None else None
+
+        ring = alphabet.lower + alphabet.upper
+        self._ascii = ring.isascii()
+        # str.lower() agrees with the alphabet's own pairing, so it may fold non-ASCII text first:
+        # the Kelvin sign lowers to "k" and "İ" to "i" + a combining dot, both of which must keep their letter
+        self._strLower = all(u.lower() == l for u, l in zip(alphabet.upper, alphabet.lower))
+        if self._ascii:
+            keep = set(ring.encode("ascii"))
+            self._bytesTable = bytes.maketrans(alphabet.upper.encode("ascii"), alphabet.lower.encode("ascii"))
+            # index 0: single documents, index 1: batch buffers (separator survives)
+            self._bytesDelete = (bytes(b for b in range(128) if b not in keep),
+                                 bytes(b for b in range(1, 128) if b not in keep))
+        else:
+            table: Dict[int, Optional[int]] = {ord(u): ord(l) for u, l in zip(alphabet.upper, alphabet.lower)}
+            table.update({ord(l): ord(l) for l in alphabet.lower})
+            self._strTables = (_FoldTable(table), _FoldTable(table))
+            self._strTables[1][0] = 0
+
+    def _translate(self, text: str, keepSep: bool = False) -> str:
+        if self.stripUrls and "://" in text:
+            text = _URL.sub("", text)
+        if self._ascii:
+            if self._strLower and not text.isascii():
+                text = text.lower()
+            data = text.encode("ascii", "ignore")  # non-ASCII can never be in an ASCII ring
+            return data.translate(self._bytesTable, self._bytesDelete[keepSep]).decode("ascii")
+        return text.translate(self._strTables[keepSep])
+
+    def __call__(self, text: str) -> str:
+        if self.maxLen is None or len(text) <= self._window:
+            out = self._translate(text)
+            return out if self.maxLen is None else out[:self.maxLen]
+        # early exit: clean window by window until the cap is reached
+        pieces: List[str] = []
+        kept = 0
+        pos, n = 0, len(text)
+        while pos < n and kept < self.maxLen:
+            end = min(pos + self._window, n)
+            if self.stripUrls:
+                # never cut a URL in half; extend to the next whitespace
+                m = _SPACE.search(text, end)
+                end = m.start() if m else n
+            piece = self._translate(text[pos:end])
+            pieces.append(piece)
+            kept += len(piece)
+            pos = end
+        return "".join(pieces)[:self.maxLen]
+
+    def batch(self, texts: Iterable[str]) -> List[str]:
+        docs = list(texts)
+        if not docs:
+            return []
+        if self.maxLen is not None and any(len(d) > self._window for d in docs):
+            return [self(d) for d in docs]
+        joined = _SEP.join(docs)
+        if joined.count(_SEP) != len(docs) - 1:
+            return [self(d) for d in docs]  # a document carries its own NULs; fall back
+        out = self._translate(joined, keepSep=True).split(_SEP)
+        if self.maxLen is not None:
+            out = [o[:self.maxLen] for o in out]
+        return out
+
+
+def make_cleaner(alphabet: Union[str, AlphabetPair] = "latin", *, stripUrls: bool = True,
+                 maxLen: Optional[int] = None) -> TextCleaner:
+    """
+    Cleaner factory: `alphabet` is a registry name or an AlphabetPair.
+    """
+    pair = getAlphabet(alphabet) if isinstance(alphabet, str) else alphabet
+    return TextCleaner(pair, stripUrls=stripUrls, maxLen=maxLen)
@@ -0,0 +1,244 @@
+# nabu/eval/corpus.py
+from __future__ import annotations
+import gzip
+import json
+import os
+import queue
+import struct
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from .streaming import default_clean_text
+
+# one record = little-endian uint32 byte length + utf-8 payload
+_LEN = struct.Struct("<I")
+MANIFEST = "manifest.json"
+
+
+def iter_local_texts(path: str, *, textField: str = "text") -> Iterator[str]:
+    """
+    Yield raw documents from a local file or directory (walked in sorted order):
+      - .txt      one document per file
+      - .jsonl    one document per line, taken from `textField`
+      - .parquet  one document per row of column `textField` (needs pyarrow)
+    """
+    if os.path.isdir(path):
+        paths = sorted(os.path.join(root, f) for root, _, files in os.walk(path) for f in files)
+    else:
+        paths = [path]
+    for p in paths:
+        if p.endswith(".txt"):
+            with open(p, encoding="utf-8", errors="replace") as f:
+                yield f.read()
+        elif p.endswith(".jsonl"):
+            with open(p, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line).get(textField, "")
+        elif p.endswith(".parquet"):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError as e:  # pragma: no cover
+                raise ImportError("reading .parquet corpora requires pyarrow") from e
+            pf = pq.ParquetFile(p)
+            for batch in pf.iter_batches(columns=[textField]):
+                for raw in batch.column(0).to_pylist():
+                    yield raw or ""
+
+
+def write_corpus_shards(
+    texts: Iterable[str],
+    outDir: str,
+    *,
+    shardSize: int = 10_000,
+    compress: bool = False,
+) -> List[str]:
+    """
+    Write already-cleaned texts as length-prefixed records, `shardSize` documents per shard.
+    A manifest lists shards in order with their document counts. Returns the shard paths.
+    Rebuilding into an existing cache first removes its manifest and shards, so an interrupted
+    rebuild leaves no manifest behind rather than an old one over new shards.
+    """
+    if shardSize <= 0:
+        raise ValueError("shardSize must be positive")
+    os.makedirs(outDir, exist_ok=True)
+    manifestPath = os.path.join(outDir, MANIFEST)
+    if os.path.exists(manifestPath):
+        os.remove(manifestPath)
+    for name in os.listdir(outDir):
+        if name.startswith("shard-") and name.endswith((".bin", ".bin.gz")):
+            os.remove(os.path.join(outDir, name))
+    ext = ".bin.gz" if compress else ".bin"
+    opener = gzip.open if compress else open
+    shards: List[dict] = []
+    f = None
+    try:
+        for i, text in enumerate(texts):
+            if i % shardSize == 0:
+                if f is not None:
+                    f.close()
+                name = f"shard-{len(shards):05d}{ext}"
+                f = opener(os.path.join(outDir, name), "wb")
+                shards.append({"name": name, "count": 0})
+            data = text.encode("utf-8")
+            f.write(_LEN.pack(len(data)))
+            f.write(data)
+            shards[-1]["count"] += 1
+    finally:
+        if f is not None:
+            f.close()
+    # manifest last (and atomically), so a half-written cache is never mistaken for a complete one
+    tmp = manifestPath + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as mf:
+        json.dump({"shards": shards}, mf)
+    os.replace(tmp, manifestPath)
+    return [os.path.join(outDir, s["name"]) for s in shards]
+
+
+def build_corpus_cache(
+    rawTexts: Iterable[str],
+    outDir: str,
+    *,
+    minLen: int = 150,
+    maxSamples: Optional[int] = None,
+    clean_fn: Optional[Callable[[str], str]] = None,
+    shardSize: int = 10_000,
+    compress: bool = False,
+) -> List[str]:
+    """
+    Clean once, filter by `minLen`, and persist. `rawTexts` can be an HF row stream's text
+    or iter_local_texts(...) for fully offline builds.
+    """
+    clean = clean_fn or default_clean_text
+
+    def cleaned() -> Iterator[str]:
+        n = 0
+        for raw in rawTexts:
+            plain = clean(raw)
+            if len(plain) < minLen:
+                continue
+            yield plain
+            n += 1
+            if maxSamples is not None and n >= maxSamples:
+                return
+
+    return write_corpus_shards(cleaned(), outDir, shardSize=shardSize, compress=compress)
+
+
+def _readShard(path: str) -> Iterator[str]:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        while True:
+            head = f.read(_LEN.size)
+            if not head:
+                return
+            if len(head) != _LEN.size:
+                raise ValueError(f"truncated record header in {path}")
+            (n,) = _LEN.unpack(head)
+            data = f.read(n)
+            if len(data) != n:
+                raise ValueError(f"truncated record in {path}")
+            yield data.decode("utf-8")
+
+
+def shard_paths(cacheDir: str) -> List[str]:
+    manifestPath = os.path.join(cacheDir, MANIFEST)
+    if not os.path.exists(manifestPath):
+        raise FileNotFoundError(f"no corpus manifest in '{cacheDir}' (build it with build_corpus_cache)")
+    with open(manifestPath, encoding="utf-8") as f:
+        manifest = json.load(f)
+    return [os.path.join(cacheDir, s["name"]) for s in manifest["shards"]]
+
+
+def read_corpus_shards(
+    cacheDir: str,
+    *,
+    minLen: int = 0,
+    maxSamples: Optional[int] = None,
+    prefetch: int = 256,
+) -> Iterator[str]:
+    """
+    Stream texts back from a corpus cache. A background thread decodes shards into a
+    bounded queue of `prefetch` texts, so the consumer never waits on disk.
+
+    Like stream_plaintexts_from_hf this returns a *closable generator*; .close() stops the reader.
+    """
+    paths = shard_paths(cacheDir)
+    q: "queue.Queue[object]" = queue.Queue(maxsize=max(1, prefetch))
+    stop = threading.Event()
+    done = object()
+
+    def produce() -> None:
+        try:
+            for p in paths:
+                for text in _readShard(p):
+                    while not stop.is_set():
+                        try:
+                            q.put(text, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+        except Exception as e:  # surfaced in the consumer thread
+            q.put(e)
+        finally:
+            q.put(done)
+
+    def gen() -> Iterator[str]:
+        worker = threading.Thread(target=produce, name="nabu-corpus-prefetch", daemon=True)
+        worker.start()
+        n = 0
+        try:
+            while True:
+                item = q.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                if len(item) < minLen:
+                    continue
+                yield item
+                n += 1
+                if maxSamples is not None and n >= maxSamples:
+                    return
+        finally:
+            stop.set()
+            # drain so a producer blocked on put() can observe the stop flag
+            while worker.is_alive():
+                try:
+                    q.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+    return gen()
+
+
+def stream_plaintexts_from_dir(
+    path: str,
+    *,
+    minLen: int = 150,
+    maxSamples: Optional[int] = None,
+    clean_fn: Optional[Callable[[str], str]] = None,
+    prefetch: int = 256,
+) -> Iterator[str]:
+    """
+    Offline counterpart of stream_plaintexts_from_hf.
+    A directory holding a corpus manifest is read back from its shards (already cleaned);
+    anything else is treated as raw .txt/.jsonl/.parquet files and cleaned on the fly.
+    """
+    if os.path.isdir(path) and os.path.exists(os.path.join(path, MANIFEST)):
+        return read_corpus_shards(path, minLen=minLen, maxSamples=maxSamples, prefetch=prefetch)
+
+    clean = clean_fn or default_clean_text
+
+    def gen() -> Iterator[str]:
+        n = 0
+        for raw in iter_local_texts(path):
+            plain = clean(raw)
+            if len(plain) < minLen:
+                continue
+            yield plain
+            n += 1
+            if maxSamples is not None and n >= maxSamples:
+                return
+    return gen()
@@ -1,12 +1,14 @@
 # example.py
 from __future__ import annotations
+import argparse
 from itertools import islice
-from typing import List, Dict, Any
 from tqdm import tqdm
 
-from nabu.eval.rocEval import MonoSubEvaluator
+from nabu.eval.rocEval import MonoSubEvaluator, merge_checkpoints
+from nabu.eval.checkpoint import parse_shard
 from nabu.eval.streaming import stream_plaintexts_from_hf, default_clean_text
-from nabu.eval.viz import plotRocPanelForPlaintext
+from nabu.eval.viz import plotRocPanelForPlaintext, renderRocReport
+from nabu.eval.cache import ResultCache
 
 
 def myFitness(text: str) -> float:
@@ -30,23 +32,38 @@ def myFitness(text: str) -> float:
     return sum(logProbs.get(ch, unknown) for ch in text)
 
 
-def safe_mean(xs):
-    vals = [v for v in xs if v == v]  # drop NaNs
-    return sum(vals) / len(vals) if vals else float("nan")
-
-
 if __name__ == "__main__":
-    # Always evaluate exactly 3 texts
+    parser = argparse.ArgumentParser(description="Macro AUC of myFitness over fineweb-edu texts")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="i/N",
+                        help="only evaluate texts with id %% N == i (0-based)")
+    parser.add_argument("--checkpoint", default=None, metavar="PATH",
+                        help="append per-text results to this JSONL file and resume from it on restart "
+                             "(default: run_<i>of<N>.jsonl when sharded)")
+    parser.add_argument("--figures", default=None, metavar="DIR",
+                        help="also write per-text and macro ROC panels for this run into DIR")
+    parser.add_argument("--merge", nargs="+", default=None, metavar="PATH",
+                        help="don't evaluate; recompute the macro aggregates from these run logs")
+    args = parser.parse_args()
+
+    if args.merge:
+        merged = merge_checkpoints(args.merge)
+        print(f"{len(merged['per_text'])} texts")
+        print(merged["aggregate"])
+        raise SystemExit(0)
+
     maxTexts = 100
     minLen = 150
+    checkpoint = args.checkpoint
+    if checkpoint is None and args.shard is not None:
+        checkpoint = f"run_{args.shard[0]}of{args.shard[1]}.jsonl"
 
-    # Build a Hugging Face streaming dataset and collect exactly 3 cleaned texts
+    # Build a Hugging Face streaming dataset and collect exactly maxTexts cleaned texts
     stream = stream_plaintexts_from_hf(
         dataset="HuggingFaceFW/fineweb-edu",
         name="sample-10BT",
         split="train",
         minLen=minLen,
-        maxSamples=250,              # oversample so we can collect 3
+        maxSamples=250,              # oversample so we can collect maxTexts
         clean_fn=default_clean_text,
     )
     texts = list(islice(stream, maxTexts))
@@ -59,50 +76,35 @@ if __name__ == "__main__":
     except Exception:
         pass
 
-    evaluator = MonoSubEvaluator(alphabet="abcdefghijklmnopqrstuvwxyz", rngSeed=3)
-
-    # Manual loop with explicit tqdm so it always reaches 3/3
-    per_reports: List[Dict[str, Any]] = []
-    with tqdm(total=len(texts)) as bar:
-        for plain in texts:
-            rep = evaluator.evaluate(
-                plaintext=plain,
-                fitnessFunc=myFitness,
-                globalNumKeys=300,
-                globalMaxPairs=20_000,
-                localRadii=[1, 2, 3],
-                localSeeds=3,
-                localPerSeed=200,
-                localMaxPairs=20_000,
-                includeTrueKeyDiagnostic=True,
-            )
-            per_reports.append(rep)
-            bar.update(1)
-
-    # Aggregate results (macro averages) to match previous reporting
-    globalAUCs = [r["aggregate"]["global_auc_pairwise"] for r in per_reports]
-    globalTPR0s = [r["aggregate"]["global_tpr_at_zero"] for r in per_reports]
-
-    localRadii = sorted(set().union(*[
-        set(r["aggregate"]["local_auc_pairwise"].keys()) for r in per_reports
-    ]))
-
-    local_auc_macro = {
-        r: safe_mean([rep["aggregate"]["local_auc_pairwise"].get(r, float("nan")) for rep in per_reports])
-        for r in localRadii
-    }
-    local_tpr0_macro = {
-        r: safe_mean([rep["aggregate"]["local_tpr_at_zero"].get(r, float("nan")) for rep in per_reports])
-        for r in localRadii
-    }
+    # re-runs replay pools/pairs from disk; delete the folder (or drop the cache) to recompute
+    cache = ResultCache("nabu_cache", maxBytes=1 * 2**30)
+    evaluator = MonoSubEvaluator(alphabet="abcdefghijklmnopqrstuvwxyz", rngSeed=3, cache=cache)
 
-    aggregate = {
-        "global_auc_pairwise_macro": safe_mean(globalAUCs),
-        "global_tpr_at_zero_macro": safe_mean(globalTPR0s),
-        "local_auc_pairwise_macro": local_auc_macro,
-        "local_tpr_at_zero_macro": local_tpr0_macro,
-    }
-    print(aggregate)
+    # every shard walks the same text list; tqdm counts all of them, skipped ones included
+    result = evaluator.evaluate_many(
+        plaintextIter=tqdm(texts),
+        fitnessFunc=myFitness,
+        maxTexts=maxTexts,
+        minLen=minLen,
+        checkpoint=checkpoint,
+        shard=args.shard,
+        globalNumKeys=300,
+        globalMaxPairs=20_000,
+        localRadii=[1, 2, 3],
+        localSeeds=3,
+        localPerSeed=200,
+        localMaxPairs=20_000,
+        includeTrueKeyDiagnostic=True,
+        returnPairs=args.figures is not None,
+    )
+    print(result["aggregate"])
+    # texts replayed from the checkpoint have no pairs to draw and are skipped
+    if args.figures is not None and any("pair_sets" in r["report"] for r in result["per_text"]):
+        figures = renderRocReport(result, args.figures)
+        print(f"wrote {len(figures['paths'])} figures to {args.figures}")
+    if args.shard is not None:
+        print(f"shard {args.shard[0]}/{args.shard[1]} done; combine with --merge run_*of{args.shard[1]}.jsonl")
+        raise SystemExit(0)
 
     vizMetrics = plotRocPanelForPlaintext(
         alphabet="abcdefghijklmnopqrstuvwxyz",
@@ -117,5 +119,6 @@ if __name__ == "__main__":
         localMaxPairs=20_000,
         bootstrapB=400,                     # adjust for speed/precision
         savePath="roc_panel.png",           # writes a figure next to the script
+        cache=cache,
     )
     print("viz:", vizMetrics)
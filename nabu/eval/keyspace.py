@@ -1,20 +1,23 @@
 # nabu/eval/keyspace.py
 from __future__ import annotations
 import random
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Sequence, Tuple, Optional
+import numpy as np
+from nabu.core.alphabets import getRingCodec
 
 class MonoSubKeyspace:
     """
     Monoalphabetic substitution keyspace utilities:
       - random key generation (permutation of alphabet)
       - Cayley (transposition) distance between keys (minimum # of swaps)
-      - neighbour generation by applying r random swaps to a given key
+      - neighbour generation by applying r random swaps to a given key, or batched at exact distance r
       - encrypt/decrypt under a given key
     Keys are represented as strings of length |alphabet| that permute the alphabet.
     """
     def __init__(self, alphabet: str, rngSeed: Optional[int] = None) -> None:
         self.alphabet = alphabet
         self.A = len(alphabet)
+        self.codec = getRingCodec(alphabet)
         self._rng = random.Random(rngSeed)
 
     # ---------- Keys ----------
@@ -49,6 +52,30 @@ class MonoSubKeyspace:
             cycles += 1
         return self.A - cycles
 
+    def cayley_distances(self, keysA: np.ndarray, keysB: np.ndarray) -> np.ndarray:
+        """
+        Row-wise cayley_distance for two (P, A) key matrices, A - #cycles of B^-1 ∘ A.
+        Cycles are counted by pointer doubling (log2 A gathers), so there is no per-pair Python loop.
+        """
+        if keysA.shape != keysB.shape:
+            raise ValueError("key matrix shape mismatch")
+        P, A = keysA.shape
+        if P == 0:
+            return np.empty(0, dtype=np.int64)
+        cols = np.broadcast_to(np.arange(A, dtype=np.int32), (P, A))
+        invB = np.empty((P, A), dtype=np.int32)
+        np.put_along_axis(invB, keysB.astype(np.intp), cols, axis=1)
+        # work on flat indices: one 1-D gather per step instead of take_along_axis
+        offsets = (np.arange(P, dtype=np.int32) * A)[:, None]
+        flat = (np.take_along_axis(invB, keysA.astype(np.intp), axis=1) + offsets).ravel()
+        base = cols.ravel()
+        # label every position with the smallest index on its cycle; one leader per cycle
+        label = base.copy()
+        for _ in range(max(1, (A - 1).bit_length())):
+            np.minimum(label, label[flat], out=label)
+            flat = flat[flat]
+        return A - (label == base).reshape(P, A).sum(axis=1)
+
     def neighbour_by_swaps(self, key: str, radius: int) -> str:
         """
         Apply 'radius' random transpositions to 'key' (not guaranteed to be distinct pairs).
@@ -64,11 +91,81 @@ class MonoSubKeyspace:
             arr[i], arr[j] = arr[j], arr[i]
         return ''.join(arr)
 
+    def neighbours_at_distance(self, key, radius: int, count: int) -> np.ndarray:
+        """
+        (count, A) key matrix, every row exactly `radius` transpositions (Cayley distance) from `key`
+        (a key string or key_matrix row). Composes `radius` disjoint swaps when 2*radius <= A; larger radii
+        use one random (radius+1)-cycle, which is also exactly `radius` swaps away.
+        Takes one 64-bit seed from the keyspace RNG per call, so seeded runs stay reproducible.
+        """
+        if not 0 <= radius < self.A:
+            raise ValueError(f"radius must be in [0, {self.A - 1}]")
+        row = np.asarray(key) if isinstance(key, np.ndarray) else self.key_matrix([key])[0]
+        out = np.repeat(row[None, :], count, axis=0)
+        if radius == 0 or count == 0:
+            return out
+        gen = np.random.default_rng(self._rng.getrandbits(64))
+        if 2 * radius <= self.A:
+            pos = gen.random((count, self.A)).argsort(axis=1)[:, :2 * radius]  # distinct positions per row
+            a, b = pos[:, :radius], pos[:, radius:]
+            r = np.arange(count)[:, None]
+            out[r, a], out[r, b] = out[r, b], out[r, a]
+        else:
+            pos = gen.random((count, self.A)).argsort(axis=1)[:, :radius + 1]
+            r = np.arange(count)[:, None]
+            out[r, pos] = out[r, np.roll(pos, 1, axis=1)]
+        return out
+
+    def unique_keys(self, keyMatrix: np.ndarray) -> np.ndarray:
+        """Drops repeated rows, keeping first occurrences in their original order."""
+        if keyMatrix.shape[0] < 2:
+            return keyMatrix
+        _, first = np.unique(keyMatrix, axis=0, return_index=True)
+        if first.size == keyMatrix.shape[0]:
+            return keyMatrix
+        return keyMatrix[np.sort(first)]
+
+    # ---------- Index form (for batched scorers) ----------
+    def encode(self, text: str) -> np.ndarray:
+        """Text as alphabet indices (codec dtype, uint8 for A <= 255); symbols outside the alphabet are dropped."""
+        return self.codec.ringOnly(self.codec.encode(text))
+
+    def key_matrix(self, keys: Sequence[str]) -> np.ndarray:
+        """(N, A) codec dtype: row n is keys[n] as alphabet indices (plaintext index -> cipher index)."""
+        flat = self.codec.encode(''.join(keys))
+        A = self.A
+        if any(len(k) != A for k in keys) or (flat >= A).any():
+            raise ValueError("keys must be permutations of the alphabet")
+        # every row must hit every symbol exactly once: one bincount over (row, symbol) cells
+        cells = np.arange(len(keys), dtype=np.int64).repeat(A) * A + flat
+        if flat.size and not (np.bincount(cells, minlength=flat.size) == 1).all():
+            raise ValueError("keys must be permutations of the alphabet (repeated symbol)")
+        return flat.reshape(len(keys), A)
+
+    def key_string(self, row: np.ndarray) -> str:
+        return self.codec.decode(row)
+
+    def decryption_matrix(self, keys) -> np.ndarray:
+        """
+        (N, A) codec dtype: row n maps cipher index -> plaintext index under keys[n]
+        (the inverse of the key's own plaintext -> cipher permutation).
+        Accepts key strings or an existing key_matrix.
+        """
+        enc = keys if isinstance(keys, np.ndarray) else self.key_matrix(keys)
+        return np.argsort(enc, axis=1).astype(self.codec.dtype)
+
+    def decrypts_like(self, keyMatrix: np.ndarray, key: str, plaintext: str) -> np.ndarray:
+        """
+        (N,) bool: which rows decrypt encrypt(plaintext, key) back to plaintext. That is key equality on the
+        symbols the plaintext uses; the other symbols never reach the ciphertext, so they may differ.
+        """
+        used = np.unique(self.encode(plaintext))
+        return (keyMatrix[:, used] == self.key_matrix([key])[0, used]).all(axis=1)
+
     # ---------- Cipher ----------
+    # str.translate keeps on-demand decryption (CandidatePool.plaintext) cheap
     def encrypt(self, plaintext: str, key: str) -> str:
-        enc: Dict[str, str] = {p: c for p, c in zip(self.alphabet, key)}
-        return ''.join(enc.get(ch, ch) for ch in plaintext)
+        return plaintext.translate(str.maketrans(self.alphabet, key))
 
     def decrypt(self, ciphertext: str, key: str) -> str:
-        dec: Dict[str, str] = {c: p for p, c in zip(self.alphabet, key)}
-        return ''.join(dec.get(ch, ch) for ch in ciphertext)
+        return ciphertext.translate(str.maketrans(key, self.alphabet))
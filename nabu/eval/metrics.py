@@ -0,0 +1,82 @@
+# nabu/eval/metrics.py
+from __future__ import annotations
+import math
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+
+def _midranks(s: np.ndarray) -> np.ndarray:
+    """1-based ranks, ties share the average of their positions."""
+    order = np.argsort(s, kind="mergesort")
+    sorted_s = s[order]
+    starts = np.flatnonzero(np.r_[True, sorted_s[1:] != sorted_s[:-1]])
+    ends = np.r_[starts[1:], s.size]
+    groupRank = (starts + ends + 1) / 2.0
+    ranks = np.empty(s.size, dtype=np.float64)
+    ranks[order] = np.repeat(groupRank, ends - starts)
+    return ranks
+
+
+def auc_score(labels: Sequence[int], scores: Sequence[float]) -> float:
+    """
+    ROC AUC via the Mann–Whitney U statistic with mid-ranks for tied scores
+    (same value as sklearn's roc_auc_score). NaN unless both classes are present, and NaN when any
+    score is NaN or infinite (sklearn refuses those; ranking them would give a plausible-looking number).
+    """
+    y = np.asarray(labels) == 1
+    s = np.asarray(scores, dtype=np.float64)
+    nPos = int(y.sum())
+    nNeg = y.size - nPos
+    if nPos == 0 or nNeg == 0 or not np.isfinite(s).all():
+        return float("nan")
+    u = _midranks(s)[y].sum() - nPos * (nPos + 1) / 2.0
+    return float(u / (nPos * nNeg))
+
+
+def auc_with_se(labels: Sequence[int], scores: Sequence[float]) -> Tuple[float, float]:
+    """
+    AUC plus its DeLong standard error (structural components from mid-ranks, O(n log n)).
+    The SE is NaN unless each class has at least two members; both are NaN for non-finite scores.
+    """
+    y = np.asarray(labels) == 1
+    s = np.asarray(scores, dtype=np.float64)
+    nPos = int(y.sum())
+    nNeg = y.size - nPos
+    if nPos == 0 or nNeg == 0 or not np.isfinite(s).all():
+        return float("nan"), float("nan")
+    ranks = _midranks(s)
+    v10 = (ranks[y] - _midranks(s[y])) / nNeg        # per positive: share of negatives it beats
+    v01 = 1.0 - (ranks[~y] - _midranks(s[~y])) / nPos  # per negative: share of positives that beat it
+    auc = float(v10.mean())
+    if nPos < 2 or nNeg < 2:
+        return auc, float("nan")
+    return auc, math.sqrt(v10.var(ddof=1) / nPos + v01.var(ddof=1) / nNeg)
+
+
+# ranks at which the true-key diagnostic reports a hit (top1, top10)
+TRUE_KEY_TOP_K = (1, 10)
+
+
+def true_key_rank(scores: np.ndarray, positive: np.ndarray, trueScore: float,
+                  top_k: Sequence[int] = TRUE_KEY_TOP_K) -> Dict[str, float]:
+    """
+    True key vs the rest of a pool, in one pass over the negatives. Every positive (a key that decrypts to
+    the plaintext) has the true key's score, so with the negatives' scores:
+      - auc:    share of negatives scored below trueScore, ties counting half (= auc_score with the positives)
+      - rank:   1 + negatives scored >= trueScore (ties broken against the true key)
+      - margin: trueScore - best negative score (> 0 means the true key wins outright)
+      - top{k}: 1.0 if rank <= k else 0.0
+    All NaN when the pool has no negatives or any score is NaN (like auc_score; -inf still ranks last).
+    """
+    neg = np.asarray(scores, dtype=np.float64)[~np.asarray(positive, dtype=bool)]
+    if neg.size == 0 or np.isnan(neg).any() or trueScore != trueScore:
+        return {"auc": float("nan"), "rank": float("nan"), "margin": float("nan"),
+                **{f"top{k}": float("nan") for k in top_k}}
+    above = int(np.count_nonzero(neg > trueScore))
+    tied = int(np.count_nonzero(neg == trueScore))
+    rank = 1 + above + tied
+    out = {"auc": (neg.size - above - 0.5 * tied) / neg.size, "rank": float(rank),
+           "margin": float(trueScore - neg.max())}
+    out.update({f"top{k}": float(rank <= k) for k in top_k})
+    return out
@@ -1,23 +1,34 @@
 # nabu/eval/oracle.py
 from __future__ import annotations
-try:
-    from Levenshtein import distance as levenshtein_distance
-except Exception:  # pragma: no cover
+from typing import Callable, Optional
+
+def _python_levenshtein(a: str, b: str) -> int:
     # Lightweight fallback if python-Levenshtein is not available.
-    def levenshtein_distance(a: str, b: str) -> int:
-        m, n = len(a), len(b)
-        dp = list(range(n+1))
-        for i, ca in enumerate(a, 1):
-            prev = dp[0]
-            dp[0] = i
-            for j, cb in enumerate(b, 1):
-                cur = dp[j]
-                if ca == cb:
-                    dp[j] = prev
-                else:
-                    dp[j] = 1 + min(prev, dp[j], dp[j-1])
-                prev = cur
-        return dp[n]
+    m, n = len(a), len(b)
+    dp = list(range(n+1))
+    for i, ca in enumerate(a, 1):
+        prev = dp[0]
+        dp[0] = i
+        for j, cb in enumerate(b, 1):
+            cur = dp[j]
+            if ca == cb:
+                dp[j] = prev
+            else:
+                dp[j] = 1 + min(prev, dp[j], dp[j-1])
+            prev = cur
+    return dp[n]
+
+# resolved on first use so importing the evaluator does not pay for the C extension
+_distance: Optional[Callable[[str, str], int]] = None
+
+def levenshtein_distance(a: str, b: str) -> int:
+    global _distance
+    if _distance is None:
+        try:
+            from Levenshtein import distance as _distance
+        except Exception:  # pragma: no cover
+            _distance = _python_levenshtein
+    return _distance(a, b)
 
 def normalised_levenshtein(x: str, g: str) -> float:
     """
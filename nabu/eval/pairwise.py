@@ -3,14 +3,15 @@ from __future__ import annotations
 import itertools
 import math
 import random
-from typing import Callable, List, Optional, Sequence, Tuple
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
-from sklearn.metrics import roc_auc_score
+import numpy as np
 from .oracle import normalised_levenshtein
+from .metrics import auc_score, auc_with_se
 from .keyspace import MonoSubKeyspace
-
-# A candidate is (key, plaintext, score, oracle_dist)
-Candidate = Tuple[str, str, float, float]
+from .profiling import Profiler, NULL_PROFILER
+from .scoring import Fitness, KeyFitness, as_batch_fitness, score_texts
+from .pool import CandidatePool
 
 def sample_pair_indices(n: int, max_pairs: int, rng: random.Random) -> Sequence[Tuple[int, int]]:
     """
@@ -33,125 +34,350 @@ def sample_pair_indices(n: int, max_pairs: int, rng: random.Random) -> Sequence[
         attempts += 1
     return list(pairs)
 
+def iter_pair_indices(n: int, max_pairs: int, rng: random.Random, batch: int) -> Iterator[List[Tuple[int, int]]]:
+    """
+    sample_pair_indices handed out in batches of up to `batch` new pairs, so callers can stop early
+    without paying for the rest. Pairs stay unique across batches.
+    """
+    if n < 2 or max_pairs <= 0:
+        return
+    if n <= 2000 and max_pairs >= (n*(n-1))//2:
+        pairs = [(i, j) for i in range(n) for j in range(i+1, n)]
+        rng.shuffle(pairs)
+        pairs = pairs[:max_pairs]
+        for start in range(0, len(pairs), batch):
+            yield pairs[start:start + batch]
+        return
+    seen = set()
+    attempts = 0
+    while len(seen) < max_pairs and attempts < max_pairs*10:
+        new: List[Tuple[int, int]] = []
+        want = min(batch, max_pairs - len(seen))
+        while len(new) < want and attempts < max_pairs*10:
+            i = rng.randrange(n-1)
+            j = rng.randrange(i+1, n)
+            attempts += 1
+            if (i, j) not in seen:
+                seen.add((i, j))
+                new.append((i, j))
+        yield new
+
 def build_random_pool(
     ks: MonoSubKeyspace,
     ciphertext: str,
-    fitness: Callable[[str], float],
+    fitness: Fitness,
     *,
     num_keys: int,
     rng: random.Random,
-) -> List[Candidate]:
+    prof: Profiler = NULL_PROFILER,
+    g: Optional[str] = None,
+) -> CandidatePool:
     """
     Sample random keys from the keyspace; decrypt and score.
-    Oracle distances are filled later when the gold plaintext g is known.
+    Oracle distances are filled later when the gold plaintext g is known (or right away if `g` is given,
+    which saves decrypting every candidate a second time).
+    `fitness` may be a per-string callable or a batched scorer (see scoring.py).
+    """
+    return _decrypt_and_score(ks, random_pool_keys(ks, num_keys=num_keys), ciphertext, fitness, prof, g)
+
+def random_pool_keys(ks: MonoSubKeyspace, *, num_keys: int) -> np.ndarray:
+    """Key matrix of `num_keys` random keys (the key half of build_random_pool)."""
+    return ks.key_matrix([ks.random_key() for _ in range(num_keys)])
+
+# plaintexts are decrypted, scored and dropped in chunks so a pool never holds all of them at once
+SCORE_CHUNK = 256
+
+def _decrypt_and_score(
+    ks: MonoSubKeyspace,
+    keys: Union[List[str], np.ndarray],
+    ciphertext: str,
+    fitness: Fitness,
+    prof: Profiler,
+    g: Optional[str],
+) -> CandidatePool:
+    return score_candidates(ks, keys, ciphertext, {"": fitness}, prof=prof, g=g)[""]
+
+def score_candidates(
+    ks: MonoSubKeyspace,
+    keys: Union[List[str], np.ndarray],
+    ciphertext: str,
+    fitnesses: Mapping[str, Fitness],
+    *,
+    prof: Profiler = NULL_PROFILER,
+    g: Optional[str] = None,
+) -> Dict[str, CandidatePool]:
     """
-    pool: List[Candidate] = []
-    for _ in range(num_keys):
-        k = ks.random_key()
-        x = ks.decrypt(ciphertext, k)
-        s = fitness(x)
-        pool.append((k, x, s, 0.0))
-    return pool
+    Decrypts each candidate once and scores it with every fitness function.
+    Returns one pool per name; all of them share the same keys and dists arrays.
+    """
+    keyMatrix = keys if isinstance(keys, np.ndarray) else ks.key_matrix(keys)
+    # repeated keys would be decrypted and scored twice and over-weight their pairs
+    unique = ks.unique_keys(keyMatrix)
+    prof.count("duplicate_keys_dropped", keyMatrix.shape[0] - unique.shape[0])
+    keyMatrix = unique
+    n = keyMatrix.shape[0]
+    dists = np.full(n, np.nan)
+    pools = {name: CandidatePool(ks, ciphertext, keyMatrix, np.empty(n, dtype=np.float64), dists)
+             for name in fitnesses}
+    textScorers = {}
+    for name, fitness in fitnesses.items():
+        scorer = as_batch_fitness(fitness)
+        if isinstance(scorer, KeyFitness):
+            pools[name].scores[:] = score_pool(ks, ciphertext, keyMatrix, scorer, prof=prof)
+        else:
+            textScorers[name] = scorer
+            prof.count("fitness_calls", n)
+    if not textScorers and g is None:
+        return pools
+    for start in range(0, n, SCORE_CHUNK):
+        stop = min(start + SCORE_CHUNK, n)
+        with prof.phase("decrypt"):
+            block = [ks.decrypt(ciphertext, ks.key_string(row)) for row in keyMatrix[start:stop]]
+        prof.count("candidates_decrypted", len(block))
+        for name, scorer in textScorers.items():
+            with prof.phase("fitness"):
+                pools[name].scores[start:stop] = score_texts(scorer, block)
+            prof.count("fitness_batches")
+        if g is not None:
+            with prof.phase("oracle"):
+                dists[start:stop] = [normalised_levenshtein(x, g) for x in block]
+            prof.count("oracle_calls", len(block))
+    return pools
+
+def score_pool(
+    ks: MonoSubKeyspace,
+    ciphertext: str,
+    keys: Union[Sequence[str], np.ndarray],
+    fitness: Fitness,
+    *,
+    texts: Optional[Sequence[str]] = None,
+    prof: Profiler = NULL_PROFILER,
+) -> np.ndarray:
+    """
+    One scorer call for the given keys (strings or a key_matrix). Key-level scorers win when a scorer
+    offers both; text scorers use `texts` if supplied, else the keys are decrypted.
+    """
+    scorer = as_batch_fitness(fitness)
+    keyMatrix = keys if isinstance(keys, np.ndarray) else ks.key_matrix(keys)
+    n = keyMatrix.shape[0]
+    prof.count("fitness_calls", n)
+    prof.count("fitness_batches")
+    if isinstance(scorer, KeyFitness):
+        with prof.phase("fitness"):
+            scores = np.asarray(scorer.score_keys(ks.encode(ciphertext), ks.decryption_matrix(keyMatrix)),
+                                dtype=np.float64)
+        if scores.shape != (n,):
+            raise ValueError(f"score_keys returned {scores.shape} scores for {n} keys")
+        return scores
+    if texts is None:
+        with prof.phase("decrypt"):
+            texts = [ks.decrypt(ciphertext, ks.key_string(row)) for row in keyMatrix]
+        prof.count("candidates_decrypted", n)
+    with prof.phase("fitness"):
+        return np.asarray(score_texts(scorer, texts), dtype=np.float64)
 
 def build_local_pool_exact_radius(
     ks: MonoSubKeyspace,
     true_key: str,
     ciphertext: str,
-    fitness: Callable[[str], float],
+    fitness: Fitness,
     *,
     radius: int,
     per_seed: int,
     n_seeds: int,
     rng: random.Random,
-) -> List[Candidate]:
+    prof: Profiler = NULL_PROFILER,
+    g: Optional[str] = None,
+) -> CandidatePool:
     """
     Build a *ball* of candidates around multiple seeds (seed itself + neighbours at all radii ≤ r).
     Seeds are: {true_key} plus (n_seeds-1) random keys.
     For each seed and each d in 1..radius, sample 'per_seed' neighbours at exact distance d.
+    Keys repeated across seeds/radii are dropped before anything is decrypted or scored.
     """
+    keys = local_pool_keys(ks, true_key, radius=radius, per_seed=per_seed, n_seeds=n_seeds, prof=prof)
+    return _decrypt_and_score(ks, keys, ciphertext, fitness, prof, g)
+
+def local_pool_keys(
+    ks: MonoSubKeyspace,
+    true_key: str,
+    *,
+    radius: int,
+    per_seed: int,
+    n_seeds: int,
+    prof: Profiler = NULL_PROFILER,
+) -> np.ndarray:
+    """Key matrix for build_local_pool_exact_radius: each seed followed by its neighbours at d = 1..radius."""
     seeds = [true_key] + [ks.random_key() for _ in range(max(0, n_seeds - 1))]
-    pool: List[Candidate] = []
-    for seed in seeds:
-        # include the seed (radius 0) so r=1 has valid seed↔neighbour pairs
-        x0 = ks.decrypt(ciphertext, seed)
-        s0 = fitness(x0)
-        pool.append((seed, x0, s0, 0.0))
-        for d in range(1, radius+1):
-            for _ in range(per_seed):
-                k = ks.neighbour_by_swaps(seed, d)
-                if k == seed:
-                    continue
-                x = ks.decrypt(ciphertext, k)
-                s = fitness(x)
-                pool.append((k, x, s, 0.0))
-    return pool
+    blocks: List[np.ndarray] = []
+    with prof.phase("neighbours"):
+        for seed in ks.key_matrix(seeds):
+            # include the seed (radius 0) so r=1 has valid seed↔neighbour pairs
+            blocks.append(seed[None, :])
+            for d in range(1, radius+1):
+                blocks.append(ks.neighbours_at_distance(seed, d, per_seed))
+        return np.concatenate(blocks)
 
 def build_pairwise_dataset(
     ks: MonoSubKeyspace,
-    pool: List[Candidate],
+    pool: CandidatePool,
     *,
     g: str,
     max_pairs: int,
     rng: random.Random,
     local_radius_cap: Optional[int] = None,
+    prof: Profiler = NULL_PROFILER,
 ) -> Tuple[List[int], List[float]]:
     """
     From a pool of candidates, construct pairwise labels y and score-differences z.
     y = 1 if candidate i is *closer* to gold plaintext g (smaller oracle distance) than j; else 0.
     z = s_i - s_j, i.e., positive if fitness ranks i above j.
     If local_radius_cap is not None, keep only pairs whose *mutual* Cayley distance ≤ cap.
+    Fills any missing pool.dists in place.
+    """
+    i, j, y = sample_pairs(ks, pool, g=g, max_pairs=max_pairs, rng=rng, local_radius_cap=local_radius_cap, prof=prof)
+    with prof.phase("pair_labels"):
+        z = pair_differences(pool.scores, i, j)
+    return y.tolist(), z.tolist()
+
+def _fill_dists(pool: CandidatePool, g: str, prof: Profiler) -> None:
+    # fill oracle distances not already computed by the pool builder, one candidate at a time
+    missing = np.flatnonzero(np.isnan(pool.dists))
+    if missing.size:
+        with prof.phase("oracle"):
+            for k in missing.tolist():
+                pool.dists[k] = normalised_levenshtein(pool.plaintext(k), g)
+        prof.count("oracle_calls", missing.size)
+
+def _label_pairs(
+    ks: MonoSubKeyspace,
+    pool: CandidatePool,
+    pairs: Sequence[Tuple[int, int]],
+    local_radius_cap: Optional[int],
+    prof: Profiler,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(i, j, y) for sampled pairs: Cayley cap applied, oracle ties dropped."""
+    idx = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    i, j = idx[:, 0], idx[:, 1]
+    if local_radius_cap is not None:
+        with prof.phase("cayley"):
+            near = ks.cayley_distances(pool.keys[i], pool.keys[j]) <= local_radius_cap
+            i, j = i[near], j[near]
+        prof.count("pairs_rejected_radius", idx.shape[0] - i.size)
+    with prof.phase("pair_labels"):
+        di, dj = pool.dists[i], pool.dists[j]
+        keep = di != dj  # ignore ties in oracle
+        i, j = i[keep], j[keep]
+        y = (di[keep] < dj[keep]).astype(np.int8)
+    prof.count("pairs_rejected_tie", keep.size - y.size)
+    return i, j, y
+
+def sample_pairs(
+    ks: MonoSubKeyspace,
+    pool: CandidatePool,
+    *,
+    g: str,
+    max_pairs: int,
+    rng: random.Random,
+    local_radius_cap: Optional[int] = None,
+    prof: Profiler = NULL_PROFILER,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The fitness-independent half of build_pairwise_dataset: (i, j, y) for the kept pairs, oracle ties dropped.
+    Pools from score_candidates share keys and dists, so one call serves every fitness function.
     """
-    # fill oracle distances
-    pool2: List[Candidate] = [(k, x, s, normalised_levenshtein(x, g)) for (k, x, s, _) in pool]
-    n = len(pool2)
-    if n < 2:
-        return [], []
-    keys = [k for (k, _, _, _) in pool2]
-    dists = [d for (_, _, _, d) in pool2]
-    scores = [s for (_, _, s, _) in pool2]
-
-    y: List[int] = []
-    z: List[float] = []
-
-    for i, j in sample_pair_indices(n, max_pairs, rng):
-        if local_radius_cap is not None:
-            if ks.cayley_distance(keys[i], keys[j]) > local_radius_cap:
-                continue
-        di, dj = dists[i], dists[j]
-        if di == dj:
-            continue  # ignore ties in oracle
-        yi = 1 if di < dj else 0
-        zi = scores[i] - scores[j]
-        y.append(yi)
-        z.append(zi)
-        if len(y) >= max_pairs:
+    _fill_dists(pool, g, prof)
+    with prof.phase("pair_sampling"):
+        pairs = sample_pair_indices(len(pool), max_pairs, rng)
+    prof.count("pairs_sampled", len(pairs))
+    i, j, y = _label_pairs(ks, pool, pairs, local_radius_cap, prof)
+    prof.count("pairs_kept", y.size)
+    return i, j, y
+
+def adaptive_pairs(
+    ks: MonoSubKeyspace,
+    pools: Mapping[str, CandidatePool],
+    *,
+    g: str,
+    max_pairs: int,
+    rng: random.Random,
+    tolerance: float,
+    batch: int = 2000,
+    min_pairs: int = 1000,
+    z_crit: float = 1.96,
+    local_radius_cap: Optional[int] = None,
+    prof: Profiler = NULL_PROFILER,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray], Dict[str, float]]:
+    """
+    sample_pairs with early stopping: pairs are added `batch` at a time and sampling stops once at least
+    `min_pairs` are kept and the CI half-width (z_crit * DeLong SE) of every pool's pairwise AUC is
+    <= tolerance, or after max_pairs sampled pairs. `pools` share keys and dists (see score_candidates).
+    Returns (i, j, y, {name: z}, {name: half-width}).
+    Pairs share candidates, so the SE treats them as independent and is somewhat optimistic.
+    """
+    first = next(iter(pools.values()))
+    _fill_dists(first, g, prof)
+    iParts: List[np.ndarray] = [np.empty(0, dtype=np.int64)]
+    jParts: List[np.ndarray] = [np.empty(0, dtype=np.int64)]
+    yParts: List[np.ndarray] = [np.empty(0, dtype=np.int8)]
+    halfwidths = {name: float("nan") for name in pools}
+
+    def check() -> bool:
+        i, j, y = np.concatenate(iParts), np.concatenate(jParts), np.concatenate(yParts)
+        iParts[:], jParts[:], yParts[:] = [i], [j], [y]
+        with prof.phase("auc"):
+            for name, pool in pools.items():
+                halfwidths[name] = z_crit * auc_with_se(y, pair_differences(pool.scores, i, j))[1]
+        prof.count("auc_checks")
+        return all(h <= tolerance for h in halfwidths.values())  # NaN (one class so far) never passes
+
+    batches = iter_pair_indices(len(first), max_pairs, rng, batch)
+    unchecked = True
+    while True:
+        with prof.phase("pair_sampling"):
+            pairs = next(batches, None)
+        if pairs is None:
             break
+        prof.count("pairs_sampled", len(pairs))
+        i, j, y = _label_pairs(ks, first, pairs, local_radius_cap, prof)
+        iParts.append(i)
+        jParts.append(j)
+        yParts.append(y)
+        unchecked = True
+        if sum(part.size for part in yParts) < min_pairs:
+            continue
+        unchecked = False
+        if check():
+            break
+    batches.close()
+    if unchecked:
+        # budget ran out before the next check: report the width of what is actually returned
+        check()
+    i, j, y = iParts[0], jParts[0], yParts[0]
+    prof.count("pairs_kept", y.size)
+    zs = {name: pair_differences(pool.scores, i, j) for name, pool in pools.items()}
+    return i, j, y, zs, halfwidths
 
-    return y, z
+def pair_differences(scores: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """z = s_i - s_j for pairs from sample_pairs."""
+    return scores[i] - scores[j]
 
 def auc_from_pairs(y: Sequence[int], z: Sequence[float]) -> float:
     """
     Compute AUC treating (y,z) as positives/negatives with scores=score-differences.
     Returns NaN if less than two classes present.
     """
-    if not y:
-        return float("nan")
-    try:
-        return roc_auc_score(y, z)
-    except Exception:
+    if len(y) == 0:
         return float("nan")
+    return auc_score(y, z)
 
 def tpr_at_zero(y: Sequence[int], z: Sequence[float]) -> float:
     """
     Pairwise accuracy at threshold 0:
       correct if (z>0 and y=1) or (z<0 and y=0). Ties (z=0) ignored.
     """
-    correct = 0
-    total = 0
-    for yi, zi in zip(y, z):
-        if zi == 0:
-            continue
-        total += 1
-        if (zi > 0 and yi == 1) or (zi < 0 and yi == 0):
-            correct += 1
+    y = np.asarray(y)
+    z = np.asarray(z, dtype=np.float64)
+    total = int(np.count_nonzero(z))
+    correct = int(np.count_nonzero(((z > 0) & (y == 1)) | ((z < 0) & (y == 0))))
     return correct / total if total else float("nan")
@@ -0,0 +1,83 @@
+# nabu/eval/pool.py
+from __future__ import annotations
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .keyspace import MonoSubKeyspace
+
+
+class CandidatePool:
+    """
+    Columnar candidate pool (replaces List[(key, plaintext, score, oracle_dist)]):
+      - keys:   (N, A) ring indices (uint8 for A <= 255), row n is key n as alphabet indices (key string = alphabet[row])
+      - scores: (N,) float64 fitness scores
+      - dists:  (N,) float64 oracle distances, NaN until filled by the pair builder
+    Plaintexts are not stored unless asked for; plaintext(i) re-decrypts on demand, so a pool
+    costs ~A+16 bytes per candidate regardless of text length.
+    """
+    __slots__ = ("ks", "ciphertext", "keys", "scores", "dists", "_texts")
+
+    def __init__(
+        self,
+        ks: MonoSubKeyspace,
+        ciphertext: str,
+        keys: np.ndarray,
+        scores: np.ndarray,
+        dists: Optional[np.ndarray] = None,
+        texts: Optional[List[str]] = None,
+    ) -> None:
+        n = keys.shape[0]
+        if scores.shape != (n,):
+            raise ValueError(f"scores shape {scores.shape} does not match {n} keys")
+        self.ks = ks
+        self.ciphertext = ciphertext
+        self.keys = keys
+        self.scores = scores
+        self.dists = dists if dists is not None else np.full(n, np.nan)
+        self._texts = texts
+
+    def __len__(self) -> int:
+        return self.keys.shape[0]
+
+    def key(self, i: int) -> str:
+        return self.ks.key_string(self.keys[i])
+
+    def key_strings(self) -> List[str]:
+        return [self.ks.key_string(row) for row in self.keys]
+
+    def plaintext(self, i: int) -> str:
+        if self._texts is not None:
+            return self._texts[i]
+        return self.ks.decrypt(self.ciphertext, self.key(i))
+
+    def plaintexts(self) -> Iterator[str]:
+        """Decrypts one candidate at a time; never holds more than one plaintext unless retained."""
+        for i in range(len(self)):
+            yield self.plaintext(i)
+
+    def retain_plaintexts(self) -> None:
+        if self._texts is None:
+            self._texts = list(self.plaintexts())
+
+    def concat(self, other: "CandidatePool") -> "CandidatePool":
+        if other.ciphertext != self.ciphertext:
+            raise ValueError("cannot merge pools built from different ciphertexts")
+        texts = self._texts + other._texts if self._texts is not None and other._texts is not None else None
+        return CandidatePool(
+            self.ks, self.ciphertext,
+            np.concatenate([self.keys, other.keys]),
+            np.concatenate([self.scores, other.scores]),
+            np.concatenate([self.dists, other.dists]),
+            texts,
+        )
+
+    def to_tuples(self) -> List[Tuple[str, str, float, float]]:
+        """Legacy (key, plaintext, score, oracle_dist) view; materialises every plaintext."""
+        return [(self.key(i), self.plaintext(i), float(self.scores[i]), float(self.dists[i]))
+                for i in range(len(self))]
+
+    @classmethod
+    def from_key_strings(cls, ks: MonoSubKeyspace, ciphertext: str, keys: Sequence[str],
+                         scores: Sequence[float]) -> "CandidatePool":
+        return cls(ks, ciphertext, ks.key_matrix(keys), np.asarray(scores, dtype=np.float64))
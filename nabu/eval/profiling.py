@@ -0,0 +1,104 @@
+# nabu/eval/profiling.py
+from __future__ import annotations
+import json
+from collections import defaultdict
+from time import perf_counter
+from typing import Any, Dict, Iterable, Optional
+
+
+class _Phase:
+    __slots__ = ("prof", "name", "t0")
+
+    def __init__(self, prof: "Profiler", name: str) -> None:
+        self.prof = prof
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.t0 = perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.prof.timings[self.name] += perf_counter() - self.t0
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NO_PHASE = _NoPhase()
+
+
+class Profiler:
+    """
+    Per-phase wall-clock timers and counters for the evaluator hot path.
+    Phases are timed around whole blocks (all decrypts, all fitness calls, ...), never per candidate,
+    so switching profiling on barely moves the numbers it reports.
+    """
+    enabled = True
+
+    def __init__(self) -> None:
+        self.timings: Dict[str, float] = defaultdict(float)
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.wall = 0.0  # end-to-end seconds, set by the caller; phases need not cover all of it
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counts[name] += n
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        """Fold in another profile (a Profiler.to_dict()), e.g. when summing over texts."""
+        for k, v in other.get("timings_s", {}).items():
+            self.timings[k] += v
+        for k, v in other.get("counts", {}).items():
+            self.counts[k] += v
+        self.wall += other.get("wall_s", 0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "timings_s": dict(sorted(self.timings.items())),
+            "counts": dict(sorted(self.counts.items())),
+            "phases_s": sum(self.timings.values()),
+            "wall_s": self.wall,
+        }
+
+    def to_json(self, path: Optional[str] = None, **meta: Any) -> str:
+        """Serialise (plus any run metadata) for regression tracking; also writes to `path` if given."""
+        txt = json.dumps({**meta, **self.to_dict()}, indent=2, sort_keys=True)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(txt)
+        return txt
+
+
+class NullProfiler(Profiler):
+    """Default: every hook is a constant-time no-op."""
+    enabled = False
+
+    def __init__(self) -> None:
+        pass
+
+    def phase(self, name: str) -> _NoPhase:  # type: ignore[override]
+        return _NO_PHASE
+
+    def count(self, name: str, n: int = 1) -> None:
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {}
+
+
+NULL_PROFILER = NullProfiler()
+
+
+def merge_profiles(profiles: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    total = Profiler()
+    for p in profiles:
+        total.merge(p)
+    return total.to_dict()
@@ -2,32 +2,65 @@
 from __future__ import annotations
 import random
 from itertools import islice
-from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Any
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Any
+import numpy as np
 
 from .keyspace import MonoSubKeyspace
 from .pairwise import (
-    build_random_pool,
-    build_local_pool_exact_radius,
-    build_pairwise_dataset,
+    random_pool_keys,
+    local_pool_keys,
+    score_candidates,
+    sample_pairs,
+    adaptive_pairs,
+    pair_differences,
+    score_pool,
     auc_from_pairs,
     tpr_at_zero,
 )
-from .oracle import normalised_levenshtein
+from .metrics import TRUE_KEY_TOP_K, true_key_rank
+from .cache import (
+    CACHE_VERSION,
+    ResultCache,
+    cache_key,
+    fitness_set_identity,
+    rng_state_to_json,
+    rng_state_from_json,
+)
+from .checkpoint import RunLog, merge_run_logs, text_hash
+from .profiling import Profiler, NULL_PROFILER, merge_profiles
+from .scoring import Fitness
+from .pool import CandidatePool
+from time import perf_counter
+
+# rank / margin / top-k fields the true-key diagnostic adds next to the aux_*_true_vs_rest_auc ones
+TRUE_KEY_FIELDS = tuple(f"aux_{pool}_true_{metric}" for pool in ("global", "local")
+                        for metric in ("rank", "margin", *(f"top{k}" for k in TRUE_KEY_TOP_K)))
 
 class MonoSubEvaluator:
     """
     Evaluate a monoalphabetic substitution fitness function by global and local (Cayley-ball) AUC.
+    Pass a ResultCache to replay previously computed texts instead of re-running them.
     """
-    def __init__(self, alphabet: str = "abcdefghijklmnopqrstuvwxyz", rngSeed: Optional[int] = 12345) -> None:
+    def __init__(self, alphabet: str = "abcdefghijklmnopqrstuvwxyz", rngSeed: Optional[int] = 12345,
+                 *, cache: Optional[ResultCache] = None) -> None:
         self.alphabet = alphabet
+        self.rngSeed = rngSeed
         self.ks = MonoSubKeyspace(alphabet, rngSeed)
         self.rng = random.Random(rngSeed)
+        self.cache = cache
+
+    def _rngStates(self) -> List[Any]:
+        return [rng_state_to_json(self.ks._rng), rng_state_to_json(self.rng)]
+
+    def _setRngStates(self, states: List[Any]) -> None:
+        self.ks._rng.setstate(rng_state_from_json(states[0]))
+        self.rng.setstate(rng_state_from_json(states[1]))
 
     def evaluate(
         self,
         *,
         plaintext: str,
-        fitnessFunc: Callable[[str], float],
+        fitnessFunc: Fitness,
         globalNumKeys: int = 500,
         globalMaxPairs: int = 50_000,
         localRadii: Sequence[int] = (1, 2, 3),
@@ -35,115 +68,381 @@ class MonoSubEvaluator:
         localPerSeed: int = 200,
         localMaxPairs: int = 50_000,
         includeTrueKeyDiagnostic: bool = True,
+        profile: bool = False,
+        aucTolerance: Optional[float] = None,
+        pairBatch: int = 2000,
+        returnPairs: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        profile=True attaches report["profile"]: per-phase seconds (decrypt, fitness, oracle, cayley, auc, ...)
+        and counters (fitness calls, pairs sampled/rejected, ...). Off by default and free when off.
+        aucTolerance switches pair sampling to adaptive mode: pairs are added `pairBatch` at a time until
+        the 95% CI half-width of each pairwise AUC is <= aucTolerance, with global/localMaxPairs as the
+        budget. The aggregate then also carries global_auc_halfwidth / local_auc_halfwidth.
+        report["pairs"] always has the number of pairs each AUC was computed from.
+        includeTrueKeyDiagnostic adds the true key vs the rest of each pool: aux_*_true_vs_rest_auc plus its
+        rank, score margin over the best wrong key and top1/top10 hits, all from the pools' own scores.
+        returnPairs=True attaches report["pair_sets"]: {"global": (y, z), r: (y, z), ...} as arrays, the exact
+        pairs behind every AUC (viz.renderRocReport draws from these). They are never written to caches or logs.
+        """
+        return self._evaluate(
+            plaintext, {"": fitnessFunc}, fitnessFunc,
+            globalNumKeys=globalNumKeys, globalMaxPairs=globalMaxPairs, localRadii=localRadii,
+            localSeeds=localSeeds, localPerSeed=localPerSeed, localMaxPairs=localMaxPairs,
+            includeTrueKeyDiagnostic=includeTrueKeyDiagnostic, profile=profile,
+            aucTolerance=aucTolerance, pairBatch=pairBatch, returnPairs=returnPairs,
+        )
+
+    def evaluate_multi(
+        self,
+        *,
+        plaintext: str,
+        fitnessFuncs: Mapping[str, Fitness],
+        **kwargs: Any,
     ) -> Dict[str, Any]:
+        """
+        Same as evaluate() for several fitness functions at once: pools, oracle distances and pair
+        indices are built once per text and every function is scored on the same pairs, so the
+        comparison is paired and the expensive parts are not repeated per function.
+        report["aggregate"][name] has the same fields as evaluate()'s aggregate, and with returnPairs=True
+        report["pair_sets"] holds (y, {name: z}) per pool.
+        """
+        if not fitnessFuncs:
+            raise ValueError("fitnessFuncs must name at least one fitness function")
+        if "" in fitnessFuncs:
+            raise ValueError("fitness names must be non-empty")
+        return self._evaluate(plaintext, dict(fitnessFuncs), fitnessFuncs, **kwargs)
+
+    def _evaluate(
+        self,
+        plaintext: str,
+        fitnesses: Dict[str, Fitness],
+        identity: Any,
+        *,
+        globalNumKeys: int = 500,
+        globalMaxPairs: int = 50_000,
+        localRadii: Sequence[int] = (1, 2, 3),
+        localSeeds: int = 3,
+        localPerSeed: int = 200,
+        localMaxPairs: int = 50_000,
+        includeTrueKeyDiagnostic: bool = True,
+        profile: bool = False,
+        aucTolerance: Optional[float] = None,
+        pairBatch: int = 2000,
+        returnPairs: bool = False,
+    ) -> Dict[str, Any]:
+        # fitnesses == {"": f} is plain evaluate(): flat aggregate and unsuffixed cache arrays
+        single = list(fitnesses) == [""]
         ks = self.ks
+        prof = Profiler() if profile else NULL_PROFILER
+        tStart = perf_counter()
+        key = None
+        if self.cache is not None:
+            params = {
+                "alphabet": self.alphabet, "globalNumKeys": globalNumKeys, "globalMaxPairs": globalMaxPairs,
+                "localRadii": list(localRadii), "localSeeds": localSeeds, "localPerSeed": localPerSeed,
+                "localMaxPairs": localMaxPairs, "includeTrueKeyDiagnostic": includeTrueKeyDiagnostic,
+                "aucTolerance": aucTolerance, "pairBatch": pairBatch,
+            }
+            key = cache_key(plaintext=plaintext, fitnessFunc=identity, rngSeed=self.rngSeed,
+                            params=params, rngStates=self._rngStates())
+            hit = self.cache.get(key)
+            if hit is not None:
+                # leave the RNGs exactly where the original run left them
+                self._setRngStates(hit["meta"]["rng_after"])
+                report = _reportFromJson(hit["meta"]["report"], single)
+                if returnPairs:
+                    report["pair_sets"] = _pairSets(hit, list(fitnesses), localRadii, single)
+                if profile:
+                    prof.count("cache_hits")
+                    prof.wall = perf_counter() - tStart
+                    report["profile"] = prof.to_dict()
+                return report
+        arrays: Dict[str, Any] = {}
+        names = list(fitnesses)
+        adaptive = aucTolerance is not None
+        agg: Dict[str, Dict[str, Any]] = {name: {
+            "local_auc_pairwise": {}, "local_tpr_at_zero": {}, "aux_local_true_vs_rest_auc": {},
+            "local_auc_halfwidth": {}, "aux_global_true_vs_rest_auc": float("nan"),
+            **{f: {} if f.startswith("aux_local") else float("nan") for f in TRUE_KEY_FIELDS},
+        } for name in names}
+        pairCounts: Dict[str, Any] = {"local": {}}
+
         # Pick a random true key and form ciphertext
         trueKey = ks.random_key()
         ciphertext = ks.encrypt(plaintext, trueKey)
 
-        # ---------- Global ----------
-        globalPool = build_random_pool(ks, ciphertext, fitnessFunc, num_keys=globalNumKeys, rng=self.rng)
-        yGlob, zGlob = build_pairwise_dataset(ks, globalPool, g=plaintext, max_pairs=globalMaxPairs, rng=self.rng)
-        globalAUC = auc_from_pairs(yGlob, zGlob)
-        globalTPR0 = tpr_at_zero(yGlob, zGlob)
+        trueScores: Dict[str, float] = {}
 
-        # Auxiliary: "true key vs rest" AUC (binary classification on oracle distance)
-        auxGlobalBin = float("nan")
-        if includeTrueKeyDiagnostic:
-            # Add the true key candidate and compute AUC of oracle-distance vs score
-            xTrue = ks.decrypt(ciphertext, trueKey)
-            sTrue = fitnessFunc(xTrue)
-            poolAux = globalPool + [(trueKey, xTrue, sTrue, 0.0)]
-            # Treat label = 1 if candidate equals true plaintext (oracle distance 0), else 0
-            labels = [1 if normalised_levenshtein(x, plaintext) == 0.0 else 0 for (_, x, _, _) in poolAux]
-            scores = [s for (_, _, s, _) in poolAux]
-            if len(set(labels)) == 2:
-                from sklearn.metrics import roc_auc_score
-                auxGlobalBin = roc_auc_score(labels, scores)
+        def trueKeyDiagnostic(prefix: str, pools: Dict[str, CandidatePool], r: Optional[int] = None) -> None:
+            # Auxiliary: the true key vs the rest of the pool, from the scores already computed.
+            # Positives are the candidates that decrypt to the plaintext, found by key equality.
+            with prof.phase("diagnostic"):
+                positive = ks.decrypts_like(pools[names[0]].keys, trueKey, plaintext)
+                for name, pool in pools.items():
+                    if name not in trueScores:
+                        # local pools hold the true key (their first seed); only the global pool may need a call
+                        trueScores[name] = (float(pool.scores[positive][0]) if positive.any() else
+                                            float(score_pool(ks, ciphertext, ks.key_matrix([trueKey]),
+                                                             fitnesses[name], texts=[plaintext], prof=prof)[0]))
+                    for metric, value in true_key_rank(pool.scores, positive, trueScores[name]).items():
+                        field = f"{prefix}_true_vs_rest_auc" if metric == "auc" else f"{prefix}_true_{metric}"
+                        if r is None:
+                            agg[name][field] = value
+                        else:
+                            agg[name][field][r] = value
 
-        # ---------- Local (ball semantics) ----------
-        localAUCs: Dict[int, float] = {}
-        localTPR0s: Dict[int, float] = {}
-        auxLocalBin: Dict[int, float] = {}
-        for r in localRadii:
-            localPool = build_local_pool_exact_radius(
-                ks, trueKey, ciphertext, fitnessFunc,
-                radius=r, per_seed=localPerSeed, n_seeds=localSeeds, rng=self.rng
+        def pairsFor(pools: Dict[str, CandidatePool], maxPairs: int, cap: Optional[int]):
+            first = pools[names[0]]
+            if not adaptive:
+                i, j, y = sample_pairs(ks, first, g=plaintext, max_pairs=maxPairs, rng=self.rng,
+                                       local_radius_cap=cap, prof=prof)
+                zs = {name: pair_differences(pool.scores, i, j) for name, pool in pools.items()}
+                return y, zs, {}
+            _, _, y, zs, halfwidths = adaptive_pairs(
+                ks, pools, g=plaintext, max_pairs=maxPairs, rng=self.rng, tolerance=aucTolerance,
+                batch=pairBatch, local_radius_cap=cap, prof=prof,
             )
-            yLoc, zLoc = build_pairwise_dataset(
-                ks, localPool, g=plaintext, max_pairs=localMaxPairs, rng=self.rng, local_radius_cap=r
-            )
-            localAUCs[r] = auc_from_pairs(yLoc, zLoc)
-            localTPR0s[r] = tpr_at_zero(yLoc, zLoc)
+            return y, zs, halfwidths
+
+        def scorePairs(prefix: str, pools: Dict[str, CandidatePool], y: np.ndarray,
+                       zs: Dict[str, np.ndarray]) -> Dict[str, Tuple[float, float]]:
+            first = pools[names[0]]
+            arrays.update({f"{prefix}_keys": first.keys, f"{prefix}_dists": first.dists,
+                           f"{prefix}_y": y.astype(np.int8)})
+            out = {}
+            for name, pool in pools.items():
+                z = zs[name]
+                with prof.phase("auc"):
+                    out[name] = (auc_from_pairs(y, z), tpr_at_zero(y, z))
+                suffix = f":{name}" if name else ""
+                arrays[f"{prefix}_scores{suffix}"] = pool.scores
+                arrays[f"{prefix}_z{suffix}"] = z
+            return out
+
+        # ---------- Global ----------
+        globalPools = score_candidates(ks, random_pool_keys(ks, num_keys=globalNumKeys), ciphertext, fitnesses,
+                                       prof=prof, g=plaintext)
+        y, zs, halfwidths = pairsFor(globalPools, globalMaxPairs, None)
+        pairCounts["global"] = int(y.size)
+        for name, (auc, tpr0) in scorePairs("global", globalPools, y, zs).items():
+            agg[name]["global_auc_pairwise"] = auc
+            agg[name]["global_tpr_at_zero"] = tpr0
+            agg[name]["global_auc_halfwidth"] = halfwidths.get(name)
 
+        # ---------- Local (ball semantics) ----------
+        for r in localRadii:
+            keys = local_pool_keys(ks, trueKey, radius=r, per_seed=localPerSeed, n_seeds=localSeeds, prof=prof)
+            localPools = score_candidates(ks, keys, ciphertext, fitnesses, prof=prof, g=plaintext)
+            y, zs, halfwidths = pairsFor(localPools, localMaxPairs, r)
+            pairCounts["local"][r] = int(y.size)
+            for name, (auc, tpr0) in scorePairs(f"local{r}", localPools, y, zs).items():
+                agg[name]["local_auc_pairwise"][r] = auc
+                agg[name]["local_tpr_at_zero"][r] = tpr0
+                agg[name]["local_auc_halfwidth"][r] = halfwidths.get(name)
             if includeTrueKeyDiagnostic:
-                xTrue = ks.decrypt(ciphertext, trueKey)
-                sTrue = fitnessFunc(xTrue)
-                poolAux = localPool + [(trueKey, xTrue, sTrue, 0.0)]
-                labels = [1 if normalised_levenshtein(x, plaintext) == 0.0 else 0 for (_, x, _, _) in poolAux]
-                scores = [s for (_, _, s, _) in poolAux]
-                from sklearn.metrics import roc_auc_score
-                if len(set(labels)) == 2:
-                    auxLocalBin[r] = roc_auc_score(labels, scores)
-                else:
-                    auxLocalBin[r] = float("nan")
-
-        return {
-            "aggregate": {
-                "global_auc_pairwise": globalAUC,
-                "global_tpr_at_zero": globalTPR0,
-                "local_auc_pairwise": localAUCs,
-                "local_tpr_at_zero": localTPR0s,
-                "aux_global_true_vs_rest_auc": auxGlobalBin,
-                "aux_local_true_vs_rest_auc": auxLocalBin,
-            },
-            "true_key": trueKey,
-        }
+                trueKeyDiagnostic("aux_local", localPools, r)
+        # after the local pools, so the true key's score is usually known already
+        if includeTrueKeyDiagnostic:
+            trueKeyDiagnostic("aux_global", globalPools)
+
+        fields = ("global_auc_pairwise", "global_tpr_at_zero", "local_auc_pairwise", "local_tpr_at_zero",
+                  "aux_global_true_vs_rest_auc", "aux_local_true_vs_rest_auc")
+        if includeTrueKeyDiagnostic:
+            fields += TRUE_KEY_FIELDS
+        if adaptive:
+            fields += ("global_auc_halfwidth", "local_auc_halfwidth")
+        agg = {name: {f: a[f] for f in fields} for name, a in agg.items()}
+        report: Dict[str, Any] = {"aggregate": agg[""] if single else agg, "true_key": trueKey, "pairs": pairCounts}
+        if key is not None:
+            self.cache.put(key, arrays, meta={"report": report, "rng_after": self._rngStates()})
+        if returnPairs:
+            report["pair_sets"] = _pairSets(arrays, names, localRadii, single)
+        if profile:
+            prof.wall = perf_counter() - tStart
+            report["profile"] = prof.to_dict()
+        return report
 
     def evaluate_many(
         self,
         *,
         plaintextIter: Iterable[str],
-        fitnessFunc: Callable[[str], float],
+        fitnessFunc: Fitness,
         maxTexts: int = 30,
         minLen: int = 150,
+        checkpoint: Optional[str] = None,
+        shard: Optional[Tuple[int, int]] = None,
         **kwargs: Any,
     ) -> Dict[str, Any]:
         """
         Consume exactly 'maxTexts' qualifying plaintexts (len≥minLen) from 'plaintextIter' and evaluate each.
         Using islice ensures progress bars wrap cleanly even if the inner loop does not exhaust the outer iterator.
+          - checkpoint: path of a JSONL run log; every finished text is appended to it, and re-running with
+            the same path skips the texts already there (the RNGs are restored, so a resumed run gives the
+            same reports as an uninterrupted one)
+          - shard=(i, N): only evaluate texts whose id % N == i. Each text is then seeded from
+            (rngSeed, id), so its report does not depend on N; combine the shard logs with merge_checkpoints()
+        Texts replayed from a checkpoint carry no pair_sets (returnPairs); logs only hold the reports.
         """
+        return self._evaluateMany(
+            plaintextIter, lambda plain: self.evaluate(plaintext=plain, fitnessFunc=fitnessFunc, **kwargs),
+            fitnessFunc, None, maxTexts=maxTexts, minLen=minLen, checkpoint=checkpoint, shard=shard, params=kwargs,
+        )
+
+    def evaluate_many_multi(
+        self,
+        *,
+        plaintextIter: Iterable[str],
+        fitnessFuncs: Mapping[str, Fitness],
+        maxTexts: int = 30,
+        minLen: int = 150,
+        checkpoint: Optional[str] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """evaluate_many() over evaluate_multi(): one macro aggregate per fitness name, all from the same pairs."""
+        return self._evaluateMany(
+            plaintextIter, lambda plain: self.evaluate_multi(plaintext=plain, fitnessFuncs=fitnessFuncs, **kwargs),
+            fitnessFuncs, list(fitnessFuncs), maxTexts=maxTexts, minLen=minLen, checkpoint=checkpoint,
+            shard=shard, params=kwargs,
+        )
+
+    def _seedText(self, textId: int) -> None:
+        # a text's randomness depends only on (rngSeed, id), not on which texts this process ran before
+        if self.rngSeed is None:
+            self.ks._rng.seed()
+            self.rng.seed()
+        else:
+            self.ks._rng.seed(f"{self.rngSeed}:{textId}:keys")
+            self.rng.seed(f"{self.rngSeed}:{textId}:pairs")
+
+    def _evaluateMany(
+        self,
+        plaintextIter: Iterable[str],
+        evaluateOne: Callable[[str], Dict[str, Any]],
+        identity: Any,
+        names: Optional[List[str]],
+        *,
+        maxTexts: int,
+        minLen: int,
+        checkpoint: Optional[str],
+        shard: Optional[Tuple[int, int]],
+        params: Mapping[str, Any],
+    ) -> Dict[str, Any]:
+        # names is None for single-fitness runs (flat aggregates)
+        single = names is None
+        if shard is not None and not 0 <= shard[0] < shard[1]:
+            raise ValueError("shard must be (i, N) with 0 <= i < N")
+        log = None
+        if checkpoint is not None:
+            log = RunLog(checkpoint, {
+                "version": CACHE_VERSION, "fitness": fitness_set_identity(identity), "names": names,
+                "alphabet": self.alphabet, "rngSeed": self.rngSeed, "minLen": minLen,
+                "params": {k: v for k, v in params.items() if k not in ("profile", "returnPairs")},
+                "sharded": shard is not None, "shard": list(shard) if shard is not None else None,
+            })
         filtered = (p for p in plaintextIter if len(p) >= minLen)
         perText: List[Dict[str, Any]] = []
-        for t, plain in enumerate(islice(filtered, maxTexts), start=1):
-            rep = self.evaluate(plaintext=plain, fitnessFunc=fitnessFunc, **kwargs)
-            perText.append({"id": t-1, "len": len(plain), "report": rep})
-
-        # Macro-averages
-        def safe_mean(vals: List[Optional[float]]) -> float:
-            xs = [v for v in vals if v == v]  # drop NaNs
-            return sum(xs)/len(xs) if xs else float("nan")
-
-        globalAUCs = [r["report"]["aggregate"]["global_auc_pairwise"] for r in perText]
-        globalTPR0s = [r["report"]["aggregate"]["global_tpr_at_zero"] for r in perText]
-
-        # For locals, average per radius over texts
-        localRadii = set().union(*[
-            set(r["report"]["aggregate"]["local_auc_pairwise"].keys()) for r in perText
-        ]) if perText else set()
-
-        localAUCmacro: Dict[int, float] = {}
-        localTPR0macro: Dict[int, float] = {}
-        for r in sorted(localRadii):
-            localAUCmacro[r] = safe_mean([rpt["report"]["aggregate"]["local_auc_pairwise"].get(r, float("nan")) for rpt in perText])
-            localTPR0macro[r] = safe_mean([rpt["report"]["aggregate"]["local_tpr_at_zero"].get(r, float("nan")) for rpt in perText])
-
-        return {
-            "aggregate": {
-                "global_auc_pairwise_macro": safe_mean(globalAUCs),
-                "global_tpr_at_zero_macro": safe_mean(globalTPR0s),
-                "local_auc_pairwise_macro": localAUCmacro,
-                "local_tpr_at_zero_macro": localTPR0macro,
-            },
-            "per_text": perText,
-        }
+        try:
+            for t, plain in enumerate(islice(filtered, maxTexts)):
+                if shard is not None and t % shard[1] != shard[0]:
+                    continue
+                sha = text_hash(plain)
+                if log is not None and log.done(t, sha):
+                    rec = log.records[t]
+                    self._setRngStates(rec["rng_after"])
+                    perText.append({"id": t, "len": rec["len"], "report": _reportFromJson(rec["report"], single)})
+                    continue
+                if shard is not None:
+                    self._seedText(t)
+                rep = evaluateOne(plain)
+                perText.append({"id": t, "len": len(plain), "report": rep})
+                if log is not None:
+                    logged = {k: v for k, v in rep.items() if k != "pair_sets"}
+                    log.append({"id": t, "len": len(plain), "sha": sha, "report": logged,
+                                "rng_after": self._rngStates()})
+        finally:
+            if log is not None:
+                log.close()
+        return _manyReport(perText, names, profile=bool(params.get("profile")))
+
+
+def merge_checkpoints(paths: Sequence[str]) -> Dict[str, Any]:
+    """
+    evaluate_many()-style result from the run logs of several shards (or one resumed run):
+    per-text reports in id order and macro aggregates recomputed over all of them.
+    """
+    header, records = merge_run_logs(list(paths))
+    names = header["names"]
+    perText = [{"id": rec["id"], "len": rec["len"], "report": _reportFromJson(rec["report"], names is None)}
+               for rec in records]
+    return _manyReport(perText, names, profile=any("profile" in r["report"] for r in perText))
+
+
+def _manyReport(perText: List[Dict[str, Any]], names: Optional[List[str]], *, profile: bool) -> Dict[str, Any]:
+    if names is None:
+        aggregate = _macroAggregate([r["report"]["aggregate"] for r in perText])
+    else:
+        aggregate = {name: _macroAggregate([r["report"]["aggregate"][name] for r in perText]) for name in names}
+    out: Dict[str, Any] = {"aggregate": aggregate, "per_text": perText}
+    if profile:
+        out["profile"] = merge_profiles(r["report"]["profile"] for r in perText if "profile" in r["report"])
+    return out
+
+
+def _pairSets(arrays: Mapping[str, Any], names: List[str], localRadii: Sequence[int],
+              single: bool) -> Dict[Any, Tuple[np.ndarray, Any]]:
+    """report["pair_sets"] from the per-pool y / z arrays an evaluation stores (or replays from the cache)"""
+    out: Dict[Any, Tuple[np.ndarray, Any]] = {}
+    for pool in ("global", *localRadii):
+        prefix = "global" if pool == "global" else f"local{pool}"
+        zs = {name: np.asarray(arrays[f"{prefix}_z:{name}" if name else f"{prefix}_z"]) for name in names}
+        out[pool] = (np.asarray(arrays[f"{prefix}_y"]), zs[""] if single else zs)
+    return out
+
+
+def _macroAggregate(aggregates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Macro-averages of per-text aggregates (NaNs dropped)."""
+    def safe_mean(vals: List[Optional[float]]) -> float:
+        xs = [v for v in vals if v == v]  # drop NaNs
+        return sum(xs)/len(xs) if xs else float("nan")
+
+    globalAUCs = [a["global_auc_pairwise"] for a in aggregates]
+    globalTPR0s = [a["global_tpr_at_zero"] for a in aggregates]
+
+    # For locals, average per radius over texts
+    localRadii = set().union(*[set(a["local_auc_pairwise"].keys()) for a in aggregates]) if aggregates else set()
+
+    localAUCmacro: Dict[int, float] = {}
+    localTPR0macro: Dict[int, float] = {}
+    for r in sorted(localRadii):
+        localAUCmacro[r] = safe_mean([a["local_auc_pairwise"].get(r, float("nan")) for a in aggregates])
+        localTPR0macro[r] = safe_mean([a["local_tpr_at_zero"].get(r, float("nan")) for a in aggregates])
+
+    out = {
+        "global_auc_pairwise_macro": safe_mean(globalAUCs),
+        "global_tpr_at_zero_macro": safe_mean(globalTPR0s),
+        "local_auc_pairwise_macro": localAUCmacro,
+        "local_tpr_at_zero_macro": localTPR0macro,
+    }
+    # true-key diagnostic: mean AUC / rank / margin, and top-k hit rates (only when every text has it)
+    if aggregates and all(TRUE_KEY_FIELDS[0] in a for a in aggregates):
+        for field in ("aux_global_true_vs_rest_auc", *(f for f in TRUE_KEY_FIELDS if f.startswith("aux_global"))):
+            out[f"{field}_macro"] = safe_mean([a[field] for a in aggregates])
+        for field in ("aux_local_true_vs_rest_auc", *(f for f in TRUE_KEY_FIELDS if f.startswith("aux_local"))):
+            out[f"{field}_macro"] = {r: safe_mean([a[field].get(r, float("nan")) for a in aggregates])
+                                     for r in sorted(localRadii)}
+    return out
+
+
+def _reportFromJson(report: Dict[str, Any], single: bool = True) -> Dict[str, Any]:
+    """JSON turns the per-radius dict keys into strings; turn them back into ints."""
+    aggs = [report["aggregate"]] if single else list(report["aggregate"].values())
+    for agg in aggs:
+        for name in ("local_auc_pairwise", "local_tpr_at_zero", "aux_local_true_vs_rest_auc", "local_auc_halfwidth",
+                     *(f for f in TRUE_KEY_FIELDS if f.startswith("aux_local"))):
+            if name in agg:
+                agg[name] = {int(r): v for r, v in agg[name].items()}
+    if "pairs" in report:
+        report["pairs"]["local"] = {int(r): v for r, v in report["pairs"]["local"].items()}
+    return report
@@ -0,0 +1,60 @@
+# nabu/eval/scoring.py
+from __future__ import annotations
+from typing import Callable, List, Protocol, Sequence, Union, runtime_checkable
+
+import numpy as np
+
+
+@runtime_checkable
+class BatchFitness(Protocol):
+    """Scores a whole pool of candidate plaintexts in one call (higher = more plaintext-like)."""
+    def score_batch(self, texts: Sequence[str]) -> Sequence[float]: ...
+
+
+@runtime_checkable
+class KeyFitness(Protocol):
+    """
+    Scores candidate keys without materialising their plaintexts.
+      cipherCodes: (L,) ciphertext as alphabet indices, symbols outside the alphabet dropped
+      keyMatrix:   (N, A) ring indices (uint8 for A <= 255), keyMatrix[n, c] = plaintext index that cipher index c decrypts to,
+                   so keyMatrix[n][cipherCodes] is candidate n's plaintext as indices
+    Returns an (N,) float array.
+    """
+    def score_keys(self, cipherCodes: np.ndarray, keyMatrix: np.ndarray) -> np.ndarray: ...
+
+
+Fitness = Union[Callable[[str], float], BatchFitness, KeyFitness]
+
+
+class PerStringFitness:
+    """Adapter: presents a plain `fitness(text) -> float` callable as a BatchFitness."""
+    __slots__ = ("fn",)
+
+    def __init__(self, fn: Callable[[str], float]) -> None:
+        self.fn = fn
+
+    def score_batch(self, texts: Sequence[str]) -> List[float]:
+        fn = self.fn
+        return [fn(x) for x in texts]
+
+    def __call__(self, text: str) -> float:
+        return self.fn(text)
+
+
+def as_batch_fitness(fitness: Fitness) -> Union[BatchFitness, KeyFitness]:
+    """Pass batched scorers through untouched; wrap per-string callables."""
+    if isinstance(fitness, (BatchFitness, KeyFitness)):
+        return fitness
+    if callable(fitness):
+        return PerStringFitness(fitness)
+    raise TypeError("fitness must be a callable, or provide score_batch / score_keys")
+
+
+def score_texts(scorer: Union[BatchFitness, KeyFitness], texts: Sequence[str]) -> List[float]:
+    """Text-level scoring for any scorer; key-only scorers need the keyspace path instead."""
+    if not isinstance(scorer, BatchFitness):
+        raise TypeError("scorer has no score_batch; score it through its keys")
+    scores = scorer.score_batch(texts)
+    if len(scores) != len(texts):
+        raise ValueError(f"score_batch returned {len(scores)} scores for {len(texts)} texts")
+    return np.asarray(scores, dtype=np.float64).tolist()
@@ -1,15 +1,32 @@
 # nabu/eval/streaming.py
 from __future__ import annotations
-import re
 from typing import Callable, Iterator, Optional
-from datasets import load_dataset
+from .cleaning import make_cleaner
+
+_latinCleaner = make_cleaner("latin")
 
 def default_clean_text(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r'https?://\S+', '', text)
-    text = re.sub(r'[^\x00-\x7F]', '', text)
-    text = re.sub(r'[^a-z]', '', text)
-    return text.strip()
+    """lowercase a–z only, URLs removed (single translate pass, see cleaning.make_cleaner)"""
+    return _latinCleaner(text)
+
+def iter_hf_texts(
+    dataset: str = "HuggingFaceFW/fineweb-edu",
+    name: str = "sample-10BT",
+    split: str = "train",
+    *,
+    numShards: int = 1,
+    shardIndex: int = 0,
+) -> Iterator[str]:
+    """
+    Raw (uncleaned) row texts from an HF streaming dataset, optionally one of `numShards`
+    disjoint shards so several readers can pull concurrently (see asyncstream).
+    """
+    from datasets import load_dataset
+    ds = load_dataset(dataset, name=name, split=split, streaming=True)
+    if numShards > 1:
+        ds = ds.shard(num_shards=numShards, index=shardIndex)
+    for row in ds:
+        yield row.get("text", "")
 
 def stream_plaintexts_from_hf(
     dataset: str = "HuggingFaceFW/fineweb-edu",
@@ -19,16 +36,19 @@ def stream_plaintexts_from_hf(
     minLen: int = 150,
     maxSamples: Optional[int] = None,
     clean_fn: Optional[Callable[[str], str]] = None,
+    maxLen: Optional[int] = None,
 ) -> Iterator[str]:
     """
     Stream cleaned a–z plaintexts from HF Datasets (streaming=True).
+    With `maxLen` (and no custom clean_fn) each text is capped, and cleaning stops early on huge rows.
 
     Returns a *closable generator*: you may (optionally) call .close() on the
     returned iterator to stop background streaming threads immediately.
 
     This function already enforces `minLen` and (if provided) `maxSamples`.
     """
-    clean = clean_fn or default_clean_text
+    from datasets import load_dataset  # only needed when actually streaming; keeps offline use importable
+    clean = clean_fn or (make_cleaner("latin", maxLen=maxLen) if maxLen is not None else default_clean_text)
     ds = load_dataset(dataset, name=name, split=split, streaming=True)
     it = iter(ds)
 
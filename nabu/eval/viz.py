@@ -1,10 +1,11 @@
 # nabu/eval/viz.py
 from __future__ import annotations
-from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import os
 import random
 import numpy as np
-import matplotlib.pyplot as plt
-from sklearn.metrics import roc_curve, roc_auc_score
+# matplotlib and sklearn are imported inside the functions that draw / trace curves
 
 # flexible imports: package or flat scripts
 try:
@@ -14,6 +15,9 @@ try:
         build_local_pool_exact_radius,
         build_pairwise_dataset,
     )
+    from .cache import ResultCache, cache_key, rng_state_to_json, rng_state_from_json
+    from .scoring import Fitness
+    from .metrics import auc_score, auc_with_se
 except ImportError:  # running from nabu/eval as scripts
     from keyspace import MonoSubKeyspace
     from pairwise import (
@@ -21,6 +25,9 @@ except ImportError:  # running from nabu/eval as scripts
         build_local_pool_exact_radius,
         build_pairwise_dataset,
     )
+    from cache import ResultCache, cache_key, rng_state_to_json, rng_state_from_json
+    from scoring import Fitness
+    from metrics import auc_score, auc_with_se
 
 # ---------------------------
 # Utilities
@@ -29,10 +36,7 @@ except ImportError:  # running from nabu/eval as scripts
 def _safeAuc(y: List[int], z: List[float]) -> float:
     if not y or len(set(y)) < 2:
         return float("nan")
-    try:
-        return roc_auc_score(y, z)
-    except Exception:
-        return float("nan")
+    return auc_score(y, z)
 
 def bootstrapAucCI(y: List[int], z: List[float], *, rng: random.Random, B: int = 1000, alpha: float = 0.05) -> Tuple[float, float, float]:
     """
@@ -65,8 +69,9 @@ def computeRoc(y: List[int], z: List[float]) -> Tuple[np.ndarray, np.ndarray, fl
     """
     if not y or len(set(y)) < 2:
         return np.array([]), np.array([]), float("nan")
+    from sklearn.metrics import roc_curve
     fpr, tpr, _ = roc_curve(y, z)
-    auc = roc_auc_score(y, z)
+    auc = auc_score(y, z)
     return fpr, tpr, auc
 
 # ---------------------------
@@ -78,12 +83,12 @@ def buildGlobalPairs(
     ks: MonoSubKeyspace,
     plaintext: str,
     ciphertext: str,
-    fitnessFunc: Callable[[str], float],
+    fitnessFunc: Fitness,
     rng: random.Random,
     globalNumKeys: int,
     globalMaxPairs: int,
 ) -> Tuple[List[int], List[float]]:
-    pool = build_random_pool(ks, ciphertext, fitnessFunc, num_keys=globalNumKeys, rng=rng)
+    pool = build_random_pool(ks, ciphertext, fitnessFunc, num_keys=globalNumKeys, rng=rng, g=plaintext)
     y, z = build_pairwise_dataset(ks, pool, g=plaintext, max_pairs=globalMaxPairs, rng=rng)
     return y, z
 
@@ -93,7 +98,7 @@ def buildLocalPairsForRadius(
     trueKey: str,
     plaintext: str,
     ciphertext: str,
-    fitnessFunc: Callable[[str], float],
+    fitnessFunc: Fitness,
     rng: random.Random,
     radius: int,
     localSeeds: int,
@@ -102,13 +107,70 @@ def buildLocalPairsForRadius(
 ) -> Tuple[List[int], List[float]]:
     pool = build_local_pool_exact_radius(
         ks, trueKey, ciphertext, fitnessFunc,
-        radius=radius, per_seed=localPerSeed, n_seeds=localSeeds, rng=rng
+        radius=radius, per_seed=localPerSeed, n_seeds=localSeeds, rng=rng, g=plaintext
     )
     y, z = build_pairwise_dataset(
         ks, pool, g=plaintext, max_pairs=localMaxPairs, rng=rng, local_radius_cap=radius
     )
     return y, z
 
+def _cachedPairSets(
+    cache: Optional[ResultCache],
+    *,
+    alphabet: str,
+    plaintext: str,
+    fitnessFunc: Fitness,
+    rng: random.Random,
+    rngSeed: int,
+    globalNumKeys: int,
+    globalMaxPairs: int,
+    localRadii: Sequence[int],
+    localSeeds: int,
+    localPerSeed: int,
+    localMaxPairs: int,
+) -> Dict[object, Tuple[List[int], List[float]]]:
+    """
+    Global and per-radius (y, z) pair sets, keyed "global" and r. Leaves `rng` where a fresh build would.
+    """
+    key = None
+    if cache is not None:
+        params = {
+            "viz": True, "alphabet": alphabet, "globalNumKeys": globalNumKeys, "globalMaxPairs": globalMaxPairs,
+            "localRadii": list(localRadii), "localSeeds": localSeeds, "localPerSeed": localPerSeed,
+            "localMaxPairs": localMaxPairs,
+        }
+        key = cache_key(plaintext=plaintext, fitnessFunc=fitnessFunc, rngSeed=rngSeed, params=params)
+        hit = cache.get(key)
+        if hit is not None:
+            rng.setstate(rng_state_from_json(hit["meta"]["rng_after"]))
+            out: Dict[object, Tuple[List[int], List[float]]] = {"global": (hit["global_y"].tolist(), hit["global_z"].tolist())}
+            for r in localRadii:
+                out[r] = (hit[f"local{r}_y"].tolist(), hit[f"local{r}_z"].tolist())
+            return out
+
+    ks = MonoSubKeyspace(alphabet, rngSeed)
+    trueKey = ks.random_key()
+    ciphertext = ks.encrypt(plaintext, trueKey)
+    out = {"global": buildGlobalPairs(
+        ks=ks, plaintext=plaintext, ciphertext=ciphertext, fitnessFunc=fitnessFunc,
+        rng=rng, globalNumKeys=globalNumKeys, globalMaxPairs=globalMaxPairs
+    )}
+    for r in localRadii:
+        out[r] = buildLocalPairsForRadius(
+            ks=ks, trueKey=trueKey, plaintext=plaintext, ciphertext=ciphertext,
+            fitnessFunc=fitnessFunc, rng=rng, radius=r,
+            localSeeds=localSeeds, localPerSeed=localPerSeed, localMaxPairs=localMaxPairs
+        )
+
+    if key is not None:
+        arrays = {}
+        for name, (y, z) in out.items():
+            prefix = "global" if name == "global" else f"local{name}"
+            arrays[f"{prefix}_y"] = np.array(y, dtype=np.int8)
+            arrays[f"{prefix}_z"] = np.array(z, dtype=np.float64)
+        cache.put(key, arrays, meta={"rng_after": rng_state_to_json(rng)})
+    return out
+
 # ---------------------------
 # Visualiser
 # ---------------------------
@@ -117,7 +179,7 @@ def plotRocPanelForPlaintext(
     *,
     alphabet: str,
     plaintext: str,
-    fitnessFunc: Callable[[str], float],
+    fitnessFunc: Fitness,
     rngSeed: int = 12345,
     globalNumKeys: int = 500,
     globalMaxPairs: int = 50_000,
@@ -127,23 +189,24 @@ def plotRocPanelForPlaintext(
     localMaxPairs: int = 50_000,
     bootstrapB: int = 500,
     savePath: Optional[str] = None,
+    cache: Optional[ResultCache] = None,
 ) -> Dict[str, Dict[str, float]]:
     """
     Build ROC curves and AUC CIs for:
       - Global random-key pairs
       - Local Cayley-ball pairs for each radius in localRadii
     Returns a dict of metrics and optionally saves a PNG at savePath.
+    With a cache, the (y, z) pair sets are replayed and only the bootstrap/plot is redone.
     """
     rng = random.Random(rngSeed)
-    ks = MonoSubKeyspace(alphabet, rngSeed)
-    trueKey = ks.random_key()
-    ciphertext = ks.encrypt(plaintext, trueKey)
+    pairSets = _cachedPairSets(
+        cache, alphabet=alphabet, plaintext=plaintext, fitnessFunc=fitnessFunc, rng=rng, rngSeed=rngSeed,
+        globalNumKeys=globalNumKeys, globalMaxPairs=globalMaxPairs, localRadii=localRadii,
+        localSeeds=localSeeds, localPerSeed=localPerSeed, localMaxPairs=localMaxPairs,
+    )
 
     # Global
-    yG, zG = buildGlobalPairs(
-        ks=ks, plaintext=plaintext, ciphertext=ciphertext, fitnessFunc=fitnessFunc,
-        rng=rng, globalNumKeys=globalNumKeys, globalMaxPairs=globalMaxPairs
-    )
+    yG, zG = pairSets["global"]
     fprG, tprG, aucG = computeRoc(yG, zG)
     aucG, loG, hiG = bootstrapAucCI(yG, zG, rng=rng, B=bootstrapB)
 
@@ -152,17 +215,14 @@ def plotRocPanelForPlaintext(
     aucStatsLocal: Dict[int, Tuple[float, float, float]] = {}
 
     for r in localRadii:
-        yL, zL = buildLocalPairsForRadius(
-            ks=ks, trueKey=trueKey, plaintext=plaintext, ciphertext=ciphertext,
-            fitnessFunc=fitnessFunc, rng=rng, radius=r,
-            localSeeds=localSeeds, localPerSeed=localPerSeed, localMaxPairs=localMaxPairs
-        )
+        yL, zL = pairSets[r]
         fpr, tpr, _ = computeRoc(yL, zL)
         a, lo, hi = bootstrapAucCI(yL, zL, rng=rng, B=bootstrapB)
         rocDataLocal[r] = (fpr, tpr, a)
         aucStatsLocal[r] = (a, lo, hi)
 
     # ---- Plot panel ----
+    import matplotlib.pyplot as plt
     nCols = 1 + len(localRadii)
     fig, axes = plt.subplots(1, nCols, figsize=(4*nCols, 4), constrained_layout=True)
 
@@ -196,3 +256,141 @@ def plotRocPanelForPlaintext(
                   for r in localRadii}
     }
     return out
+
+
+# ---------------------------
+# Batch report (headless)
+# ---------------------------
+
+ROC_POINTS = 200
+
+def downsampleRoc(y: Sequence[int], z: Sequence[float], points: int = ROC_POINTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (fpr, tpr) of (y, z) at no more than `points` thresholds, spread evenly over the distinct scores
+    (both ends kept), so drawing cost no longer grows with the number of pairs.
+    Degenerate inputs give empty arrays.
+    """
+    if points < 2:
+        raise ValueError("points must be at least 2")
+    pos = np.asarray(y) == 1
+    z = np.asarray(z, dtype=np.float64)
+    nPos = int(pos.sum())
+    nNeg = pos.size - nPos
+    if nPos == 0 or nNeg == 0:
+        return np.array([]), np.array([])
+    order = np.argsort(-z, kind="stable")
+    zSorted = z[order]
+    tps = np.cumsum(pos[order])
+    fps = np.arange(1, pos.size + 1) - tps
+    # one threshold per run of equal scores: the run's last index
+    ends = np.flatnonzero(np.r_[zSorted[1:] != zSorted[:-1], True])
+    keep = ends[np.unique(np.linspace(0, ends.size - 1, points).round().astype(np.int64))]
+    return np.r_[0.0, fps[keep] / nNeg], np.r_[0.0, tps[keep] / nPos]
+
+def _rocCurve(label: str, y: np.ndarray, z: np.ndarray, points: int) -> Dict[str, Any]:
+    # DeLong CI instead of the bootstrap: same pairs, no resampling loop
+    auc, se = auc_with_se(y, z)
+    fpr, tpr = downsampleRoc(y, z, points)
+    return {"label": label, "fpr": fpr, "tpr": tpr, "auc": auc, "lo": auc - 1.96 * se, "hi": auc + 1.96 * se}
+
+def _poolTitle(pool: object) -> str:
+    return "Global" if pool == "global" else f"Local r={pool}"
+
+def _drawPanels(path: str, title: str, panels: List[Dict[str, Any]], dpi: int) -> str:
+    """One row of ROC panels to a PNG. Figure() renders through Agg directly: no pyplot, no GUI backend."""
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=(4 * len(panels), 4.4))
+    # fixed margins: every panel has the same decorations, and constrained layout would double the draw time
+    fig.subplots_adjust(left=0.25 / len(panels), right=1 - 0.1 / len(panels), bottom=0.12, top=0.8, wspace=0.3)
+    axes = fig.subplots(1, len(panels), squeeze=False)[0]
+    for ax, panel in zip(axes, panels):
+        ax.plot([0, 1], [0, 1], linestyle="--", linewidth=1, alpha=0.6)
+        for fpr, tpr in panel.get("background", ()):
+            ax.plot(fpr, tpr, color="0.6", linewidth=0.5, alpha=0.3)
+        curves = panel["curves"]
+        for c in curves:
+            if c["fpr"].size:
+                label = f"{c['label']} AUC={c['auc']:.3f}" if len(curves) > 1 else None
+                ax.plot(c["fpr"], c["tpr"], linewidth=2, label=label)
+        if len(curves) == 1:
+            c = curves[0]
+            ax.set_title(f"{panel['title']}\nAUC={c['auc']:.3f} [{c['lo']:.3f},{c['hi']:.3f}]")
+        else:
+            ax.set_title(panel["title"])
+            ax.legend(loc="lower right", fontsize="small")
+        ax.set_xlabel("FPR")
+        ax.set_ylabel("TPR")
+        ax.set_xlim(0, 1); ax.set_ylim(0, 1)
+        ax.grid(True, alpha=0.2)
+    fig.suptitle(title)
+    fig.savefig(path, dpi=dpi)
+    return path
+
+def _macroPanels(byPool: Dict[object, Dict[str, List[Dict[str, Any]]]], points: int) -> List[Dict[str, Any]]:
+    """Mean TPR over a common FPR grid per pool and fitness; macro AUC with a CI over texts."""
+    grid = np.linspace(0.0, 1.0, points)
+    panels = []
+    for pool, byName in byPool.items():
+        curves = []
+        background = []
+        for name, cs in byName.items():
+            drawn = [c for c in cs if c["fpr"].size]
+            aucs = np.array([c["auc"] for c in cs if c["auc"] == c["auc"]])
+            auc = float(aucs.mean()) if aucs.size else float("nan")
+            half = 1.96 * aucs.std(ddof=1) / np.sqrt(aucs.size) if aucs.size > 1 else float("nan")
+            tpr = np.mean([np.interp(grid, c["fpr"], c["tpr"]) for c in drawn], axis=0) if drawn else np.array([])
+            curves.append({"label": name, "fpr": grid if drawn else np.array([]), "tpr": tpr,
+                           "auc": auc, "lo": auc - half, "hi": auc + half})
+            if len(byName) == 1:
+                background = [(c["fpr"], c["tpr"]) for c in drawn]
+        panels.append({"title": f"{_poolTitle(pool)} (macro, {len(next(iter(byName.values())))} texts)",
+                       "curves": curves, "background": background})
+    return panels
+
+def renderRocReport(
+    result: Mapping[str, Any],
+    outDir: str,
+    *,
+    points: int = ROC_POINTS,
+    workers: Optional[int] = None,
+    dpi: int = 120,
+) -> Dict[str, Any]:
+    """
+    Figures for a whole evaluate_many / evaluate_many_multi result run with returnPairs=True:
+    text_<id>.png (global + local panels, one curve per fitness) and macro.png, written to outDir.
+      - reuses the run's (y, z) pairs: nothing is re-evaluated
+      - curves are downsampled to `points` thresholds and AUC CIs are DeLong, here in the parent;
+        the worker processes (workers=1 draws inline) only render small arrays
+    Texts without pair_sets (e.g. replayed from a checkpoint) are skipped.
+    Returns {"paths": [...], "macro": {pool: {name: macro AUC}}}.
+    """
+    os.makedirs(outDir, exist_ok=True)
+    jobs: List[Tuple[str, str, List[Dict[str, Any]], int]] = []
+    byPool: Dict[object, Dict[str, List[Dict[str, Any]]]] = {}
+    for entry in result["per_text"]:
+        pairSets = entry["report"].get("pair_sets")
+        if pairSets is None:
+            continue
+        panels = []
+        for pool, (y, zs) in pairSets.items():
+            named = zs.items() if isinstance(zs, Mapping) else [("", zs)]
+            curves = [_rocCurve(name, y, z, points) for name, z in named]
+            panels.append({"title": _poolTitle(pool), "curves": curves})
+            for c in curves:
+                byPool.setdefault(pool, {}).setdefault(c["label"], []).append(c)
+        jobs.append((os.path.join(outDir, f"text_{entry['id']:04d}.png"), f"text {entry['id']}", panels, dpi))
+    if not jobs:
+        raise ValueError("no text in the result has pair_sets; evaluate with returnPairs=True")
+    macro = _macroPanels(byPool, points)
+    jobs.append((os.path.join(outDir, "macro.png"), "macro average", macro, dpi))
+
+    if workers == 1:
+        paths = [_drawPanels(*job) for job in jobs]
+    else:
+        chunk = max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            paths = list(executor.map(_drawPanels, *zip(*jobs), chunksize=chunk))
+    return {
+        "paths": paths,
+        "macro": {pool: {c["label"]: c["auc"] for c in panel["curves"]} for pool, panel in zip(byPool, macro)},
+    }
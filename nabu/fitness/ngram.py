@@ -0,0 +1,230 @@
+from __future__ import annotations
+import csv
+import json
+import hashlib
+from math import log
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from nabu.core.alphabets import RingCodec, getAlphabet, getRingCodec
+
+# (codes, logProbs) for one order: sorted uint64 n-gram codes and their float32 log P(last | history)
+OrderTable = Tuple[np.ndarray, np.ndarray]
+
+
+def ngramCodes(codes: np.ndarray, order: int, m: int) -> np.ndarray:
+    """
+    Base-m code of every length-`order` window of a ring-index array, as uint64;
+    entry i is the window ending at codes[i + order - 1].
+    """
+    x = np.asarray(codes, dtype=np.uint64)
+    if x.size < order:
+        return np.empty(0, dtype=np.uint64)
+    out = x[:x.size - order + 1].copy()
+    for k in range(1, order):
+        out *= np.uint64(m)
+        out += x[k:x.size - order + 1 + k]
+    return out
+
+
+def rowCodes(rows: np.ndarray, m: int) -> np.ndarray:
+    """Base-m code of each row of a (k, n) ring-index array, as uint64."""
+    rows = np.asarray(rows)
+    out = rows[:, 0].astype(np.uint64)
+    for k in range(1, rows.shape[1]):
+        out *= np.uint64(m)
+        out += rows[:, k].astype(np.uint64)
+    return out
+
+
+def _conditional(codes: np.ndarray, counts: np.ndarray, m: int) -> OrderTable:
+    """sorted unique codes + log C(h c) - log C(h), with C(h) summed over the observed continuations"""
+    codes, inverse = np.unique(codes, return_inverse=True)
+    counts = np.bincount(inverse, weights=counts).astype(np.float64)
+    history, hInverse = np.unique(codes // np.uint64(m), return_inverse=True)
+    hCounts = np.bincount(hInverse, weights=counts)
+    return codes, (np.log(counts) - np.log(hCounts[hInverse])).astype(np.float32)
+
+
+class SparseNgramModel:
+    """
+    Character n-gram model for orders where dense arrays are out of the question (26^8 cells):
+      - one (sorted uint64 codes, float32 log-probs) pair per order, so memory is ~12 bytes per observed n-gram
+      - codes are the n-gram's ring indices read as a base-m number (needs m^maxOrder < 2^64)
+      - lookups are one np.searchsorted per order for a whole batch of texts
+      - unseen n-grams back off to the next lower order, paying log(backoff) per step (stupid backoff);
+        symbols never seen as unigrams score floorLogProb
+    Characters outside the ring are dropped before scoring; the upper case folds onto the ring.
+    Usable as a BatchFitness (score_batch) and a KeyFitness (score_keys).
+    """
+
+    def __init__(self, ring: str, tables: Sequence[OrderTable], *, upper: Optional[str] = None,
+                 backoff: float = 0.4, floorLogProb: Optional[float] = None) -> None:
+        if not tables:
+            raise ValueError("need at least the unigram table")
+        if not 0 < backoff <= 1:
+            raise ValueError("backoff must be in (0, 1]")
+        self.ring = ring
+        self.m = m = len(ring)
+        self.maxOrder = len(tables)
+        if m ** self.maxOrder >= 2 ** 64:
+            raise ValueError(f"{self.maxOrder}-grams over {m} symbols do not fit a uint64 code")
+        self.codec: RingCodec = getRingCodec(ring, upper)
+        self.backoff = backoff
+        self._logBackoff = log(backoff)
+        self.tables: List[OrderTable] = []
+        for codes, logProbs in tables:
+            codes = np.asarray(codes, dtype=np.uint64)
+            logProbs = np.asarray(logProbs, dtype=np.float32)
+            if codes.shape != logProbs.shape:
+                raise ValueError("codes / log-prob length mismatch")
+            if codes.size > 1 and np.any(codes[1:] <= codes[:-1]):
+                raise ValueError("n-gram codes must be sorted and unique")
+            self.tables.append((codes, logProbs))
+        unigrams = self.tables[0][1]
+        if floorLogProb is None:
+            floorLogProb = float(unigrams.min()) + log(0.01) if unigrams.size else -20.0
+        self.floorLogProb = floorLogProb
+        self._cacheToken: Optional[str] = None
+
+    # ---------- building ----------
+    @classmethod
+    def fromTexts(cls, texts: Iterable[str], maxOrder: int, *, alphabet: str = "latin",
+                  **kwargs) -> "SparseNgramModel":
+        """Counts every order up to maxOrder over a corpus (non-ring characters dropped, case folded)."""
+        pair = getAlphabet(alphabet)
+        codec = getRingCodec(pair.lower, pair.upper)
+        m = codec.size
+        perOrder: List[List[np.ndarray]] = [[] for _ in range(maxOrder)]
+        for text in texts:
+            x = codec.ringOnly(codec.encode(text))
+            for n in range(1, maxOrder + 1):
+                codes, counts = np.unique(ngramCodes(x, n, m), return_counts=True)
+                perOrder[n - 1].append(np.stack([codes, counts.astype(np.uint64)]))
+        tables = []
+        for chunks in perOrder:
+            both = np.concatenate(chunks, axis=1) if chunks else np.empty((2, 0), dtype=np.uint64)
+            tables.append(_conditional(both[0], both[1].astype(np.float64), m))
+        return cls(pair.lower, tables, upper=pair.upper, **kwargs)
+
+    @classmethod
+    def fromCountCsvs(cls, paths: Sequence[str], *, alphabet: str = "latin", chunkRows: int = 1 << 16,
+                      **kwargs) -> "SparseNgramModel":
+        """
+        paths[n - 1] is the n-gram count CSV (header row, then n-gram columns and a count column,
+        as read by counts2log). Rows are encoded in chunks, so no per-n-gram Python objects are kept.
+        """
+        pair = getAlphabet(alphabet)
+        codec = getRingCodec(pair.lower, pair.upper)
+        m = codec.size
+        tables = []
+        for n, path in enumerate(paths, start=1):
+            codeChunks: List[np.ndarray] = []
+            countChunks: List[np.ndarray] = []
+            with open(path, mode="r", newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                next(reader, None)  # skip header
+                while True:
+                    rows = [row for _, row in zip(range(chunkRows), reader)]
+                    if not rows:
+                        break
+                    grams = ["".join(row[:-1]) for row in rows]
+                    keep = np.array([len(g) == n for g in grams], dtype=bool)
+                    x = codec.encode("".join(g for g, k in zip(grams, keep) if k)).reshape(-1, n)
+                    counts = np.array([float(row[-1]) for row in rows], dtype=np.float64)[keep]
+                    inRing = (x < m).all(axis=1)
+                    codeChunks.append(rowCodes(x[inRing], m))
+                    countChunks.append(counts[inRing])
+            codes = np.concatenate(codeChunks) if codeChunks else np.empty(0, dtype=np.uint64)
+            counts = np.concatenate(countChunks) if countChunks else np.empty(0)
+            tables.append(_conditional(codes, counts, m))
+        return cls(pair.lower, tables, upper=pair.upper, **kwargs)
+
+    # ---------- storage ----------
+    def save(self, path: str) -> None:
+        """One .npz: codes{n} / logp{n} arrays plus the ring and scoring parameters."""
+        arrays = {}
+        for n, (codes, logProbs) in enumerate(self.tables, start=1):
+            arrays[f"codes{n}"] = codes
+            arrays[f"logp{n}"] = logProbs
+        meta = {"ring": self.ring, "upper": self.codec.upper, "backoff": self.backoff,
+                "floorLogProb": self.floorLogProb, "maxOrder": self.maxOrder}
+        np.savez(path, meta=np.array(json.dumps(meta)), **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "SparseNgramModel":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            tables = [(data[f"codes{n}"], data[f"logp{n}"]) for n in range(1, meta["maxOrder"] + 1)]
+        return cls(meta["ring"], tables, upper=meta["upper"], backoff=meta["backoff"],
+                   floorLogProb=meta["floorLogProb"])
+
+    def cache_token(self) -> str:
+        """Digest of the tables and scoring parameters (result caches identify the model by it); computed once."""
+        if self._cacheToken is None:
+            h = hashlib.sha256(json.dumps([self.ring, self.codec.upper, self.backoff, self.floorLogProb]).encode())
+            for codes, logProbs in self.tables:
+                h.update(codes.tobytes())
+                h.update(logProbs.tobytes())
+            self._cacheToken = h.hexdigest()
+        return self._cacheToken
+
+    def nbytes(self) -> int:
+        return sum(codes.nbytes + logProbs.nbytes for codes, logProbs in self.tables)
+
+    # ---------- scoring ----------
+    def _lookup(self, order: int, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(found mask, log-probs) for a batch of order-n codes"""
+        codes, logProbs = self.tables[order - 1]
+        if codes.size == 0:
+            return np.zeros(queries.size, dtype=bool), np.zeros(queries.size, dtype=np.float32)
+        idx = np.minimum(np.searchsorted(codes, queries), codes.size - 1)
+        return codes[idx] == queries, logProbs[idx]
+
+    def scoreCodes(self, x: np.ndarray, starts: np.ndarray) -> np.ndarray:
+        """
+        Log-probabilities of several ring-index sequences laid end to end in `x`; starts[t] is where
+        sequence t begins. Position i is scored with the longest available history inside its sequence.
+        """
+        x = np.asarray(x)
+        starts = np.asarray(starts, dtype=np.int64)
+        total = np.zeros(x.size, dtype=np.float64)
+        if x.size == 0:
+            return np.zeros(starts.size)
+        seqId = np.searchsorted(starts, np.arange(x.size), side="right") - 1
+        local = np.arange(x.size) - starts[seqId]
+        startOrder = np.minimum(local + 1, self.maxOrder)
+        pending = np.ones(x.size, dtype=bool)
+        for n in range(self.maxOrder, 0, -1):
+            # window of length n ending at i exists for i >= n - 1 (in x) and local >= n - 1 (in its sequence)
+            at = np.flatnonzero(pending & (startOrder >= n))
+            if at.size == 0:
+                continue
+            # only the positions still pending are encoded: lower orders see just the backed-off ones
+            window = x[at[:, None] + np.arange(1 - n, 1)]
+            found, logProbs = self._lookup(n, rowCodes(window, self.m))
+            hit = at[found]
+            total[hit] = logProbs[found] + self._logBackoff * (startOrder[hit] - n)
+            pending[hit] = False
+        total[pending] = self.floorLogProb + self._logBackoff * (startOrder[pending] - 1)
+        return np.bincount(seqId, weights=total, minlength=starts.size)
+
+    def score(self, text: str) -> float:
+        return float(self.score_batch([text])[0])
+
+    def __call__(self, text: str) -> float:
+        return self.score(text)
+
+    def score_batch(self, texts: Sequence[str]) -> List[float]:
+        codec = self.codec
+        seqs = [codec.ringOnly(codec.encode(t)) for t in texts]
+        lengths = np.array([s.size for s in seqs], dtype=np.int64)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]) if seqs else np.empty(0, dtype=np.int64)
+        x = np.concatenate(seqs) if seqs else np.empty(0, dtype=codec.dtype)
+        return self.scoreCodes(x, starts).tolist()
+
+    def score_keys(self, cipherCodes: np.ndarray, keyMatrix: np.ndarray) -> np.ndarray:
+        plain = np.asarray(keyMatrix)[:, cipherCodes]
+        n, length = plain.shape
+        return self.scoreCodes(plain.reshape(-1), np.arange(n, dtype=np.int64) * length)
@@ -0,0 +1,14 @@
+from nabu.eval.cleaning import make_cleaner
+from nabu.eval.streaming import default_clean_text
+
+
+def test_default_clean_text_folds_non_ascii_case_first():
+    # the original lower() -> strip non-ASCII chain keeps letters whose lowercase is ASCII
+    assert default_clean_text("K elvin") == "kelvin"   # Kelvin sign
+    assert default_clean_text("İstanbul") == "istanbul"  # I with dot above
+    assert default_clean_text("Ünïcode https://x.y/Z ok") == "ncodeok"
+
+
+def test_batch_matches_single_documents():
+    docs = ["K elvin", "İstanbul", "Plain ASCII, text!"]
+    assert make_cleaner("latin").batch(docs) == [default_clean_text(d) for d in docs]